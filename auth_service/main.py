@@ -7,18 +7,22 @@ from shared.errors import (
     register_error_handlers,
     setup_openapi_with_errors,
 )
+from shared.metrics import add_metrics
+from shared.tracing import traces_router
 
 logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Auth Service API")
-    register_error_handlers(app)
+    register_error_handlers(app, service="auth")
     setup_openapi_with_errors(app)
+    add_metrics(app)
 
     app.include_router(auth.router, prefix="/auth", tags=["Auth"])
     app.include_router(users.router, prefix="/users", tags=["Users"])
     app.include_router(hotels.router, prefix="/hotels", tags=["Hotels"])
+    app.include_router(traces_router)
 
     @app.get("/", tags=["system"])
     async def root():
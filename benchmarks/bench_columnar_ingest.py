@@ -0,0 +1,132 @@
+"""
+Бенчмарк CPU на строку при импорте бронирований: CSV против Parquet/Arrow.
+
+Один и тот же набор строк кодируется в CSV (со строковыми датами и deposit_type)
+и в Parquet/Arrow IPC с типизированными колонками. Замеряется процессорное время
+подготовки в воркере и построения строк для вставки — без обращения к БД:
+— CSV: prepare_booking_columns → DataFrame → map_row_to_booking для каждой строки;
+— колоночный формат: prepare_columnar_columns → словари колонок Booking для executemany.
+
+Запуск:
+    python -m benchmarks.bench_columnar_ingest --rows 200000 --repeat 3
+"""
+
+import argparse
+import io
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_interface_service.utils.arrow import import_pyarrow
+from data_interface_service.utils.booking_data_preparation import prepare_booking_columns
+from data_interface_service.utils.columnar_preparation import BOOKING_COLUMNS, prepare_columnar_columns
+from data_interface_service.utils.mapping import map_row_to_booking
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HOTEL_ID = 1
+
+
+def generate_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Генерирует бронирования с типизированными колонками."""
+    rng = np.random.default_rng(seed)
+    arrival = pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")
+
+    return pd.DataFrame({
+        "booking_ref": [f"B{i}" for i in range(rows)],
+        "arrival_date": arrival.date,
+        "adults": rng.integers(1, 4, rows),
+        "children": rng.integers(0, 3, rows),
+        "babies": rng.integers(0, 2, rows),
+        "stays_in_weekend_nights": rng.integers(0, 3, rows),
+        "stays_in_week_nights": rng.integers(1, 6, rows),
+        "lead_time": rng.integers(0, 365, rows),
+        "booking_changes": rng.integers(0, 4, rows),
+        "adr": np.round(rng.uniform(40, 300, rows), 2),
+        "has_deposit": rng.choice(["No Deposit", "Non Refund", "Refundable"], rows),
+        "is_cancellation": rng.random(rows) < 0.3,
+        "market_segment": rng.choice(["Online TA", "Offline TA/TO", "Direct"], rows),
+        "distribution_channel": rng.choice(["TA/TO", "Direct"], rows),
+        "reserved_room_type": rng.choice(["A", "D", "E"], rows),
+    })
+
+
+def encode(df: pd.DataFrame) -> dict[str, bytes]:
+    pa = import_pyarrow()
+    import pyarrow.parquet as pq
+
+    csv_df = df.assign(
+        arrival_date=pd.to_datetime(df["arrival_date"]).dt.strftime("%d.%m.%Y"),
+        is_cancellation=df["is_cancellation"].astype(int),
+    )
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet)
+
+    arrow = io.BytesIO()
+    with pa.ipc.new_stream(arrow, table.schema) as writer:
+        writer.write_table(table)
+
+    return {
+        "csv": csv_df.to_csv(sep=";", index=False).encode(),
+        "parquet": parquet.getvalue(),
+        "arrow": arrow.getvalue(),
+    }
+
+
+def ingest_csv(content: bytes) -> int:
+    df = pd.DataFrame(prepare_booking_columns(content), copy=False)
+    bookings = [map_row_to_booking(row, HOTEL_ID) for row in df.to_dict(orient="records")]
+    return sum(booking is not None for booking in bookings)
+
+
+def ingest_columnar(content: bytes) -> int:
+    columns = prepare_columnar_columns(content)
+    values = [columns[col].tolist() for col in BOOKING_COLUMNS]
+    records = [{"hotel_id": HOTEL_ID, **dict(zip(BOOKING_COLUMNS, row))} for row in zip(*values)]
+    return len(records)
+
+
+def cpu_time(fn, repeat: int) -> float:
+    """Минимальное процессорное время fn за repeat прогонов, секунды."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def run(rows: int, repeat: int) -> dict[str, float]:
+    payloads = encode(generate_frame(rows))
+    ingest = {"csv": ingest_csv, "parquet": ingest_columnar, "arrow": ingest_columnar}
+
+    results: dict[str, float] = {}
+    for name, content in payloads.items():
+        seconds = cpu_time(lambda: ingest[name](content), repeat)
+        results[name] = seconds / rows * 1e6
+        logger.info(
+            "%-8s %10d байт %8.1f ms %8.2f мкс/строка",
+            name, len(content), seconds * 1000, results[name],
+        )
+
+    for name in ("parquet", "arrow"):
+        logger.info("csv / %s: x%.1f", name, results["csv"] / results[name])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Число строк в сгенерированном файле")
+    parser.add_argument("--repeat", type=int, default=3, help="Число повторов, берётся лучшее время")
+    args = parser.parse_args()
+
+    run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Бенчмарк задержки получения истории и прогноза (/forecast/fetch).
+
+Сравнивает два варианта на реальной БД из .env:
+- sequential — прежняя схема: db.get(Hotel) → get_history → get_forecast (три round trip);
+- combined — get_history_and_forecast (один UNION ALL запрос).
+
+Запуск:
+    python -m benchmarks.bench_forecast_fetch --hotel-id 1 --target-date 2017-06-01 --iterations 200
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from datetime import date
+
+from data_interface_service.services.forecast_service import (
+    get_forecast,
+    get_history,
+    get_history_and_forecast,
+)
+from shared.db import AsyncSessionLocal, async_engine
+from shared.db_models import Hotel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def fetch_sequential(db, params: dict) -> None:
+    hotel = await db.get(Hotel, params["hotel_id"])
+    await get_history(
+        db=db, hotel_id=hotel.id, target_date=params["target_date"],
+        has_deposit=params["has_deposit"], history_window=params["history_window"],
+    )
+    await get_forecast(
+        db=db, hotel_id=hotel.id, target_date=params["target_date"],
+        has_deposit=params["has_deposit"], horizon=params["horizon"],
+    )
+
+
+async def fetch_combined(db, params: dict) -> None:
+    await get_history_and_forecast(db=db, **params)
+
+
+async def measure(fetch, params: dict, iterations: int) -> list[float]:
+    """Задержки одного вызова в миллисекундах; каждая итерация — новая сессия, как в эндпоинте."""
+    latencies = []
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fetch(db, params)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(name: str, latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    result = {
+        "p50": statistics.median(ordered),
+        "p95": ordered[int(len(ordered) * 0.95) - 1],
+        "mean": statistics.fmean(ordered),
+    }
+    logger.info("%-10s p50=%.2f ms  p95=%.2f ms  mean=%.2f ms", name, result["p50"], result["p95"], result["mean"])
+    return result
+
+
+async def run(params: dict, iterations: int, warmup: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, fetch in (("sequential", fetch_sequential), ("combined", fetch_combined)):
+        await measure(fetch, params, warmup)
+        results[name] = summarize(name, await measure(fetch, params, iterations))
+
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotel-id", type=int, default=1)
+    parser.add_argument("--target-date", type=date.fromisoformat, required=True)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--history-window", type=int, default=30)
+    parser.add_argument("--has-deposit", action="store_true")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    params = {
+        "hotel_id": args.hotel_id,
+        "target_date": args.target_date,
+        "has_deposit": args.has_deposit,
+        "horizon": args.horizon,
+        "history_window": args.history_window,
+    }
+    asyncio.run(run(params, args.iterations, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Бенчмарк сериализации ответов с прогнозом (ForecastResponse, PredictResponse).
+
+Для каждого размера ответа сравнивает стоимость рендеринга тела:
+- json     — JSONResponse Starlette: данные после response_model + json.dumps
+             (путь FastAPI при заданном response_class и в версиях без dump_json);
+- orjson   — FastJSONResponse на тех же данных (если бы он был default_response_class);
+- encoder  — ответ-dict без response_model: jsonable_encoder + json.dumps;
+- direct   — FastJSONResponse из готового dict без jsonable_encoder (обработчики ошибок, health);
+- pydantic — TypeAdapter.dump_json: так FastAPI сериализует response_model, если
+             default_response_class не переопределён.
+
+Вывод по результатам: маршруты с response_model остаются на pydantic-core (pydantic ≤ orjson
+по времени, а default_response_class отключил бы этот путь), FastJSONResponse используется
+там, где сервисы сами формируют JSON.
+
+Дополнительно измеряет gzip крупного ответа (уровни 5 и 9) и сериализацию тела
+запроса в router: model_dump(mode="json") + json.dumps против model_dump_json().
+
+Запуск:
+    python -m benchmarks.bench_json_responses --days 30 90 365 --iterations 2000
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import time
+import zlib
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from data_interface_service.schemas import ForecastDay, ForecastRequest, ForecastResponse
+from prediction_service.schemas import PredictDay, PredictResponse
+from shared.responses import FastJSONResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_forecast_response(days: int) -> ForecastResponse:
+    start = date(2017, 1, 1)
+    history = [
+        ForecastDay(day=start + timedelta(days=i), bookings=40.0 + i % 7, cancellations=3.5)
+        for i in range(days)
+    ]
+    forecast = [
+        ForecastDay(day=start + timedelta(days=days + i), bookings=41.25 + i % 5, cancellations=4.0)
+        for i in range(30)
+    ]
+    return ForecastResponse(hotel_id=1, history_summary=history, forecast=forecast)
+
+
+def build_predict_response(days: int) -> PredictResponse:
+    start = date(2017, 1, 1)
+    return PredictResponse(
+        hotel_id=1,
+        target_date=start,
+        forecast=[
+            PredictDay(day=start + timedelta(days=i), bookings=41.25 + i % 5, cancellations=4.0)
+            for i in range(days)
+        ],
+    )
+
+
+def measure(render, iterations: int) -> float:
+    """Медианное время одного вызова в микросекундах (по 5 сериям)."""
+    series = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        series.append((time.perf_counter() - start) / iterations * 1e6)
+    return statistics.median(series)
+
+
+def bench_response(name: str, model, iterations: int) -> dict[str, float]:
+    adapter = TypeAdapter(type(model))
+    plain = JSONResponse(None)
+    fast = FastJSONResponse(None)
+    raw = model.model_dump()
+
+    def serialized():
+        # То, что FastAPI передаёт в response_class после валидации по response_model
+        return adapter.dump_python(adapter.validate_python(model), mode="json")
+
+    variants = {
+        "json": lambda: plain.render(serialized()),
+        "orjson": lambda: fast.render(serialized()),
+        "encoder": lambda: plain.render(jsonable_encoder(raw)),
+        "direct": lambda: fast.render(raw),
+        "pydantic": lambda: adapter.dump_json(adapter.validate_python(model)),
+    }
+    assert json.loads(variants["orjson"]()) == json.loads(variants["json"]())
+
+    results = {variant: measure(render, iterations) for variant, render in variants.items()}
+    logger.info(
+        "%-24s size=%6d B  " + "  ".join(f"{v}=%.1f us" for v in results),
+        name, len(variants["orjson"]()), *results.values(),
+    )
+    return results
+
+
+def bench_gzip(model, iterations: int) -> None:
+    body = FastJSONResponse(None).render(model.model_dump())
+    for level in (5, 9):
+        compressed = zlib.compress(body, level)
+        elapsed = measure(lambda: zlib.compress(body, level), iterations)
+        logger.info(
+            "gzip level=%d  %d B -> %d B (%.0f%%)  %.1f us",
+            level, len(body), len(compressed), len(compressed) / len(body) * 100, elapsed,
+        )
+
+
+def bench_request_body(iterations: int) -> None:
+    req = ForecastRequest(target_date=date(2017, 6, 1), horizon=30, history_window=30, has_deposit=False)
+    before = measure(lambda: json.dumps(req.model_dump(mode="json")).encode(), iterations)
+    after = measure(lambda: req.model_dump_json().encode(), iterations)
+    logger.info("request body  model_dump+json.dumps=%.2f us  model_dump_json=%.2f us", before, after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 90, 365])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for days in args.days:
+        bench_response(f"ForecastResponse[{days}+30]", build_forecast_response(days), args.iterations)
+        bench_response(f"PredictResponse[{days}]", build_predict_response(days), args.iterations)
+
+    bench_gzip(build_forecast_response(max(args.days)), max(args.iterations // 10, 10))
+    bench_request_body(args.iterations * 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Бенчмарк очистки числовых колонок бронирований (clean_numeric_series).
+
+Генерирует CSV на заданное число строк со всеми колонками NUMERIC_COLUMNS:
+часть колонок чисто числовая (pandas читает их как int64/float64),
+часть содержит мусорные значения ("n/a", "NULL", пустые строки) и читается как строки.
+Замеряет нормализацию каждой колонки и набора NUMERIC_COLUMNS целиком.
+
+Запуск:
+    python -m benchmarks.bench_numeric_cleaning --rows 1000000 --repeat 3
+"""
+
+import argparse
+import logging
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from data_interface_service.utils.booking_constants import NUMERIC_COLUMNS
+from data_interface_service.utils.booking_data_preparation import (
+    clean_numeric_series,
+    normalize_columns,
+    read_csv_to_dataframe,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Колонки, в которые подмешиваются мусорные значения (остаются строковыми после read_csv)
+DIRTY_COLUMNS = ["children", "adr", "booking_changes"]
+SENTINELS = np.array(["none", "-", "?", "n/a", ""], dtype=object)
+
+
+def generate_csv(rows: int, seed: int = 42) -> str:
+    """Генерирует CSV с числовыми колонками бронирований."""
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    for col, cfg in NUMERIC_COLUMNS.items():
+        if cfg["dtype"] is float:
+            values = np.round(rng.uniform(0, 300, rows), 2).astype(object)
+        else:
+            values = rng.integers(0, 10, rows).astype(object)
+
+        if col in DIRTY_COLUMNS:
+            dirty = rng.random(rows) < 0.05
+            values[dirty] = rng.choice(SENTINELS, dirty.sum())
+
+        data[col] = values
+
+    buffer = StringIO()
+    pd.DataFrame(data).to_csv(buffer, sep=";", index=False)
+    return buffer.getvalue()
+
+
+def timed(fn, repeat: int) -> float:
+    """Минимальное время выполнения fn за repeat прогонов, секунды."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows: int, repeat: int) -> dict[str, float]:
+    content = generate_csv(rows)
+
+    df = read_csv_to_dataframe(content)
+    logger.info("Сгенерировано %s строк, %s колонок", *df.shape)
+
+    results: dict[str, float] = {}
+    for col, cfg in NUMERIC_COLUMNS.items():
+        results[col] = timed(lambda: clean_numeric_series(df[col], cfg["default"], cfg["dtype"]), repeat)
+        logger.info("%-25s %-8s %8.1f ms", col, df[col].dtype, results[col] * 1000)
+
+    results["NUMERIC_COLUMNS"] = timed(lambda: normalize_columns(df.copy(), NUMERIC_COLUMNS, numeric=True), repeat)
+    logger.info("%-25s %-8s %8.1f ms", "NUMERIC_COLUMNS (всего)", "", results["NUMERIC_COLUMNS"] * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Число строк в сгенерированном файле")
+    parser.add_argument("--repeat", type=int, default=3, help="Число повторов, берётся лучшее время")
+    args = parser.parse_args()
+
+    run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
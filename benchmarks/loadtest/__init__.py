@@ -0,0 +1,19 @@
+"""Нагрузочный тест router с локальными заменителями сервисов: python -m benchmarks.loadtest --help."""
+
+# Пользователь, которого заменитель auth создаёт для генератора нагрузки
+LOADTEST_EMAIL = "loadtest@example.com"
+LOADTEST_PASSWORD = "loadtest-password"
+
+# Окружение процессов заменителей и router: значения-заглушки для обязательных настроек и общий
+# JWT-секрет; plaintext-хэш паролей, чтобы стоимость входа задавалась задержкой заменителя, а не bcrypt
+STUB_ENV = {
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_NAME": "loadtest",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "JWT_SECRET_KEY": "loadtest-secret",
+    "PASSWORD_HASH_ALGORITHM": "plaintext",
+}
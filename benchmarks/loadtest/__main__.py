@@ -0,0 +1,345 @@
+"""
+Нагрузочный тест router с локальными заменителями downstream-сервисов.
+
+Поднимает заменители auth, data_interface и prediction (benchmarks/loadtest/stubs.py)
+с заданной задержкой и долей отказов, запускает router на них и подаёт открытый поток
+запросов с частотой --rps на /auth/login, /data/fetch-forecast и /prediction/run-prediction
+в пропорции --mix. Запросы отправляются по расписанию, не дожидаясь ответов на предыдущие,
+а задержка считается от запланированного момента отправки: замедление router видно
+в перцентилях, а не скрывается снижением фактической частоты.
+
+Отчёт по каждому маршруту: число запросов, ошибки по статусам и исключениям, p50/p95/p99
+и фактическая пропускная способность. С --output отчёт пишется в JSON; с --baseline
+p95 сравнивается с ранее сохранённым отчётом, рост больше --threshold считается регрессией
+и команда завершается с кодом 1.
+
+Запуск (из корня репозитория):
+    python -m benchmarks.loadtest --rps 200 --duration 30 --output loadtest.json
+    python -m benchmarks.loadtest --rps 200 --duration 30 --baseline loadtest.json
+    python -m benchmarks.loadtest --router-url http://localhost:8000 --rps 50  # уже запущенный router
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.loadtest import LOADTEST_EMAIL, LOADTEST_PASSWORD, STUB_ENV
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ("login", "forecast", "prediction")
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies_ms)
+        total = len(ordered)
+        return {
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "errors_by_kind": dict(self.errors),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": percentile(ordered, 0.50),
+            "p95_ms": percentile(ordered, 0.95),
+            "p99_ms": percentile(ordered, 0.99),
+            "max_ms": round(ordered[-1], 3) if ordered else None,
+        }
+
+
+def percentile(ordered: list[float], q: float) -> float | None:
+    """Перцентиль методом ближайшего ранга по отсортированной выборке."""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(len(ordered) * q))
+    return round(ordered[rank - 1], 3)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """'login=1,forecast=8,prediction=1' → веса маршрутов."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Неизвестный маршрут {name!r}, допустимы: {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("Сумма весов --mix должна быть больше нуля")
+    return mix
+
+
+class LoadGenerator:
+    """Открытый поток запросов к router с общим клиентом и cookie access_token из /auth/login."""
+
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.names = list(args.mix)
+        self.weights = [args.mix[name] for name in self.names]
+
+    async def login(self) -> httpx.Response:
+        return await self.client.post(
+            "/auth/login", json={"email": LOADTEST_EMAIL, "password": LOADTEST_PASSWORD}
+        )
+
+    def request(self, name: str):
+        # Разные отели и даты, чтобы одинаковые запросы не объединялись router в один вызов downstream
+        hotel_id = self.random.randint(1, self.args.hotels)
+        target_date = (date(2025, 1, 1) + timedelta(days=self.random.randrange(365))).isoformat()
+
+        if name == "login":
+            return self.login()
+        if name == "forecast":
+            return self.client.post(
+                "/data/fetch-forecast",
+                headers={"X-Hotel-Id": str(hotel_id)},
+                json={"target_date": target_date, "horizon": 14, "history_window": 30, "has_deposit": False},
+            )
+        return self.client.post(
+            "/prediction/run-prediction",
+            json={"hotel_id": hotel_id, "target_date": target_date, "has_deposit": False},
+        )
+
+    async def _send(self, name: str, scheduled: float, stats: EndpointStats | None) -> None:
+        try:
+            response = await self.request(name)
+            error = None if response.status_code < 400 else str(response.status_code)
+        except httpx.HTTPError as exc:
+            error = type(exc).__name__
+        if stats is None:
+            return
+        stats.latencies_ms.append((time.perf_counter() - scheduled) * 1000)
+        if error is not None:
+            stats.errors[error] += 1
+
+    async def run(self, rps: float, duration: float, record: bool) -> tuple[dict[str, EndpointStats], float]:
+        stats = {name: EndpointStats() for name in self.names}
+        tasks = []
+        start = time.perf_counter()
+
+        for i in range(int(rps * duration)):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = self.random.choices(self.names, self.weights)[0]
+            tasks.append(asyncio.create_task(self._send(name, scheduled, stats[name] if record else None)))
+
+        await asyncio.gather(*tasks)
+        return stats, time.perf_counter() - start
+
+
+def spawn(args: list[str], env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], env={**os.environ, **env})
+
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Сервис {url} не поднялся за {timeout:.0f} с")
+                await asyncio.sleep(0.2)
+
+
+def start_services(args: argparse.Namespace) -> list[subprocess.Popen]:
+    """Процесс заменителей и процесс router, настроенный на них."""
+    stub_url = f"http://{args.host}"
+    stubs = spawn(
+        [
+            "-m", "benchmarks.loadtest.stubs",
+            "--host", args.host,
+            "--auth-port", str(args.base_port + 2),
+            "--data-interface-port", str(args.base_port + 3),
+            "--prediction-port", str(args.base_port + 1),
+            "--hotels", str(args.hotels),
+            "--latency-ms", str(args.latency_ms),
+            "--jitter-ms", str(args.jitter_ms),
+            "--failure-rate", str(args.failure_rate),
+            "--seed", str(args.seed),
+        ],
+        env=STUB_ENV,
+    )
+    router = spawn(
+        [
+            "-m", "uvicorn", "router.main:app",
+            "--host", args.host,
+            "--port", str(args.base_port),
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        env={
+            **STUB_ENV,
+            "PREDICTION_SERVICE_URL": f"{stub_url}:{args.base_port + 1}",
+            "AUTH_SERVICE_URL": f"{stub_url}:{args.base_port + 2}",
+            "DATA_INTERFACE_SERVICE_URL": f"{stub_url}:{args.base_port + 3}",
+            "RATE_LIMIT_ENABLED": str(args.rate_limit).lower(),
+        },
+    )
+    return [stubs, router]
+
+
+def stop_services(processes: list[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Сравнивает p95 маршрутов с базовыми; возвращает маршруты с регрессией."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get("p95_ms") or current["p95_ms"] is None:
+            logger.info("%-12s p95 %s ms  (нет в базовом файле)", name, current["p95_ms"])
+            continue
+
+        ratio = current["p95_ms"] / base["p95_ms"]
+        if ratio > 1 + threshold:
+            status = "РЕГРЕССИЯ"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "ускорение"
+        else:
+            status = "без изменений"
+        logger.info(
+            "%-12s p95 %9.3f ms  база %9.3f ms  x%.2f  ошибки %s (база %s)  %s",
+            name, current["p95_ms"], base["p95_ms"], ratio, current["errors"], base["errors"], status,
+        )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    processes = [] if args.router_url else start_services(args)
+    base_url = args.router_url or f"http://{args.host}:{args.base_port}"
+    try:
+        await wait_ready(f"{base_url}/metrics")
+        if processes:
+            await wait_ready(f"http://{args.host}:{args.base_port + 2}/docs")
+        limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            generator = LoadGenerator(client, args)
+            response = await generator.login()
+            if response.status_code != 200:
+                raise RuntimeError(f"Вход не выполнен: {response.status_code} {response.text}")
+
+            if args.warmup > 0:
+                await generator.run(args.rps, args.warmup, record=False)
+            stats, elapsed = await generator.run(args.rps, args.duration, record=True)
+    finally:
+        stop_services(processes)
+
+    results = {name: endpoint.summary(elapsed) for name, endpoint in stats.items()}
+    all_latencies = EndpointStats(
+        latencies_ms=[value for endpoint in stats.values() for value in endpoint.latencies_ms],
+        errors=sum((endpoint.errors for endpoint in stats.values()), Counter()),
+    )
+    results["total"] = all_latencies.summary(elapsed)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "router_url": base_url,
+            "external_router": bool(args.router_url),
+            "rps": args.rps,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "hotels": args.hotels,
+            "connections": args.connections,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "failure_rate": args.failure_rate,
+            "rate_limit": args.rate_limit,
+            "seed": args.seed,
+            "elapsed_s": round(elapsed, 3),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=100, help="Целевая частота запросов в секунду")
+    parser.add_argument("--duration", type=float, default=20, help="Длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=3, help="Прогрев без записи результатов, с")
+    parser.add_argument("--mix", type=parse_mix, default="login=1,forecast=8,prediction=1")
+    parser.add_argument("--hotels", type=int, default=10)
+    parser.add_argument("--connections", type=int, default=200, help="Пул соединений генератора к router")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--router-url", help="Нагружать уже запущенный router вместо локального")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=18100, help="Порт router; заменители — следующие три")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Задержка ответа заменителей")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="Стандартное отклонение задержки")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Доля ответов 503 заменителей")
+    parser.add_argument("--rate-limit", action="store_true", help="Не отключать лимиты запросов router")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="JSON-файл для отчёта")
+    parser.add_argument("--baseline", type=Path, help="JSON-файл предыдущего запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Допустимый рост p95 (доля)")
+    args = parser.parse_args()
+
+    # httpx пишет INFO на каждый запрос
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = asyncio.run(run(args))
+    results = report["results"]
+
+    for name, summary in results.items():
+        logger.info(
+            "%-12s %6d запросов  %8.2f rps  p50 %s  p95 %s  p99 %s ms  ошибки %d %s",
+            name, summary["requests"], summary["throughput_rps"], summary["p50_ms"],
+            summary["p95_ms"], summary["p99_ms"], summary["errors"], summary["errors_by_kind"] or "",
+        )
+    if results["total"]["throughput_rps"] < args.rps * 0.95:
+        logger.warning("Фактическая частота ниже целевой: генератор или router не успевают")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info("Отчёт записан в %s", args.output)
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if {key: baseline["meta"].get(key) for key in ("rps", "mix", "latency_ms", "failure_rate")} != {
+            key: report["meta"][key] for key in ("rps", "mix", "latency_ms", "failure_rate")
+        }:
+            logger.warning("Параметры нагрузки отличаются от базового запуска: сравнение приблизительное")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            logger.error("Регрессии p95 (> %.0f%%): %s", args.threshold * 100, ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Локальные заменители downstream-сервисов для нагрузочного теста router.
+
+- auth — настоящее приложение auth_service (маршруты, схемы, cookies) с fake-репозиториями и
+  fake JWT-сервисом из tests/auth_service/faces; access-токен подписывается по-настоящему,
+  чтобы router проверял его как в продакшене. Пароли хранятся схемой plaintext (см. STUB_ENV).
+- data_interface — POST /forecast/fetch с синтетической историей и прогнозом.
+- prediction — POST /run-predict с синтетическим прогнозом.
+
+Каждое приложение оборачивается FaultInjectionMiddleware: задержка (с разбросом) и доля ответов 503.
+
+Запуск отдельно (например, для router, запущенного вручную):
+    python -m benchmarks.loadtest.stubs --auth-port 18102 --data-interface-port 18103 --prediction-port 18101 \\
+        --latency-ms 20 --jitter-ms 5 --failure-rate 0.01
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+from datetime import timedelta
+
+from benchmarks.loadtest import LOADTEST_EMAIL, LOADTEST_PASSWORD, STUB_ENV
+
+# Настройки сервисов читаются из окружения при импорте их модулей
+for _name, _value in STUB_ENV.items():
+    os.environ.setdefault(_name, _value)
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Header  # noqa: E402
+from starlette.types import ASGIApp, Receive, Scope, Send  # noqa: E402
+
+from auth_service.api.dependencies import get_token_auth_service, get_uow  # noqa: E402
+from auth_service.main import create_app  # noqa: E402
+from auth_service.schemas.auth import HotelPrincipal  # noqa: E402
+from auth_service.schemas.token import TokenAccessPayload, TokenType  # noqa: E402
+from auth_service.services.token.jwt_provider import JWTProvider  # noqa: E402
+from auth_service.utils.password import hash_password  # noqa: E402
+from data_interface_service.schemas import ForecastDay, ForecastRequest, ForecastResponse  # noqa: E402
+from prediction_service.schemas import PredictDay, PredictRequest, PredictResponse  # noqa: E402
+from shared.responses import FastJSONResponse  # noqa: E402
+from tests.auth_service.faces.jwt_auth_service import FakeJWTAuthService  # noqa: E402
+from tests.auth_service.faces.repositories import (  # noqa: E402
+    FakeUser,
+    FakeUserHotel,
+    FakeUserHotelRepository,
+    FakeUserRepository,
+)
+from tests.auth_service.faces.unit_of_work import FakeUnitOfWork  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+class FaultInjectionMiddleware:
+    """ASGI middleware: задержка каждого ответа и доля отказов 503 (seed делает прогон воспроизводимым)."""
+
+    def __init__(self, app: ASGIApp, latency_ms: float, jitter_ms: float, failure_rate: float, seed: int):
+        self.app = app
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        delay = max(0.0, self.random.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if self.random.random() < self.failure_rate:
+            response = FastJSONResponse(
+                {"error": {"type": "StubFailure", "message": "Отказ, внесённый заменителем сервиса"}},
+                status_code=503,
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+class StubJWTAuthService(FakeJWTAuthService):
+    """Fake JWT-сервис из тестов auth_service, выдающий настоящий access JWT вместо строки-заглушки."""
+
+    def __init__(self):
+        super().__init__()
+        self._provider = JWTProvider()
+
+    async def generate_tokens(self, principal: HotelPrincipal) -> tuple[str, str]:
+        access = self._provider.create_access_token(TokenAccessPayload(
+            sub=str(principal.user_id),
+            token_type=TokenType.ACCESS.value,
+            system_role=principal.system_role.value,
+            hotels=principal.hotels,
+        ))
+        return access, "refresh-token"
+
+
+def build_auth_stub(hotels: int) -> FastAPI:
+    """auth_service с пользователем LOADTEST_EMAIL, владеющим отелями 1..hotels."""
+    uow = FakeUnitOfWork(
+        users=FakeUserRepository(users={
+            1: FakeUser(
+                id=1,
+                name="Load",
+                surname="Test",
+                email=LOADTEST_EMAIL,
+                hashed_password=hash_password(LOADTEST_PASSWORD),
+            )
+        }),
+        users_hotels=FakeUserHotelRepository(
+            links=[FakeUserHotel(user_id=1, hotel_id=hotel_id, role="owner") for hotel_id in range(1, hotels + 1)]
+        ),
+    )
+    auth_service = StubJWTAuthService()
+
+    app = create_app()
+    app.dependency_overrides[get_uow] = lambda: uow
+    app.dependency_overrides[get_token_auth_service] = lambda: auth_service
+    return app
+
+
+def build_data_interface_stub() -> FastAPI:
+    app = FastAPI(title="Data Interface stub")
+
+    @app.post("/forecast/fetch", response_model=ForecastResponse)
+    async def fetch(req: ForecastRequest, x_hotel_id: int = Header(..., alias="X-Hotel-Id")):
+        history_start = req.target_date - timedelta(days=req.history_window)
+        return ForecastResponse(
+            hotel_id=x_hotel_id,
+            history_summary=[
+                ForecastDay(day=history_start + timedelta(days=i), bookings=40 + i % 7, cancellations=4)
+                for i in range(req.history_window)
+            ],
+            forecast=[
+                ForecastDay(day=req.target_date + timedelta(days=i), bookings=42 + i % 5, cancellations=5)
+                for i in range(req.horizon)
+            ],
+        )
+
+    return app
+
+
+def build_prediction_stub() -> FastAPI:
+    app = FastAPI(title="Prediction stub")
+
+    @app.post("/run-predict", response_model=PredictResponse, response_model_exclude_none=True)
+    async def run_predict(req: PredictRequest):
+        return PredictResponse(
+            hotel_id=req.hotel_id,
+            target_date=req.target_date,
+            forecast=[
+                PredictDay(day=req.target_date + timedelta(days=i), bookings=42 + i % 5, cancellations=5)
+                for i in range(30)
+            ],
+        )
+
+    return app
+
+
+def with_faults(app: FastAPI, args: argparse.Namespace, seed_offset: int) -> ASGIApp:
+    return FaultInjectionMiddleware(
+        app,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        seed=args.seed + seed_offset,
+    )
+
+
+async def serve(args: argparse.Namespace) -> None:
+    apps = {
+        args.auth_port: with_faults(build_auth_stub(args.hotels), args, 0),
+        args.data_interface_port: with_faults(build_data_interface_stub(), args, 1),
+        args.prediction_port: with_faults(build_prediction_stub(), args, 2),
+    }
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=args.host, port=port, log_level="warning", access_log=False))
+        for port, app in apps.items()
+    ]
+    logger.info("Заменители сервисов: %s", ", ".join(f"{args.host}:{port}" for port in apps))
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--auth-port", type=int, default=18102)
+    parser.add_argument("--data-interface-port", type=int, default=18103)
+    parser.add_argument("--prediction-port", type=int, default=18101)
+    parser.add_argument("--hotels", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(build_parser().parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Бенчмарки prediction_service на синтетических данных: python -m benchmarks.prediction --help."""
@@ -0,0 +1,253 @@
+"""
+Бенчмарк горячего пути prediction_service на синтетических данных (без БД).
+
+Генерирует бронирования, погоду и праздники для hotels × years × bookings-per-day
+(benchmarks/prediction/synthetic.py) и замеряет этапы прогноза и обучения:
+preprocess_data, aggregate_historical_features, normalize_data, aggregate_forecast_inputs,
+create_sequences, denormalize_forecast и прямой проход GRUForecaster для каждого сочетания
+размера батча и числа потоков torch. Используются артефакты модели отеля --model-hotel-id
+(энкодеры, scaler, веса) из prediction_service/models.
+
+Результаты (медиана, минимум и p90 в мс) пишутся в JSON. С --baseline результаты сравниваются
+с ранее сохранённым файлом: медиана хуже базовой больше чем на --threshold считается регрессией,
+и команда завершается с кодом 1.
+
+Запуск (из корня репозитория):
+    python -m benchmarks.prediction --hotels 2 --years 3 --bookings-per-day 80 --output bench_prediction.json
+    python -m benchmarks.prediction --hotels 2 --years 3 --bookings-per-day 80 --baseline bench_prediction.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import torch
+
+from benchmarks.prediction.synthetic import generate_hotel, load_categories
+from prediction_service.core.forecast import aggregate_forecast_inputs
+from prediction_service.core.model_loader import load_model_and_config
+from prediction_service.preprocessing.preprocessor import (
+    add_derived_features,
+    aggregate_historical_features,
+    drop_irrelevant_columns,
+    encode_categorical_features,
+    enforce_numeric_types,
+    preprocess_data,
+    preprocess_dates,
+)
+from prediction_service.preprocessing.scaling import denormalize_forecast, normalize_data
+from prediction_service.preprocessing.sequencing import create_sequences
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Целевая колонка для create_sequences: в дневном кадре прогноза нет bookings, берём лаг прошлого года
+SEQUENCE_TARGET = "bookings_last_year"
+
+
+def measure(call: Callable[[Any], Any], setup: Callable[[], Any], repeat: int) -> list[float]:
+    """Время call(setup()) в миллисекундах; setup (копия входных данных) не входит в замер."""
+    samples = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        call(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 3),
+        "runs": len(ordered),
+    }
+
+
+def prepare_for_aggregation(df: pd.DataFrame, model_hotel_id: int) -> pd.DataFrame:
+    """Шаги preprocess_data до aggregate_historical_features."""
+    df = drop_irrelevant_columns(df)
+    df = enforce_numeric_types(df)
+    df = encode_categorical_features(df, model_hotel_id)
+    df = preprocess_dates(df)
+    return add_derived_features(df)
+
+
+def bench_data_stages(frames: list[pd.DataFrame], config: dict, model_hotel_id: int, repeat: int) -> dict:
+    """Этапы подготовки данных; замеры всех отелей объединяются в одну выборку на этап."""
+    samples: dict[str, list[float]] = {}
+
+    def record(name: str, call, setup) -> None:
+        samples.setdefault(name, []).extend(measure(call, setup, repeat))
+
+    horizon = config["forecast_horizon"]
+    rng = np.random.default_rng(0)
+
+    for frame in frames:
+        record("preprocess_data", lambda df: preprocess_data(df, model_hotel_id), frame.copy)
+
+        prepared = prepare_for_aggregation(frame.copy(), model_hotel_id)
+        record("aggregate_historical_features", aggregate_historical_features, prepared.copy)
+
+        processed = preprocess_data(frame.copy(), model_hotel_id)
+        record("normalize_data", lambda df: normalize_data(df, model_hotel_id), lambda: processed)
+
+        normalized = normalize_data(processed, model_hotel_id)
+        record("aggregate_forecast_inputs", aggregate_forecast_inputs, lambda: normalized)
+
+        daily = aggregate_forecast_inputs(normalized).sort_values("arrival_date")
+        record(
+            "create_sequences",
+            lambda df: create_sequences(df, config["numeric_features"], SEQUENCE_TARGET, horizon),
+            lambda: daily,
+        )
+
+        record(
+            "denormalize_forecast",
+            lambda y_pred: denormalize_forecast(y_pred, model_hotel_id),
+            lambda: rng.random((horizon, config["output_dims"])),
+        )
+
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def bench_forward(model, config: dict, batch_sizes: list[int], threads: list[int], repeat: int) -> dict:
+    """Прямой проход GRUForecaster на случайных входах [batch, horizon, признаки]."""
+    horizon = config["forecast_horizon"]
+    embedding_sizes = {name: int(size[0]) for name, size in config["embedding_sizes"].items()}
+    initial_threads = torch.get_num_threads()
+    results = {}
+
+    try:
+        for thread_count in threads:
+            torch.set_num_threads(thread_count)
+            for batch in batch_sizes:
+                x_numeric = torch.rand(batch, horizon, config["num_numeric_features"])
+                x_cat = {
+                    name: torch.randint(0, size, (batch, horizon))
+                    for name, size in embedding_sizes.items()
+                }
+
+                def forward(_):
+                    with torch.no_grad():
+                        model(x_numeric, x_cat)
+
+                forward(None)  # прогрев
+                results[f"gru_forward[batch={batch},threads={thread_count}]"] = summarize(
+                    measure(forward, lambda: None, repeat)
+                )
+    finally:
+        torch.set_num_threads(initial_threads)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Сравнивает медианы с базовыми; возвращает имена замеров с регрессией."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            logger.info("%-45s %10.3f ms  (нет в базовом файле)", name, current["median_ms"])
+            continue
+
+        ratio = current["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "РЕГРЕССИЯ"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "ускорение"
+        else:
+            status = "без изменений"
+        logger.info(
+            "%-45s %10.3f ms  база %10.3f ms  x%.2f  %s",
+            name, current["median_ms"], base["median_ms"], ratio, status,
+        )
+
+    for name in sorted(baseline.keys() - results.keys()):
+        logger.info("%-45s отсутствует в текущем запуске", name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotels", type=int, default=2)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--bookings-per-day", type=float, default=50)
+    parser.add_argument("--model-hotel-id", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="JSON-файл для результатов")
+    parser.add_argument("--baseline", type=Path, help="JSON-файл предыдущего запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Допустимое замедление медианы (доля)")
+    args = parser.parse_args()
+
+    # Функции предобработки пишут INFO на каждый вызов
+    logging.getLogger("prediction_service").setLevel(logging.WARNING)
+
+    model, config = load_model_and_config(args.model_hotel_id)
+    categories = load_categories(args.model_hotel_id)
+
+    hotels = [
+        generate_hotel(hotel_id, args.years, args.bookings_per_day, categories, args.seed)
+        for hotel_id in range(1, args.hotels + 1)
+    ]
+    frames = [hotel.model_frame() for hotel in hotels]
+    logger.info("Синтетические данные: %s строк бронирований по отелям", [len(frame) for frame in frames])
+
+    results = bench_data_stages(frames, config, args.model_hotel_id, args.repeat)
+    results |= bench_forward(model, config, args.batch_sizes, args.threads, args.repeat)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "hotels": args.hotels,
+            "years": args.years,
+            "bookings_per_day": args.bookings_per_day,
+            "rows_per_hotel": [len(frame) for frame in frames],
+            "model_hotel_id": args.model_hotel_id,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    if args.baseline is None:
+        for name, summary in results.items():
+            logger.info("%-45s %10.3f ms  (min %.3f, p90 %.3f)", name, summary["median_ms"], summary["min_ms"], summary["p90_ms"])
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info("Результаты записаны в %s", args.output)
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["meta"].get("rows_per_hotel") != report["meta"]["rows_per_hotel"]:
+            logger.warning("Размер данных отличается от базового запуска: сравнение приблизительное")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            logger.error("Регрессии (> %.0f%%): %s", args.threshold * 100, ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Синтетические бронирования, погода и праздники для бенчмарков prediction_service.
+
+Кадры повторяют то, что process_inputs_for_model получает из shared.data_loader:
+бронирования с колонками Booking, погода (date, temp_avg) и праздники (date, holiday_name).
+Категории берутся из энкодеров модели, поэтому preprocess_data принимает данные без ошибок.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from prediction_service.preprocessing.preprocessor import ENCODING_MAP, load_encoder
+
+START_DATE = date(2015, 1, 1)
+
+# Праздники (месяц, день), повторяющиеся каждый год
+HOLIDAYS = [(1, 1), (1, 7), (2, 23), (3, 8), (5, 1), (5, 9), (6, 12), (11, 4), (12, 31)]
+
+
+@dataclass
+class SyntheticHotel:
+    hotel_id: int
+    is_city_hotel: bool
+    bookings: pd.DataFrame
+    weather: pd.DataFrame
+    holidays: pd.DataFrame
+
+    def model_frame(self) -> pd.DataFrame:
+        """Объединённый кадр, как в process_inputs_for_model перед preprocess_data."""
+        df = self.bookings.merge(
+            self.weather, left_on="arrival_date", right_on="date", how="left", suffixes=("", "_weather")
+        )
+        df["is_holiday"] = df["arrival_date"].isin(self.holidays["date"]).astype(int)
+        df["is_city_hotel"] = int(self.is_city_hotel)
+        return df
+
+
+def load_categories(model_hotel_id: int) -> dict[str, list[str]]:
+    """Допустимые значения категориальных колонок — классы энкодеров модели отеля."""
+    return {
+        column: [str(value) for value in load_encoder(encoder, model_hotel_id).classes_]
+        for encoder, column in ENCODING_MAP.items()
+    }
+
+
+def generate_hotel(
+    hotel_id: int,
+    years: int,
+    bookings_per_day: float,
+    categories: dict[str, list[str]],
+    seed: int = 0,
+) -> SyntheticHotel:
+    """
+    Бронирования за years лет: число заездов в день — пуассоновское со средним bookings_per_day
+    с годовой и недельной сезонностью; признаки бронирований — правдоподобные распределения.
+    """
+    rng = np.random.default_rng(seed + hotel_id)
+    days = pd.date_range(START_DATE, periods=years * 365, freq="D")
+
+    day_of_year = days.dayofyear.to_numpy()
+    season = 1 + 0.35 * np.sin(2 * np.pi * (day_of_year - 100) / 365)
+    weekly = np.where(days.dayofweek.to_numpy() >= 4, 1.15, 0.95)
+    per_day = rng.poisson(bookings_per_day * season * weekly)
+
+    arrival = np.repeat(days.to_numpy(), per_day)
+    n = len(arrival)
+    lead_time = rng.gamma(shape=1.5, scale=60, size=n).astype(int)
+
+    bookings = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "hotel_id": hotel_id,
+        "arrival_date": arrival,
+        "lead_time": lead_time,
+        "adr": np.round(rng.normal(100 * np.repeat(season, per_day), 20).clip(0), 2),
+        "total_guests": rng.integers(1, 5, size=n),
+        "total_nights": rng.integers(1, 11, size=n),
+        "booking_changes": rng.poisson(0.2, size=n),
+        "has_deposit": rng.random(n) < 0.15,
+        "is_cancellation": rng.random(n) < 0.3,
+        "market_segment": rng.choice(categories["market_segment"], size=n),
+        "distribution_channel": rng.choice(categories["distribution_channel"], size=n),
+        "reserved_room_type": rng.choice(categories["reserved_room_type"], size=n),
+    })
+    bookings["day_of_week"] = bookings["arrival_date"].dt.dayofweek
+
+    weather = pd.DataFrame({
+        "date": days,
+        "temp_avg": np.round(10 + 12 * np.sin(2 * np.pi * (day_of_year - 110) / 365) + rng.normal(0, 3, len(days)), 1),
+    })
+
+    holidays = pd.DataFrame(
+        [
+            {"date": pd.Timestamp(year, month, day), "holiday_name": f"holiday_{month:02d}_{day:02d}"}
+            for year in range(START_DATE.year, START_DATE.year + years + 1)
+            for month, day in HOLIDAYS
+        ]
+    )
+
+    return SyntheticHotel(
+        hotel_id=hotel_id,
+        is_city_hotel=bool(hotel_id % 2),
+        bookings=bookings,
+        weather=weather,
+        holidays=holidays,
+    )
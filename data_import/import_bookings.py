@@ -10,6 +10,8 @@ from datetime import date
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from shared.booking_partitions import ensure_partitions_for_bookings
+from shared.booking_rollup import rebuild_booking_rollup
 from shared.db_models import Booking, Hotel
 from shared.db import AsyncSessionLocal
 
@@ -89,6 +91,7 @@ async def load_bookings_from_csv(csv_path: str, session: AsyncSession) -> int:
             )
         )
 
+    await ensure_partitions_for_bookings(session, bookings)
     session.add_all(bookings)
     await session.commit()
     return len(bookings)
@@ -119,6 +122,8 @@ async def main() -> None:
     async with AsyncSessionLocal() as session:
         count = await load_bookings_from_csv(csv_path, session)
         await assign_booking_refs(session)
+        await rebuild_booking_rollup(session)
+        await session.commit()
         print(f"Загружено {count} записей из {csv_path}")
 
 
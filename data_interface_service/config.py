@@ -1,11 +1,56 @@
+from typing import Literal
+
 from pydantic import Field
+from pydantic_settings import SettingsConfigDict
 
 from shared.base_config import ConfigBase
 from shared.db_config import DatabaseConfig
 
 
+class CSVPreparationConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="CSV_PREPARATION_")
+
+    # thread — пул потоков event loop, process — отдельные процессы (GIL не блокируется)
+    backend: Literal["thread", "process"] = "process"
+    workers: int = Field(2, ge=1)
+    max_concurrent: int = Field(2, ge=1)
+    # Предел распакованного размера gzip/zstd-загрузок (защита от архивов-бомб)
+    max_decompressed_bytes: int = Field(1024 ** 3, ge=1)
+
+
+class RedisConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="REDIS_")
+
+    host: str
+    port: int
+    # Кэш работает в режиме fail-open: недоступный Redis не должен задерживать запросы
+    socket_timeout: float = Field(0.5, gt=0)
+
+
+class ForecastCacheConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="FORECAST_CACHE_")
+
+    enabled: bool = True
+    ttl_seconds: int = Field(3600, ge=1)
+    # Блокировка пересчёта: остальные запросы ждут результат до lock_wait_seconds
+    lock_ttl_seconds: int = Field(10, ge=1)
+    lock_wait_seconds: float = Field(2.0, ge=0)
+    poll_interval_seconds: float = Field(0.05, gt=0)
+
+
+class ExportConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="EXPORT_")
+
+    # Размер пачки серверного курсора: определяет память на один поток экспорта
+    batch_size: int = Field(10_000, ge=1)
+
+
 class DataInterfaceConfig(ConfigBase):
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    csv_preparation: CSVPreparationConfig = Field(default_factory=CSVPreparationConfig)
+    redis: RedisConfig = Field(default_factory=RedisConfig)
+    forecast_cache: ForecastCacheConfig = Field(default_factory=ForecastCacheConfig)
+    export: ExportConfig = Field(default_factory=ExportConfig)
 
 
-data_interface_config = DataInterfaceConfig()
\ No newline at end of file
+data_interface_config = DataInterfaceConfig()
@@ -1,15 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from data_interface_service.routers.booking_router import router as upload_router
 from data_interface_service.routers.forecast_router import router as prediction_router
+from data_interface_service.utils.executors import shutdown_preparation_executor
 from shared.errors import register_error_handlers, setup_openapi_with_errors
+from shared.metrics import add_metrics
+from shared.tracing import traces_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Ожидание завершения воркеров не должно блокировать event loop
+    await asyncio.to_thread(shutdown_preparation_executor)
+
 
-app = FastAPI(title="Data Interface Service API")
+app = FastAPI(title="Data Interface Service API", lifespan=lifespan)
 
-register_error_handlers(app)
+register_error_handlers(app, service="data_interface")
 setup_openapi_with_errors(app)
+add_metrics(app)
 
 app.include_router(upload_router, prefix="/booking")
 app.include_router(prediction_router, prefix="/forecast")
+app.include_router(traces_router)
 
 
 @app.get("/")
@@ -2,14 +2,22 @@ import logging
 from fastapi import APIRouter, File, UploadFile, Depends, Header, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from data_interface_service.services.booking_service import import_bookings_from_csv, save_bookings_to_db
+from data_interface_service.services.booking_service import (
+    bulk_save_bookings,
+    import_bookings_from_columnar,
+    import_bookings_from_csv,
+    save_bookings_to_db,
+)
+from data_interface_service.services.forecast_cache import ForecastCache, get_forecast_cache
 from data_interface_service.schemas import BookingImportResponse
+from data_interface_service.utils.mapping import map_has_deposit
 from shared.db import get_async_session
 from shared.db_models import Hotel
 from shared.errors import (
     register_errors,
     AuthorizationError,
     CSVProcessingError,
+    ColumnarFormatError,
     ConflictError,
     DatabaseError,
     MappingError
@@ -33,10 +41,14 @@ router = APIRouter()
 async def import_bookings(
     file: UploadFile = File(...),
     x_hotel_id: int = Header(...),
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_async_session),
+    cache: ForecastCache | None = Depends(get_forecast_cache),
 ) -> BookingImportResponse:
     """
     Загружает CSV-файл бронирований, валидирует и сохраняет записи в базу.
+    Файл может быть сжат gzip или zstd: сжатие определяется по сигнатуре
+    (Content-Encoding или Content-Type части проверяются на соответствие), распаковка идёт потоком.
+    После сохранения инвалидирует кэш прогнозов отеля для затронутых значений депозита.
     """
     logger.info("Получен файл бронирований от hotel_id=%s: %s", x_hotel_id, file.filename)
 
@@ -44,11 +56,12 @@ async def import_bookings(
     if not hotel:
         raise AuthorizationError()
 
-    content = (await file.read()).decode("utf-8")
+    content = await file.read()
     bookings, duplicates_skipped = await import_bookings_from_csv(
         content=content,
         hotel_id=hotel.id,
-        db=db
+        db=db,
+        content_encoding=file.headers.get("content-encoding") or file.content_type,
     )
     added = await save_bookings_to_db(
         db=db,
@@ -56,6 +69,9 @@ async def import_bookings(
         hotel_id=hotel.id,
     )
 
+    if cache is not None and added:
+        await cache.invalidate(hotel.id, {map_has_deposit(row["has_deposit"]) for row in bookings})
+
     logger.info(
         "Импорт завершён: hotel_id=%s, добавлено=%s, дубликатов=%s",
         x_hotel_id, added, duplicates_skipped
@@ -66,3 +82,58 @@ async def import_bookings(
         added=added,
         duplicates_skipped=duplicates_skipped,
     )
+
+
+@router.post(
+    "/import-columnar",
+    response_model=BookingImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Импорт бронирований из Parquet или Arrow IPC",
+    response_description="Возвращает количество добавленных и пропущенных записей",
+)
+@register_errors(
+    AuthorizationError, ColumnarFormatError,
+    ConflictError, DatabaseError
+)
+async def import_bookings_columnar(
+    file: UploadFile = File(...),
+    x_hotel_id: int = Header(...),
+    db: AsyncSession = Depends(get_async_session),
+    cache: ForecastCache | None = Depends(get_forecast_cache),
+) -> BookingImportResponse:
+    """
+    Загружает типизированный файл бронирований (Parquet, Arrow IPC file/stream).
+    Формат определяется по сигнатуре, схема проверяется до конвертации данных,
+    строки сохраняются bulk-вставкой без построчного маппинга в ORM.
+    """
+    logger.info("Получен колоночный файл бронирований от hotel_id=%s: %s", x_hotel_id, file.filename)
+
+    hotel = await db.get(Hotel, x_hotel_id)
+    if not hotel:
+        raise AuthorizationError()
+
+    content = await file.read()
+    columns, duplicates_skipped = await import_bookings_from_columnar(
+        content=content,
+        hotel_id=hotel.id,
+        db=db
+    )
+    added = await bulk_save_bookings(
+        db=db,
+        columns=columns,
+        hotel_id=hotel.id,
+    )
+
+    if cache is not None and added:
+        await cache.invalidate(hotel.id, columns["has_deposit"].tolist())
+
+    logger.info(
+        "Колоночный импорт завершён: hotel_id=%s, добавлено=%s, дубликатов=%s",
+        x_hotel_id, added, duplicates_skipped
+    )
+
+    return BookingImportResponse(
+        hotel_id=x_hotel_id,
+        added=added,
+        duplicates_skipped=duplicates_skipped,
+    )
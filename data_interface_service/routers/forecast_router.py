@@ -1,9 +1,34 @@
 import logging
-from fastapi import APIRouter, Depends, Header, status
+from datetime import date
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from data_interface_service.schemas import ForecastRequest, ForecastResponse
-from data_interface_service.services.forecast_service import get_history, get_forecast
+from data_interface_service.config import data_interface_config
+from data_interface_service.schemas import (
+    BatchForecastRequest,
+    BatchForecastResponse,
+    ForecastCacheStatsResponse,
+    ForecastRequest,
+    ForecastResponse,
+)
+from data_interface_service.services.export_service import ExportKind, iter_export_batches
+from data_interface_service.services.forecast_cache import ForecastCache, get_forecast_cache
+from data_interface_service.services.forecast_service import (
+    get_batch_history_and_forecast,
+    get_forecast_version,
+    get_history_and_forecast,
+    load_forecast_entry,
+)
+from data_interface_service.utils.etag import etag_matches
+from data_interface_service.utils.export_formats import (
+    ENCODERS,
+    FILE_EXTENSIONS,
+    MEDIA_TYPES,
+    ExportFormat,
+    ensure_format_available,
+)
 from shared.db import get_async_session
 from shared.db_models import Hotel
 from shared.errors import (
@@ -11,6 +36,8 @@ from shared.errors import (
     NoForecastError,
     InsufficientHistoryError,
     DatabaseError,
+    ServiceError,
+    ValidationError,
     register_errors,
 )
 
@@ -18,12 +45,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
 @router.post(
     "/fetch",
     response_model=ForecastResponse,
     status_code=status.HTTP_200_OK,
     summary="Получение истории и прогноза бронирований",
     response_description="Возвращает историю и прогноз по заданным параметрам.",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Данные не изменились с версии из If-None-Match"}},
 )
 @register_errors(
     AuthorizationError, NoForecastError,
@@ -31,40 +63,161 @@ router = APIRouter()
 )
 async def fetch_forecast(
     req: ForecastRequest,
+    response: Response,
     x_hotel_id: int = Header(..., alias="x-hotel-id"),
+    if_none_match: str | None = Header(None, alias="if-none-match"),
     db: AsyncSession = Depends(get_async_session),
-) -> ForecastResponse:
+    cache: ForecastCache | None = Depends(get_forecast_cache),
+) -> ForecastResponse | Response:
     """
     Возвращает историю бронирований и прогноз по заданным параметрам.
-    """
 
-    hotel = await db.get(Hotel, x_hotel_id)
-    if not hotel:
-        raise AuthorizationError()
-
-    history_data = await get_history(
-        db=db,
-        hotel_id=hotel.id,
+    Ответ помечается ETag версии данных; при совпадении If-None-Match возвращается 304.
+    Если кэш включён, готовый ответ берётся из Redis без обращения к БД.
+    """
+    params = dict(
+        hotel_id=x_hotel_id,
         target_date=req.target_date,
         has_deposit=req.has_deposit,
+        horizon=req.horizon,
         history_window=req.history_window,
     )
 
-    forecast_data = await get_forecast(
+    if cache is not None:
+        entry = await cache.get_or_load(**params, loader=lambda: load_forecast_entry(db=db, **params))
+
+        headers = _cache_headers(entry.etag) if entry.etag else None
+        if entry.etag and etag_matches(if_none_match, entry.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    etag = await get_forecast_version(db=db, **params)
+
+    if etag is not None:
+        if etag_matches(if_none_match, etag):
+            logger.info("Прогноз не изменился: hotel_id=%s, etag=%s", x_hotel_id, etag)
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+        response.headers.update(_cache_headers(etag))
+
+    history_data, forecast_data = await get_history_and_forecast(db=db, **params)
+
+    logger.info(
+        "Прогноз успешно получен: hotel_id=%s, history=%s, forecast=%s",
+        x_hotel_id, len(history_data), len(forecast_data)
+    )
+
+    return ForecastResponse(
+        hotel_id=x_hotel_id,
+        history_summary=history_data,
+        forecast=forecast_data,
+    )
+
+
+@router.post(
+    "/fetch-batch",
+    response_model=BatchForecastResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK,
+    summary="Пакетное получение истории и прогноза для нескольких отелей",
+    response_description="Результаты по отелям; ошибки отдельных отелей возвращаются в их записях.",
+)
+@register_errors(DatabaseError)
+async def fetch_forecast_batch(
+    req: BatchForecastRequest,
+    db: AsyncSession = Depends(get_async_session),
+) -> BatchForecastResponse:
+    """
+    Возвращает историю и прогноз для списка отелей с общими параметрами.
+    Доступ к отелям проверяет router по claim hotels access-токена.
+    """
+    hotels = await get_batch_history_and_forecast(
         db=db,
-        hotel_id=hotel.id,
+        hotel_ids=req.hotel_ids,
         target_date=req.target_date,
         has_deposit=req.has_deposit,
         horizon=req.horizon,
+        history_window=req.history_window,
     )
 
     logger.info(
-        "Прогноз успешно получен: hotel_id=%s, history=%s, forecast=%s",
-        hotel.id, len(history_data), len(forecast_data)
+        "Пакетный прогноз получен: отелей=%s, с ошибками=%s",
+        len(hotels), sum(1 for item in hotels.values() if item.error is not None),
     )
+    return BatchForecastResponse(hotels=hotels)
 
-    return ForecastResponse(
-        hotel_id=hotel.id,
-        history_summary=history_data,
-        forecast=forecast_data,
-    )
\ No newline at end of file
+
+@router.get(
+    "/cache-stats",
+    response_model=ForecastCacheStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Счётчики кэша прогнозов",
+)
+async def forecast_cache_stats(
+    cache: ForecastCache | None = Depends(get_forecast_cache),
+) -> ForecastCacheStatsResponse:
+    """
+    Возвращает счётчики попаданий и промахов кэша прогнозов текущего процесса.
+    """
+    if cache is None:
+        return ForecastCacheStatsResponse(enabled=False)
+
+    return ForecastCacheStatsResponse(enabled=True, **vars(cache.stats))
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Потоковый экспорт истории и прогноза",
+    response_description="Файл CSV, Arrow IPC (stream) или Parquet со строками kind, has_deposit, day, bookings, cancellations.",
+    responses={
+        status.HTTP_200_OK: {
+            "content": {MEDIA_TYPES[fmt].split(";")[0]: {} for fmt in ExportFormat},
+        }
+    },
+)
+@register_errors(AuthorizationError, ValidationError, ServiceError)
+async def export_history_and_forecast(
+    start_date: date = Query(..., description="Начало периода (включительно)"),
+    end_date: date = Query(..., description="Конец периода (включительно)"),
+    kind: ExportKind = Query(ExportKind.all, description="history, forecast или all"),
+    has_deposit: bool | None = Query(None, description="Фильтр по депозиту; без него — оба среза"),
+    fmt: ExportFormat = Query(ExportFormat.csv, alias="format", description="csv, arrow или parquet"),
+    x_hotel_id: int = Header(..., alias="x-hotel-id"),
+    db: AsyncSession = Depends(get_async_session),
+) -> StreamingResponse:
+    """
+    Выгружает историю и прогноз за произвольный период без материализации в памяти.
+
+    Строки читаются серверным курсором пачками по EXPORT_BATCH_SIZE и сразу
+    кодируются в выбранный формат, поэтому память не зависит от длины периода.
+    """
+    if start_date > end_date:
+        raise ValidationError("start_date не может быть позже end_date")
+
+    hotel = await db.get(Hotel, x_hotel_id)
+    if not hotel:
+        raise AuthorizationError()
+
+    ensure_format_available(fmt)
+
+    batches = iter_export_batches(
+        hotel_id=x_hotel_id,
+        start_date=start_date,
+        end_date=end_date,
+        has_deposit=has_deposit,
+        kind=kind,
+        batch_size=data_interface_config.export.batch_size,
+    )
+    filename = f"hotel_{x_hotel_id}_{kind.value}_{start_date}_{end_date}.{FILE_EXTENSIONS[fmt]}"
+
+    logger.info(
+        "Экспорт начат: hotel_id=%s, период=%s — %s, kind=%s, format=%s",
+        x_hotel_id, start_date, end_date, kind.value, fmt.value,
+    )
+
+    return StreamingResponse(
+        ENCODERS[fmt](batches),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
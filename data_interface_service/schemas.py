@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
 from datetime import date
 
 
@@ -24,9 +24,47 @@ class ForecastResponse(BaseModel):
     history_summary: List[ForecastDay] = Field(...,description="История бронирований")
     forecast: List[ForecastDay] = Field(..., description="Прогноз бронирований")
 
+class BatchForecastRequest(ForecastRequest):
+    """Запрос истории и прогноза сразу для нескольких отелей с общими параметрами."""
+    hotel_ids: List[int] = Field(
+        ..., min_length=1, max_length=100, description="Идентификаторы отелей (дубликаты игнорируются)"
+    )
+
+    @field_validator("hotel_ids")
+    @classmethod
+    def unique_hotel_ids(cls, value: List[int]) -> List[int]:
+        return list(dict.fromkeys(value))
+
+
+class HotelForecastError(BaseModel):
+    """Ошибка получения прогноза для одного отеля в пакетном запросе."""
+    type: str = Field(..., description="Тип ошибки (как в ответах одиночного запроса)")
+    message: str = Field(..., description="Описание ошибки")
+
+
+class HotelForecast(BaseModel):
+    """История и прогноз одного отеля в пакетном ответе: либо данные, либо error."""
+    history_summary: Optional[List[ForecastDay]] = Field(None, description="История бронирований")
+    forecast: Optional[List[ForecastDay]] = Field(None, description="Прогноз бронирований")
+    error: Optional[HotelForecastError] = Field(None, description="Ошибка для этого отеля")
+
+
+class BatchForecastResponse(BaseModel):
+    """Пакетный ответ: результаты по отелям, ключ — идентификатор отеля."""
+    hotels: Dict[int, HotelForecast] = Field(..., description="Результаты по отелям")
+
 
 class BookingImportResponse(BaseModel):
     """Результат загрузки файла бронирований."""
     hotel_id: int = Field(..., description="Идентификатор отеля, отправившего данные")
     added: Optional[int] = Field(None, ge=0, description="Количество добавленных записей")
-    duplicates_skipped: Optional[int] = Field(None, ge=0, description="Количество пропущенных дубликатов")
\ No newline at end of file
+    duplicates_skipped: Optional[int] = Field(None, ge=0, description="Количество пропущенных дубликатов")
+
+class ForecastCacheStatsResponse(BaseModel):
+    """Счётчики кэша прогнозов в рамках процесса сервиса."""
+    enabled: bool = Field(..., description="Включён ли кэш")
+    hits: int = Field(0, ge=0, description="Ответы из кэша")
+    misses: int = Field(0, ge=0, description="Промахи кэша")
+    coalesced: int = Field(0, ge=0, description="Промахи, дождавшиеся пересчёта другим запросом")
+    errors: int = Field(0, ge=0, description="Ошибки Redis (запрос обслужен из БД)")
+    invalidations: int = Field(0, ge=0, description="Инвалидации после импорта бронирований")
@@ -1,13 +1,19 @@
 import logging
 
-from sqlalchemy import select
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from data_interface_service.utils.booking_data_preparation import prepare_booking_dataframe
+from data_interface_service.utils.columnar_preparation import BOOKING_COLUMNS, prepare_columnar_bookings
 from data_interface_service.utils.mapping import map_row_to_booking
+from shared.booking_partitions import ensure_booking_partitions, ensure_partitions_for_bookings
+from shared.booking_rollup import apply_booking_rollup, apply_rollup_deltas, count_record_deltas
 from shared.db_models import Booking
 from shared.errors import (
     CSVProcessingError,
+    ColumnarFormatError,
     MappingError,
     DatabaseError,
     ConflictError,
@@ -19,17 +25,18 @@ logger = logging.getLogger(__name__)
 async def import_bookings_from_csv(
     db: AsyncSession,
     hotel_id: int,
-    content: str,
+    content: bytes,
+    content_encoding: str | None = None,
 ) -> tuple[list[dict], int]:
     """
-    Обработка CSV:
+    Обработка CSV (в том числе сжатого gzip/zstd, см. content_encoding):
     - подготовка DataFrame (чтение, валидация, нормализация, парсинг дат),
     - исключение дубликатов по booking_ref,
     - возвращает список бронирований и кол-во дубликатов
     """
     logger.info("Начата обработка CSV для отеля %s", hotel_id)
 
-    df = await prepare_booking_dataframe(content, hotel_id)
+    df = await prepare_booking_dataframe(content, hotel_id, content_encoding)
     existing_refs = await get_existing_booking_refs(db, hotel_id)
 
     records = df.to_dict(orient="records")
@@ -64,7 +71,7 @@ async def save_bookings_to_db(
     hotel_id: int,
 ) -> int:
     """
-    Сохраняет бронирования в БД.
+    Сохраняет бронирования в БД и в той же транзакции обновляет дневной rollup booking_daily.
     """
     bookings: list[Booking] = []
 
@@ -81,7 +88,12 @@ async def save_bookings_to_db(
         return 0
 
     try:
+        # Новые партиции фиксируются отдельно: создание партиции блокирует booking до конца транзакции
+        if await ensure_partitions_for_bookings(db, bookings):
+            await db.commit()
+
         db.add_all(bookings)
+        await apply_booking_rollup(db, bookings)
         await db.commit()
         logger.info("Сохранено %s бронирований в БД", len(bookings))
         return len(bookings)
@@ -92,6 +104,80 @@ async def save_bookings_to_db(
         raise DatabaseError("Ошибка при сохранении данных в базу.")
 
 
+async def import_bookings_from_columnar(
+    db: AsyncSession,
+    hotel_id: int,
+    content: bytes,
+) -> tuple[dict[str, np.ndarray], int]:
+    """
+    Обработка Parquet/Arrow:
+    - подготовка колонок Booking (схема, типы, нормализация) в executor,
+    - векторное исключение дубликатов по booking_ref,
+    - возвращает колонки новых бронирований и кол-во дубликатов
+    """
+    logger.info("Начата обработка колоночного файла для отеля %s", hotel_id)
+
+    columns = await prepare_columnar_bookings(content, hotel_id)
+    existing_refs = await get_existing_booking_refs(db, hotel_id)
+
+    total = len(columns["arrival_date"])
+    duplicates = pd.Series(columns["booking_ref"]).isin(existing_refs).to_numpy()
+    duplicates_skipped = int(duplicates.sum())
+
+    if duplicates_skipped:
+        columns = {col: values[~duplicates] for col, values in columns.items()}
+
+    if total and duplicates_skipped == total:
+        raise ConflictError("Все записи уже существуют, новые бронирования не добавлены.")
+
+    if not total:
+        raise ColumnarFormatError("Не удалось добавить ни одной записи. Проверьте файл.")
+
+    logger.info(
+        "Hotel %s: добавлено %s записей, пропущено %s дубликатов.",
+        hotel_id, total - duplicates_skipped, duplicates_skipped
+    )
+    return columns, duplicates_skipped
+
+
+async def bulk_save_bookings(
+    db: AsyncSession,
+    columns: dict[str, np.ndarray],
+    hotel_id: int,
+) -> int:
+    """
+    Сохраняет подготовленные колонки бронирований одним executemany без создания ORM-объектов
+    и в той же транзакции обновляет дневной rollup booking_daily.
+    """
+    count = len(columns["arrival_date"])
+    if not count:
+        return 0
+
+    # tolist() переводит numpy-скаляры в типы Python, которые понимает драйвер
+    values = [columns[col].tolist() for col in BOOKING_COLUMNS]
+    records = [
+        {"hotel_id": hotel_id, **dict(zip(BOOKING_COLUMNS, row))}
+        for row in zip(*values)
+    ]
+
+    try:
+        # Новые партиции фиксируются отдельно: создание партиции блокирует booking до конца транзакции
+        dates = columns["arrival_date"]
+        if await ensure_booking_partitions(db, min(dates), max(dates)):
+            await db.commit()
+
+        await db.execute(insert(Booking), records)
+        await apply_rollup_deltas(db, count_record_deltas(records))
+        await db.commit()
+        logger.info("Сохранено %s бронирований в БД (bulk)", count)
+        return count
+
+    except Exception as e:
+        await db.rollback()
+        logger.exception("Ошибка при сохранении данных в БД: %s", e)
+        raise DatabaseError("Ошибка при сохранении данных в базу.")
+
+
 async def get_existing_booking_refs(db: AsyncSession, hotel_id: int) -> set[str]:
     """Извлекает существующие booking_ref из базы (для исключения дубликатов)."""
     stmt = (
@@ -0,0 +1,112 @@
+import logging
+from datetime import date
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Float, Select, cast, literal, select
+
+from data_interface_service.services.forecast_service import KIND_FORECAST, KIND_HISTORY
+from shared.db import AsyncSessionLocal
+from shared.db_models import BookingDaily, Prediction
+
+logger = logging.getLogger(__name__)
+
+
+class ExportKind(str, Enum):
+    history = "history"
+    forecast = "forecast"
+    all = "all"
+
+
+def _history_export_stmt(hotel_id: int, start_date: date, end_date: date, has_deposit: bool | None) -> Select:
+    """
+    История из rollup booking_daily, упорядоченная по (has_deposit, arrival_date).
+    Порядок повторяет ключ uq_booking_daily_key, поэтому база читает индекс по порядку, а не сортирует строки.
+    """
+    conditions = [
+        BookingDaily.hotel_id == hotel_id,
+        BookingDaily.arrival_date >= start_date,
+        BookingDaily.arrival_date <= end_date,
+    ]
+    if has_deposit is not None:
+        conditions.append(BookingDaily.has_deposit == has_deposit)
+
+    return (
+        select(
+            literal(KIND_HISTORY),
+            BookingDaily.has_deposit,
+            BookingDaily.arrival_date,
+            cast(BookingDaily.bookings, Float),
+            cast(BookingDaily.cancellations, Float),
+        )
+        .where(*conditions)
+        .order_by(BookingDaily.has_deposit, BookingDaily.arrival_date)
+    )
+
+
+def _forecast_export_stmt(hotel_id: int, start_date: date, end_date: date, has_deposit: bool | None) -> Select:
+    """Прогнозы из prediction; порядок совпадает с индексом ix_prediction_hotel_deposit_target."""
+    conditions = [
+        Prediction.hotel_id == hotel_id,
+        Prediction.target_date >= start_date,
+        Prediction.target_date <= end_date,
+    ]
+    if has_deposit is not None:
+        conditions.append(Prediction.has_deposit == has_deposit)
+
+    return (
+        select(
+            literal(KIND_FORECAST),
+            Prediction.has_deposit,
+            Prediction.target_date,
+            Prediction.bookings,
+            Prediction.cancellations,
+        )
+        .where(*conditions)
+        .order_by(Prediction.has_deposit, Prediction.target_date)
+    )
+
+
+def export_statements(
+    hotel_id: int,
+    start_date: date,
+    end_date: date,
+    has_deposit: bool | None,
+    kind: ExportKind,
+) -> list[Select]:
+    """Запросы экспорта в порядке выдачи: сначала история, затем прогноз."""
+    statements = []
+    if kind in (ExportKind.history, ExportKind.all):
+        statements.append(_history_export_stmt(hotel_id, start_date, end_date, has_deposit))
+    if kind in (ExportKind.forecast, ExportKind.all):
+        statements.append(_forecast_export_stmt(hotel_id, start_date, end_date, has_deposit))
+    return statements
+
+
+async def iter_export_batches(
+    hotel_id: int,
+    start_date: date,
+    end_date: date,
+    has_deposit: bool | None,
+    kind: ExportKind,
+    batch_size: int,
+) -> AsyncIterator[Sequence[Sequence]]:
+    """
+    Отдаёт строки экспорта пачками по batch_size через серверный курсор.
+
+    Сессия открывается внутри генератора: StreamingResponse читает его уже после
+    выхода из обработчика, поэтому сессия запроса к этому моменту может быть закрыта.
+    """
+    exported = 0
+
+    async with AsyncSessionLocal() as session:
+        for stmt in export_statements(hotel_id, start_date, end_date, has_deposit, kind):
+            result = await session.stream(stmt.execution_options(yield_per=batch_size))
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield rows
+
+    logger.info(
+        "Экспорт завершён: hotel_id=%s, период=%s — %s, строк=%s",
+        hotel_id, start_date, end_date, exported,
+    )
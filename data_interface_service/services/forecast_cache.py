@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import secrets
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Awaitable, Callable, Iterable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from data_interface_service.config import data_interface_config
+from data_interface_service.redis_client import get_redis_client
+from shared.forecast_cache_keys import (
+    forecast_entry_key,
+    forecast_generation_key,
+    forecast_lock_key,
+)
+from shared.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Снятие блокировки только владельцем: сравнение токена и удаление выполняются атомарно
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class CachedForecast:
+    """Готовый ответ /forecast/fetch: ETag версии данных и сериализованное тело."""
+    etag: str | None
+    body: str
+
+    def dump(self, generation: str) -> str:
+        """Сериализует запись вместе с поколением данных, для которого она посчитана."""
+        return "\n".join((generation, self.etag or "", self.body))
+
+    @classmethod
+    def load(cls, raw: str | None, generation: str) -> "CachedForecast | None":
+        """Восстанавливает запись; устаревшее поколение считается промахом."""
+        if raw is None:
+            return None
+
+        stored_generation, etag, body = raw.split("\n", 2)
+        if stored_generation != generation:
+            return None
+        return cls(etag=etag or None, body=body)
+
+
+@dataclass
+class CacheStats:
+    """Счётчики кэша в рамках процесса."""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    invalidations: int = 0
+
+
+class ForecastCache:
+    """
+    Redis-кэш ответов /forecast/fetch.
+
+    Записи привязаны к поколению (отель, депозит): импорт бронирований и запись прогнозов
+    выполняют INCR поколения, и старые записи перестают совпадать без удаления ключей.
+    При промахе пересчёт выполняет только владелец блокировки (SET NX), остальные запросы
+    ждут его результат. Ошибки Redis не прерывают запрос — данные читаются из БД (fail-open).
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int,
+        lock_ttl_seconds: int,
+        lock_wait_seconds: float,
+        poll_interval_seconds: float,
+    ):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.lock_wait_seconds = lock_wait_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.stats = CacheStats()
+
+    async def get_or_load(
+        self,
+        hotel_id: int,
+        has_deposit: bool,
+        target_date: date,
+        horizon: int,
+        history_window: int,
+        loader: Callable[[], Awaitable[CachedForecast]],
+    ) -> CachedForecast:
+        """
+        Возвращает ответ из кэша или вычисляет его через loader.
+        Ошибки loader (доменные исключения) пробрасываются и не кэшируются.
+        """
+        entry_key = forecast_entry_key(hotel_id, has_deposit, target_date, horizon, history_window)
+        lock_key = forecast_lock_key(entry_key)
+
+        try:
+            with span("cache.lookup", hotel_id=hotel_id):
+                generation, raw = await self.redis.mget(forecast_generation_key(hotel_id, has_deposit), entry_key)
+        except RedisError as e:
+            self._on_error("чтение", e)
+            return await loader()
+
+        generation = generation or "0"
+        cached = CachedForecast.load(raw, generation)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+
+        self.stats.misses += 1
+        token = secrets.token_hex(8)
+
+        try:
+            acquired = await self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl_seconds)
+        except RedisError as e:
+            self._on_error("блокировка", e)
+            return await loader()
+
+        if not acquired:
+            with span("cache.wait", hotel_id=hotel_id):
+                cached = await self._wait_for_entry(entry_key, lock_key, generation)
+            if cached is not None:
+                self.stats.coalesced += 1
+                return cached
+
+            # Владелец блокировки завершился ошибкой или не уложился в ожидание
+            entry = await loader()
+            await self._store(entry_key, generation, entry)
+            return entry
+
+        try:
+            entry = await loader()
+            await self._store(entry_key, generation, entry)
+            return entry
+        finally:
+            await self._release(lock_key, token)
+
+    async def invalidate(self, hotel_id: int, deposits: Iterable[bool]) -> None:
+        """Инвалидирует записи отеля для указанных значений депозита."""
+        for has_deposit in set(deposits):
+            try:
+                await self.redis.incr(forecast_generation_key(hotel_id, has_deposit))
+                self.stats.invalidations += 1
+            except RedisError as e:
+                self._on_error("инвалидация", e)
+
+    async def _wait_for_entry(self, entry_key: str, lock_key: str, generation: str) -> CachedForecast | None:
+        """Ждёт запись от владельца блокировки; None — если блокировка снята без результата или истекло ожидание."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_wait_seconds
+
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                raw, lock = await self.redis.mget(entry_key, lock_key)
+            except RedisError as e:
+                self._on_error("ожидание", e)
+                return None
+
+            cached = CachedForecast.load(raw, generation)
+            if cached is not None:
+                return cached
+            if lock is None:
+                return None
+
+        return None
+
+    async def _store(self, entry_key: str, generation: str, entry: CachedForecast) -> None:
+        try:
+            await self.redis.set(entry_key, entry.dump(generation), ex=self.ttl_seconds)
+        except RedisError as e:
+            self._on_error("запись", e)
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except RedisError as e:
+            self._on_error("снятие блокировки", e)
+
+    def _on_error(self, operation: str, error: Exception) -> None:
+        self.stats.errors += 1
+        logger.warning("Кэш прогнозов недоступен (%s): %s", operation, error)
+
+
+@lru_cache()
+def get_forecast_cache() -> ForecastCache | None:
+    """Dependency: общий кэш прогнозов или None, если кэш выключен в конфигурации."""
+    cfg = data_interface_config.forecast_cache
+    if not cfg.enabled:
+        return None
+
+    return ForecastCache(
+        redis=get_redis_client(),
+        ttl_seconds=cfg.ttl_seconds,
+        lock_ttl_seconds=cfg.lock_ttl_seconds,
+        lock_wait_seconds=cfg.lock_wait_seconds,
+        poll_interval_seconds=cfg.poll_interval_seconds,
+    )
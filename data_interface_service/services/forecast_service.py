@@ -1,66 +1,218 @@
+from collections import defaultdict
 from datetime import date, timedelta
 import logging
+from typing import Iterable
 
-from sqlalchemy import select, func, case, and_
+from sqlalchemy import Date, Float, Select, select, and_, cast, exists, func, literal, null, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from data_interface_service.schemas import ForecastDay
+from data_interface_service.schemas import (
+    ForecastDay,
+    ForecastResponse,
+    HotelForecast,
+    HotelForecastError,
+)
+from data_interface_service.services.forecast_cache import CachedForecast
+from data_interface_service.utils.etag import make_etag
 from data_interface_service.utils.mapping import map_to_forecast_day
-from shared.db_models import Booking, Prediction
+from shared.db_models import BookingDaily, Hotel, Prediction
 from shared.errors import (
+    AuthorizationError,
     InsufficientHistoryError,
     NoForecastError,
+    ServiceError,
 )
+from shared.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Метки строк в объединённом запросе истории и прогноза
+KIND_HOTEL = "hotel"
+KIND_HISTORY = "history"
+KIND_FORECAST = "forecast"
 
-async def get_history(
-    db: AsyncSession,
+
+# === Построение запросов ===
+
+def _history_stmt(hotel_id: int, target_date: date, has_deposit: bool, history_window: int) -> Select:
+    """Бронирования и отмены по дням за окно history_window до target_date (из rollup booking_daily)."""
+    start_date = target_date - timedelta(days=history_window)
+
+    conditions = [
+        BookingDaily.hotel_id == hotel_id,
+        BookingDaily.has_deposit == has_deposit,
+        BookingDaily.arrival_date >= start_date,
+        BookingDaily.arrival_date <= target_date,
+    ]
+
+    return (
+        select(
+            literal(KIND_HISTORY).label("kind"),
+            BookingDaily.arrival_date.label("day"),
+            cast(BookingDaily.bookings, Float).label("bookings"),
+            cast(BookingDaily.cancellations, Float).label("cancellations"),
+        )
+        .where(and_(*conditions))
+    )
+
+
+def _forecast_stmt(hotel_id: int, target_date: date, has_deposit: bool, horizon: int) -> Select:
+    """Строки прогноза из Prediction на horizon дней начиная с target_date."""
+    forecast_end = target_date + timedelta(days=horizon - 1)
+
+    conditions = [
+        Prediction.hotel_id == hotel_id,
+        Prediction.target_date >= target_date,
+        Prediction.target_date <= forecast_end,
+        Prediction.has_deposit == has_deposit,
+    ]
+
+    return (
+        select(
+            literal(KIND_FORECAST).label("kind"),
+            Prediction.target_date.label("day"),
+            cast(Prediction.bookings, Float).label("bookings"),
+            cast(Prediction.cancellations, Float).label("cancellations"),
+        )
+        .where(and_(*conditions))
+    )
+
+
+def _hotel_stmt(hotel_id: int) -> Select:
+    """Маркер существования отеля в формате строк объединённого запроса."""
+    return (
+        select(
+            literal(KIND_HOTEL).label("kind"),
+            cast(null(), Date).label("day"),
+            cast(null(), Float).label("bookings"),
+            cast(null(), Float).label("cancellations"),
+        )
+        .where(Hotel.id == hotel_id)
+    )
+
+
+def _version_stmt(
     hotel_id: int,
     target_date: date,
     has_deposit: bool,
-    history_window: int = 30,
-) -> list[ForecastDay]:
+    horizon: int,
+    history_window: int,
+) -> Select:
     """
-    Достаёт историю бронирований и отмен за окно window_days до target_date.
-    Возвращает список объектов ForecastDay.
+    Дешёвые маркеры версии данных окна: существование отеля,
+    max(id)/count прогнозов горизонта и суммы rollup истории.
+    Все подзапросы читают индексы ix_prediction_hotel_deposit_target и uq_booking_daily_key.
     """
+    start_date = target_date - timedelta(days=history_window)
+    forecast_end = target_date + timedelta(days=horizon - 1)
 
+    predictions = (
+        select(
+            func.coalesce(func.max(Prediction.id), 0).label("prediction_max_id"),
+            func.count().label("prediction_count"),
+        )
+        .where(
+            Prediction.hotel_id == hotel_id,
+            Prediction.has_deposit == has_deposit,
+            Prediction.target_date >= target_date,
+            Prediction.target_date <= forecast_end,
+        )
+        .subquery("predictions")
+    )
+
+    history = (
+        select(
+            func.coalesce(func.sum(BookingDaily.bookings), 0).label("history_bookings"),
+            func.coalesce(func.sum(BookingDaily.cancellations), 0).label("history_cancellations"),
+            func.count().label("history_days"),
+        )
+        .where(
+            BookingDaily.hotel_id == hotel_id,
+            BookingDaily.has_deposit == has_deposit,
+            BookingDaily.arrival_date >= start_date,
+            BookingDaily.arrival_date <= target_date,
+        )
+        .subquery("history")
+    )
+
+    return select(
+        exists().where(Hotel.id == hotel_id).label("hotel_exists"),
+        predictions,
+        history,
+    )
+
+
+def _batch_history_stmt(
+    hotel_ids: list[int],
+    target_date: date,
+    has_deposit: bool,
+    history_window: int,
+) -> Select:
+    """История rollup сразу для набора отелей: один проход по uq_booking_daily_key."""
     start_date = target_date - timedelta(days=history_window)
 
-    conditions = [
-        Booking.hotel_id == hotel_id,
-        Booking.arrival_date >= start_date,
-        Booking.arrival_date <= target_date,
-        Booking.has_deposit == has_deposit,
-    ]
+    return (
+        select(
+            BookingDaily.hotel_id,
+            BookingDaily.arrival_date.label("day"),
+            cast(BookingDaily.bookings, Float).label("bookings"),
+            cast(BookingDaily.cancellations, Float).label("cancellations"),
+        )
+        .where(
+            BookingDaily.hotel_id.in_(hotel_ids),
+            BookingDaily.has_deposit == has_deposit,
+            BookingDaily.arrival_date >= start_date,
+            BookingDaily.arrival_date <= target_date,
+        )
+        .order_by(BookingDaily.hotel_id, BookingDaily.arrival_date)
+    )
+
 
-    bookings_sum = func.count(Booking.id)
-    cancellations_sum = func.sum(case((Booking.is_cancellation == True, 1), else_=0))
+def _batch_forecast_stmt(hotel_ids: list[int], target_date: date, has_deposit: bool, horizon: int) -> Select:
+    """Строки прогноза сразу для набора отелей (ix_prediction_hotel_deposit_target)."""
+    forecast_end = target_date + timedelta(days=horizon - 1)
 
-    stmt = (
+    return (
         select(
-            Booking.arrival_date.label("arrival_date"),
-            bookings_sum.label("bookings"),
-            cancellations_sum.label("cancellations"),
+            Prediction.hotel_id,
+            Prediction.target_date.label("day"),
+            cast(Prediction.bookings, Float).label("bookings"),
+            cast(Prediction.cancellations, Float).label("cancellations"),
         )
-        .where(and_(*conditions))
-        .group_by(Booking.arrival_date)
-        .order_by(Booking.arrival_date.asc())
+        .where(
+            Prediction.hotel_id.in_(hotel_ids),
+            Prediction.has_deposit == has_deposit,
+            Prediction.target_date >= target_date,
+            Prediction.target_date <= forecast_end,
+        )
+        .order_by(Prediction.hotel_id, Prediction.target_date)
     )
 
-    result = await db.execute(stmt)
-    history_records = result.all()
 
-    if not history_records:
+def _group_by_hotel(rows: Iterable) -> dict[int, list]:
+    grouped: dict[int, list] = defaultdict(list)
+    for row in rows:
+        grouped[row.hotel_id].append(row)
+    return grouped
+
+
+# === Валидация результатов ===
+
+def _build_history(
+    records: Iterable,
+    hotel_id: int,
+    target_date: date,
+    history_window: int,
+) -> list[ForecastDay]:
+    """Проверяет достаточность истории и преобразует строки в ForecastDay."""
+    history_days = [map_to_forecast_day(record, "day") for record in records]
+
+    if not history_days:
         logger.warning("История пуста", extra={"hotel_id": hotel_id, "target_date": target_date})
         raise InsufficientHistoryError(
             f"Недостаточно данных для прогноза за {history_window} дней до {target_date}."
         )
 
-    history_days = [map_to_forecast_day(record, "arrival_date") for record in history_records]
-
     total_bookings = sum(day.bookings for day in history_days)
     if total_bookings < 30:
         logger.warning(
@@ -74,6 +226,65 @@ async def get_history(
     return history_days
 
 
+def _build_forecast(
+    records: Iterable,
+    hotel_id: int,
+    target_date: date,
+    horizon: int,
+) -> list[ForecastDay]:
+    """Проверяет наличие прогноза и преобразует строки в ForecastDay."""
+    forecast_days = [map_to_forecast_day(record, "day") for record in records]
+
+    if not forecast_days:
+        forecast_end = target_date + timedelta(days=horizon - 1)
+        logger.warning("Прогноз пуст", extra={"hotel_id": hotel_id, "target_date": target_date})
+        raise NoForecastError(
+            f"Прогноз отсутствует для периода {target_date} — {forecast_end}."
+        )
+
+    return forecast_days
+
+
+def split_combined_rows(rows: Iterable) -> tuple[bool, list, list]:
+    """
+    Разбирает строки объединённого запроса по метке kind.
+
+    Returns:
+        (hotel_exists, history_rows, forecast_rows); строки внутри групп упорядочены по дате.
+    """
+    hotel_exists = False
+    history_rows, forecast_rows = [], []
+
+    for row in rows:
+        if row.kind == KIND_HOTEL:
+            hotel_exists = True
+        elif row.kind == KIND_HISTORY:
+            history_rows.append(row)
+        elif row.kind == KIND_FORECAST:
+            forecast_rows.append(row)
+
+    return hotel_exists, history_rows, forecast_rows
+
+
+# === Публичный API сервиса ===
+
+async def get_history(
+    db: AsyncSession,
+    hotel_id: int,
+    target_date: date,
+    has_deposit: bool,
+    history_window: int = 30,
+) -> list[ForecastDay]:
+    """
+    Достаёт историю бронирований и отмен за окно window_days до target_date.
+    Возвращает список объектов ForecastDay.
+    """
+    stmt = _history_stmt(hotel_id, target_date, has_deposit, history_window).order_by("day")
+
+    result = await db.execute(stmt)
+    return _build_history(result.all(), hotel_id, target_date, history_window)
+
+
 async def get_forecast(
     db: AsyncSession,
     hotel_id: int,
@@ -84,32 +295,144 @@ async def get_forecast(
     """
     Возвращает прогноз бронирований из Prediction на horizon дней начиная с target_date.
     """
-    forecast_start = target_date
-    forecast_end = target_date + timedelta(days=horizon - 1)
+    stmt = _forecast_stmt(hotel_id, target_date, has_deposit, horizon).order_by("day")
 
-    conditions = [
-        Prediction.hotel_id == hotel_id,
-        Prediction.target_date >= forecast_start,
-        Prediction.target_date <= forecast_end,
-        Prediction.has_deposit == has_deposit,
-    ]
+    result = await db.execute(stmt)
+    return _build_forecast(result.all(), hotel_id, target_date, horizon)
 
-    stmt = (
-        select(Prediction)
-        .where(and_(*conditions))
-        .order_by(Prediction.target_date.asc())
-    )
 
-    result = await db.execute(stmt)
-    forecast_records = result.scalars().all()
+async def get_history_and_forecast(
+    db: AsyncSession,
+    hotel_id: int,
+    target_date: date,
+    has_deposit: bool,
+    horizon: int = 30,
+    history_window: int = 30,
+) -> tuple[list[ForecastDay], list[ForecastDay]]:
+    """
+    Возвращает историю и прогноз за один запрос к БД.
 
-    if not forecast_records:
-        logger.warning("Прогноз пуст", extra={"hotel_id": hotel_id, "target_date": target_date})
-        raise NoForecastError(
-            f"Прогноз отсутствует для периода {target_date} — {forecast_end}."
-        )
+    Проверка отеля, агрегация истории и строки прогноза объединяются через UNION ALL
+    с меткой kind, поэтому эндпоинт выполняет один round trip вместо трёх.
+    Ошибки проверяются в прежнем порядке: отель → история → прогноз.
+    """
+    combined = union_all(
+        _hotel_stmt(hotel_id),
+        _history_stmt(hotel_id, target_date, has_deposit, history_window),
+        _forecast_stmt(hotel_id, target_date, has_deposit, horizon),
+    ).subquery("combined")
 
-    forecast_days = [map_to_forecast_day(r, "target_date") for r in forecast_records]
+    stmt = select(combined).order_by(combined.c.kind, combined.c.day)
 
-    return forecast_days
+    with span("db.history_and_forecast", hotel_id=hotel_id):
+        result = await db.execute(stmt)
+        hotel_exists, history_rows, forecast_rows = split_combined_rows(result.all())
+
+    if not hotel_exists:
+        raise AuthorizationError()
+
+    history_days = _build_history(history_rows, hotel_id, target_date, history_window)
+    forecast_days = _build_forecast(forecast_rows, hotel_id, target_date, horizon)
+
+    return history_days, forecast_days
+
+
+async def get_batch_history_and_forecast(
+    db: AsyncSession,
+    hotel_ids: list[int],
+    target_date: date,
+    has_deposit: bool,
+    horizon: int = 30,
+    history_window: int = 30,
+) -> dict[int, HotelForecast]:
+    """
+    Возвращает историю и прогноз для набора отелей с общими параметрами.
+
+    Выполняет по одному запросу на таблицу (hotel, booking_daily, prediction) с фильтром
+    hotel_id IN (...) вместо трёх запросов на каждый отель. Ошибки отдельного отеля
+    (нет отеля, мало истории, нет прогноза) не прерывают пакет и возвращаются в его записи.
+    """
+    with span("db.batch_history_and_forecast", hotels=len(hotel_ids)):
+        existing = set((await db.execute(select(Hotel.id).where(Hotel.id.in_(hotel_ids)))).scalars())
+        found = [hotel_id for hotel_id in hotel_ids if hotel_id in existing]
+
+        history_by_hotel: dict[int, list] = {}
+        forecast_by_hotel: dict[int, list] = {}
+        if found:
+            history_result = await db.execute(_batch_history_stmt(found, target_date, has_deposit, history_window))
+            history_by_hotel = _group_by_hotel(history_result.all())
+            forecast_result = await db.execute(_batch_forecast_stmt(found, target_date, has_deposit, horizon))
+            forecast_by_hotel = _group_by_hotel(forecast_result.all())
+
+    results: dict[int, HotelForecast] = {}
+    for hotel_id in hotel_ids:
+        try:
+            if hotel_id not in existing:
+                raise AuthorizationError()
+
+            results[hotel_id] = HotelForecast(
+                history_summary=_build_history(
+                    history_by_hotel.get(hotel_id, []), hotel_id, target_date, history_window
+                ),
+                forecast=_build_forecast(
+                    forecast_by_hotel.get(hotel_id, []), hotel_id, target_date, horizon
+                ),
+            )
+        except ServiceError as e:
+            results[hotel_id] = HotelForecast(error=HotelForecastError(type=e.type, message=e.message))
+
+    return results
+
+
+async def get_forecast_version(
+    db: AsyncSession,
+    hotel_id: int,
+    target_date: date,
+    has_deposit: bool,
+    horizon: int = 30,
+    history_window: int = 30,
+) -> str | None:
+    """
+    Возвращает ETag данных окна (hotel, deposit, target_date, horizon, history_window).
+
+    Версия меняется при новом прогнозе (растёт max(id) прогнозов) и при импорте
+    бронирований в окно истории (растут суммы rollup), поэтому ответ можно
+    переиспользовать, пока ETag не изменился.
+
+    Returns:
+        str | None: ETag или None, если отель не найден (ошибку вернёт основной запрос).
+    """
+    stmt = _version_stmt(hotel_id, target_date, has_deposit, horizon, history_window)
+    with span("db.forecast_version", hotel_id=hotel_id):
+        row = (await db.execute(stmt)).one()
+
+    if not row.hotel_exists:
+        return None
+
+    return make_etag(
+        hotel_id, has_deposit, target_date, horizon, history_window,
+        row.prediction_max_id, row.prediction_count,
+        row.history_bookings, row.history_cancellations, row.history_days,
+    )
+
+
+async def load_forecast_entry(
+    db: AsyncSession,
+    hotel_id: int,
+    target_date: date,
+    has_deposit: bool,
+    horizon: int = 30,
+    history_window: int = 30,
+) -> CachedForecast:
+    """Собирает готовый ответ /forecast/fetch (ETag и JSON-тело) для записи в кэш."""
+    etag = await get_forecast_version(db, hotel_id, target_date, has_deposit, horizon, history_window)
+    history_days, forecast_days = await get_history_and_forecast(
+        db, hotel_id, target_date, has_deposit, horizon, history_window
+    )
 
+    body = ForecastResponse(
+        hotel_id=hotel_id,
+        history_summary=history_days,
+        forecast=forecast_days,
+    ).model_dump_json()
+    return CachedForecast(etag=etag, body=body)
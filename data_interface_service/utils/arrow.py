@@ -0,0 +1,10 @@
+from shared.errors import ServiceError
+
+
+def import_pyarrow():
+    """Ленивый импорт pyarrow: зависимость нужна только для колоночных форматов (экспорт, импорт Parquet/Arrow)."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ServiceError("Колоночные форматы недоступны: не установлен pyarrow") from e
+    return pyarrow
@@ -3,9 +3,23 @@ import csv
 from io import StringIO
 import logging
 
+import numpy as np
 import pandas as pd
-
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from data_interface_service.config import data_interface_config
+from data_interface_service.utils.compression import (
+    SAMPLE_SIZE,
+    UploadEncoding,
+    decompression_errors,
+    detect_upload_encoding,
+    open_decompressed,
+)
 from data_interface_service.utils.date_parsing import parse_dates_vectorized
+from data_interface_service.utils.executors import (
+    get_preparation_executor,
+    get_preparation_semaphore,
+)
 from data_interface_service.utils.booking_constants import (
     CATEGORICAL_COLUMNS,
     NUMERIC_COLUMNS,
@@ -43,6 +57,43 @@ def read_csv_to_dataframe(content: str) -> pd.DataFrame:
     return df
 
 
+def read_compressed_csv(content: bytes, encoding: UploadEncoding, limit: int | None = None) -> pd.DataFrame:
+    """
+    Читает сжатый CSV (gzip/zstd), распаковывая его потоком прямо в парсер pandas:
+    распакованный текст целиком в памяти не держится.
+    Разделитель определяется по распакованному начальному фрагменту.
+    """
+    broken = decompression_errors()
+
+    try:
+        with open_decompressed(content, encoding) as stream:
+            sample = stream.read(SAMPLE_SIZE).decode("utf-8", errors="ignore")
+    except broken:
+        raise CSVProcessingError(f"Повреждённый {encoding.value}-архив.")
+
+    if not sample.strip():
+        raise CSVProcessingError("Загруженный файл пуст.")
+
+    try:
+        with open_decompressed(content, encoding, limit) as stream:
+            df = pd.read_csv(stream, sep=detect_separator(sample), encoding="utf-8")
+    except CSVProcessingError:
+        raise
+    except UnicodeDecodeError:
+        raise CSVProcessingError("Файл должен быть в кодировке UTF-8.")
+    except broken:
+        raise CSVProcessingError(f"Повреждённый {encoding.value}-архив.")
+    except Exception:
+        logger.exception("Ошибка чтения сжатого CSV")
+        raise CSVProcessingError("Ошибка чтения CSV (неверный формат или разделитель).")
+
+    if df.empty:
+        raise CSVProcessingError("Файл пуст.")
+
+    logger.debug("Сжатый CSV (%s) прочитан: %s строк, %s колонок", encoding.value, df.shape[0], df.shape[1])
+    return df
+
+
 # === Валидация и нормализация ===
 
 def validate_booking_columns(df: pd.DataFrame) -> None:
@@ -65,20 +116,17 @@ def validate_booking_columns(df: pd.DataFrame) -> None:
 def clean_numeric_series(series: pd.Series, default, dtype) -> pd.Series:
     """
     Очистка числовой серии:
-    — нормализует мусорные значения,
-    — конвертирует в числа,
-    — приводит к dtype.
+    — колонки, уже распознанные pandas как числовые, не проходят строковую обработку;
+    — остальные конвертируются одним векторным проходом: мусорные значения
+      ("", "None", "NULL", "NaN", "N/A" и т.п.) становятся NaN;
+    — пропуски заполняются default, результат приводится к dtype.
     """
-    s = series.astype(str).str.strip()
-    bad_values = ["", "None", "none", "NULL", "null", "NaN", "nan", "N/A", "n/a"]
+    if is_numeric_dtype(series) and not is_bool_dtype(series):
+        numeric = series
+    else:
+        numeric = pd.to_numeric(series, errors="coerce")
 
-    s = s.replace(bad_values, str(default))
-    s = s.replace(r"^\s*$", str(default), regex=True)
-
-    numeric = pd.to_numeric(s, errors="coerce")
-    numeric = numeric.fillna(default)
-
-    return numeric.astype(dtype)
+    return numeric.fillna(default).astype(dtype)
 
 
 def normalize_columns(df: pd.DataFrame, config: dict, *, numeric: bool = False) -> pd.DataFrame:
@@ -139,28 +187,74 @@ def normalize_booking_dataframe(df: pd.DataFrame) -> pd.DataFrame:
 
 # === Общий pipeline подготовки ===
 
+def prepare_booking_columns(
+        content: bytes,
+        encoding: UploadEncoding = UploadEncoding.identity,
+        max_decompressed_bytes: int | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Синхронный pipeline подготовки (выполняется в воркере):
+    1. декодирование (для gzip/zstd — потоковая распаковка) и чтение CSV → DataFrame;
+    2. валидация;
+    3. нормализация данных и заполнение пропусков;
+    4. добавление колонки arrival_date_parsed.
+
+    Возвращает компактный колоночный результат {колонка: массив значений},
+    который дёшево передаётся между процессами.
+    """
+    if encoding is UploadEncoding.identity:
+        try:
+            text = content.decode("utf-8")
+        except UnicodeDecodeError:
+            raise CSVProcessingError("Файл должен быть в кодировке UTF-8.")
+
+        if not text.strip():
+            raise CSVProcessingError("Загруженный файл пуст.")
+
+        df = read_csv_to_dataframe(text)
+    else:
+        df = read_compressed_csv(content, encoding, max_decompressed_bytes)
+
+    validate_booking_columns(df)
+    df = normalize_booking_dataframe(df)
+    df["arrival_date_parsed"] = parse_dates_vectorized(df)
+
+    return {col: df[col].to_numpy() for col in df.columns}
+
+
 async def prepare_booking_dataframe(
-        content: str,
+        content: bytes,
         hotel_id: int,
+        declared_encoding: str | None = None,
 ) -> pd.DataFrame:
     """
-    Полная подготовка DataFrame:
-    1. чтение CSV → DataFrame
-    2. валидация;
-    3. нормализация данных и заполнение пропусков;
-    4. добавление колонки arrival_date_parsed
-    5. извлечение существующих booking_ref из БД
+    Полная подготовка DataFrame из содержимого CSV-файла (в том числе сжатого gzip/zstd).
+
+    Весь CPU-bound pipeline выполняется одним вызовом в executor
+    (пул процессов или потоков, см. CSVPreparationConfig),
+    число одновременных подготовок ограничено семафором.
+    В воркер передаются сжатые байты — распаковка идёт там же, потоком.
     """
     logger.info("Начата обработка CSV для отеля %s (размер файла: %d байт)", hotel_id, len(content))
 
-    if not content.strip():
+    if not content:
         raise CSVProcessingError("Загруженный файл пуст.")
 
-    # --- CPU-bound части переносим в thread pool ---
-    df = await asyncio.to_thread(read_csv_to_dataframe, content)
-    await asyncio.to_thread(validate_booking_columns, df)
-    df = await asyncio.to_thread(normalize_booking_dataframe, df)
-    df["arrival_date_parsed"] = await asyncio.to_thread(parse_dates_vectorized, df)
+    encoding = detect_upload_encoding(content, declared_encoding)
+    if encoding is not UploadEncoding.identity:
+        logger.info("Файл сжат (%s), распаковка при чтении", encoding.value)
+
+    loop = asyncio.get_running_loop()
+    async with get_preparation_semaphore():
+        columns = await loop.run_in_executor(
+            get_preparation_executor(),
+            prepare_booking_columns,
+            content,
+            encoding,
+            data_interface_config.csv_preparation.max_decompressed_bytes,
+        )
+
+    df = pd.DataFrame(columns, copy=False)
 
     logger.info("Подготовлено строк: %s", len(df))
-    return df
\ No newline at end of file
+    return df
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+
+from data_interface_service.utils.arrow import import_pyarrow
+from data_interface_service.utils.booking_constants import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+from data_interface_service.utils.booking_data_preparation import (
+    normalize_booking_dataframe,
+    validate_booking_columns,
+)
+from data_interface_service.utils.date_parsing import parse_dates_vectorized, to_dates
+from data_interface_service.utils.executors import (
+    get_preparation_executor,
+    get_preparation_semaphore,
+)
+from shared.errors import ColumnarFormatError, CSVProcessingError
+
+logger = logging.getLogger(__name__)
+
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+# Сообщения IPC-потока начинаются с continuation-маркера 0xFFFFFFFF
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+# Колонки Booking, которые возвращает подготовка (hotel_id добавляет сервис)
+BOOKING_COLUMNS = (
+    "booking_ref", "arrival_date", "lead_time", "adr",
+    "total_guests", "total_nights", "booking_changes",
+    "has_deposit", "is_cancellation",
+    "market_segment", "distribution_channel", "reserved_room_type", "day_of_week",
+)
+
+
+class ColumnarFormat(str, Enum):
+    parquet = "parquet"
+    arrow_file = "arrow_file"
+    arrow_stream = "arrow_stream"
+
+
+def detect_columnar_format(content: bytes) -> ColumnarFormat:
+    """Определяет формат файла по сигнатуре, а не по расширению или Content-Type."""
+    if content[:4] == PARQUET_MAGIC and content[-4:] == PARQUET_MAGIC:
+        return ColumnarFormat.parquet
+    if content[:6] == ARROW_FILE_MAGIC:
+        return ColumnarFormat.arrow_file
+    if content[:4] == ARROW_STREAM_MAGIC:
+        return ColumnarFormat.arrow_stream
+    raise ColumnarFormatError("Неизвестный формат файла: ожидается Parquet или Arrow IPC.")
+
+
+def read_columnar_table(content: bytes):
+    """Читает Parquet или Arrow IPC (file/stream) в pyarrow.Table без копирования буфера."""
+    pa = import_pyarrow()
+    fmt = detect_columnar_format(content)
+    buffer = pa.py_buffer(content)
+
+    try:
+        if fmt is ColumnarFormat.parquet:
+            import pyarrow.parquet as pq
+            return pq.read_table(buffer)
+        if fmt is ColumnarFormat.arrow_file:
+            return pa.ipc.open_file(buffer).read_all()
+        return pa.ipc.open_stream(buffer).read_all()
+    except pa.ArrowException as e:
+        logger.exception("Ошибка чтения колоночного файла")
+        raise ColumnarFormatError(f"Не удалось прочитать файл {fmt.value}: {e}")
+
+
+def validate_columnar_schema(schema) -> None:
+    """
+    Проверяет схему файла до конвертации данных:
+    — обязательные колонки те же, что у CSV;
+    — NUMERIC_COLUMNS — целые, вещественные или строки (строки проходят обычную очистку);
+    — CATEGORICAL_COLUMNS и reserved_room_type — строки (в том числе dictionary);
+    — has_deposit — bool или строка deposit_type, is_cancellation — bool или целое;
+    — arrival_date — date/timestamp или строка в одном из поддерживаемых форматов.
+    """
+    pa = import_pyarrow()
+    types = pa.types
+
+    def is_string(t) -> bool:
+        if types.is_dictionary(t):
+            t = t.value_type
+        return types.is_string(t) or types.is_large_string(t) or types.is_null(t)
+
+    def is_number(t) -> bool:
+        return types.is_integer(t) or types.is_floating(t) or types.is_null(t)
+
+    try:
+        validate_booking_columns(pd.DataFrame(columns=schema.names))
+    except CSVProcessingError as e:
+        raise ColumnarFormatError(e.message)
+
+    errors = []
+    for field in schema:
+        t = field.type
+        if field.name in NUMERIC_COLUMNS and not (is_number(t) or is_string(t)):
+            errors.append(f"{field.name}: ожидается число, получено {t}")
+        elif field.name in CATEGORICAL_COLUMNS and not is_string(t):
+            errors.append(f"{field.name}: ожидается строка, получено {t}")
+        elif field.name == "reserved_room_type" and not is_string(t):
+            errors.append(f"{field.name}: ожидается строка, получено {t}")
+        elif field.name == "has_deposit" and not (types.is_boolean(t) or is_string(t)):
+            errors.append(f"{field.name}: ожидается bool или deposit_type, получено {t}")
+        elif field.name == "is_cancellation" and not (types.is_boolean(t) or types.is_integer(t)):
+            errors.append(f"{field.name}: ожидается bool или целое, получено {t}")
+        elif field.name == "arrival_date" and not (
+                types.is_date(t) or types.is_timestamp(t) or is_string(t)
+        ):
+            errors.append(f"{field.name}: ожидается дата или строка, получено {t}")
+
+    if errors:
+        raise ColumnarFormatError(f"Несовместимая схема: {'; '.join(errors)}.")
+
+
+def _arrival_dates(table, df: pd.DataFrame) -> pd.Series:
+    """Типизированные даты берутся как есть, строковые и составные разбираются парсером CSV."""
+    pa = import_pyarrow()
+
+    if "arrival_date" in table.column_names:
+        column = table.column("arrival_date")
+        if pa.types.is_date(column.type) or pa.types.is_timestamp(column.type):
+            if column.null_count:
+                raise ColumnarFormatError("arrival_date содержит пропуски.")
+            return to_dates(pd.Series(column.cast(pa.timestamp("s")).to_numpy(), index=df.index))
+
+    try:
+        return parse_dates_vectorized(df)
+    except CSVProcessingError as e:
+        raise ColumnarFormatError(e.message)
+
+
+def _deposit_flags(series: pd.Series) -> np.ndarray:
+    """has_deposit: bool-колонка используется напрямую, строковая — как deposit_type (см. map_has_deposit)."""
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=bool)
+    return (series.astype(str).str.lower() != "no deposit").to_numpy()
+
+
+def _decode_dictionaries(table):
+    """Dictionary-колонки (категории Parquet) приводятся к обычным строкам до конвертации в pandas."""
+    pa = import_pyarrow()
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table
+
+
+def prepare_columnar_columns(content: bytes) -> dict[str, np.ndarray]:
+    """
+    Синхронный pipeline подготовки Parquet/Arrow (выполняется в воркере):
+    1. чтение таблицы и проверка схемы по CATEGORICAL_COLUMNS/NUMERIC_COLUMNS;
+    2. нормализация — типизированные числовые колонки не проходят строковую очистку;
+    3. векторный расчёт полей Booking и отбор строк с гостями и ночами.
+
+    Возвращает колонки Booking {колонка: массив значений}, готовые к bulk-вставке.
+    """
+    table = read_columnar_table(content)
+    if table.num_rows == 0:
+        raise ColumnarFormatError("Файл не содержит строк.")
+
+    validate_columnar_schema(table.schema)
+
+    for name in ("has_deposit", "is_cancellation"):
+        if table.column(name).null_count:
+            raise ColumnarFormatError(f"{name} содержит пропуски.")
+
+    table = _decode_dictionaries(table)
+    df = table.to_pandas()
+    arrival_dates = _arrival_dates(table, df)
+    df = normalize_booking_dataframe(df)
+
+    refs = df["booking_ref"].str.strip()
+    columns = {
+        "booking_ref": refs.where(refs != "", None).to_numpy(dtype=object),
+        "arrival_date": arrival_dates.to_numpy(),
+        "lead_time": df["lead_time"].to_numpy(),
+        "adr": df["adr"].to_numpy(),
+        "total_guests": df["total_guests"].to_numpy(),
+        "total_nights": df["total_nights"].to_numpy(),
+        "booking_changes": df["booking_changes"].to_numpy(),
+        "has_deposit": _deposit_flags(df["has_deposit"]),
+        "is_cancellation": df["is_cancellation"].astype(bool).to_numpy(),
+        "market_segment": df["market_segment"].to_numpy(dtype=object),
+        "distribution_channel": df["distribution_channel"].to_numpy(dtype=object),
+        "reserved_room_type": df["reserved_room_type"].astype(str).to_numpy(dtype=object),
+        "day_of_week": pd.to_datetime(arrival_dates).dt.weekday.to_numpy(),
+    }
+
+    # Как и в map_row_to_booking: записи без гостей или с нулевыми ночами не сохраняются
+    keep = (columns["total_guests"] > 0) & (columns["total_nights"] > 0)
+    if not keep.all():
+        columns = {col: values[keep] for col, values in columns.items()}
+
+    return columns
+
+
+async def prepare_columnar_bookings(content: bytes, hotel_id: int) -> dict[str, np.ndarray]:
+    """
+    Подготовка колонок Booking из Parquet/Arrow-файла в общем executor подготовки CSV
+    (тот же пул и семафор, см. CSVPreparationConfig).
+    """
+    logger.info("Начата обработка колоночного файла для отеля %s (размер: %d байт)", hotel_id, len(content))
+
+    if not content:
+        raise ColumnarFormatError("Загруженный файл пуст.")
+
+    loop = asyncio.get_running_loop()
+    async with get_preparation_semaphore():
+        columns = await loop.run_in_executor(
+            get_preparation_executor(), prepare_columnar_columns, content
+        )
+
+    logger.info("Подготовлено строк: %s", len(columns["arrival_date"]))
+    return columns
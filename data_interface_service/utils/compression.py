@@ -0,0 +1,112 @@
+import gzip
+import io
+import zlib
+from enum import Enum
+from typing import BinaryIO
+
+from shared.errors import CSVProcessingError, ServiceError
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Размер начального фрагмента, который распаковывается для определения разделителя CSV
+SAMPLE_SIZE = 64 * 1024
+
+
+class UploadEncoding(str, Enum):
+    identity = "identity"
+    gzip = "gzip"
+    zstd = "zstd"
+
+
+# Значения Content-Encoding и Content-Type части multipart, которыми клиент может объявить сжатие
+DECLARED_ENCODINGS = {
+    "gzip": UploadEncoding.gzip,
+    "x-gzip": UploadEncoding.gzip,
+    "application/gzip": UploadEncoding.gzip,
+    "application/x-gzip": UploadEncoding.gzip,
+    "zstd": UploadEncoding.zstd,
+    "application/zstd": UploadEncoding.zstd,
+}
+
+
+def detect_upload_encoding(content: bytes, declared: str | None = None) -> UploadEncoding:
+    """
+    Определяет сжатие загруженного файла.
+    Решает сигнатура файла; объявленное клиентом сжатие (Content-Encoding или Content-Type части)
+    только проверяется — несовпадение означает повреждённую или неверно помеченную загрузку.
+    """
+    if content[:2] == GZIP_MAGIC:
+        detected = UploadEncoding.gzip
+    elif content[:4] == ZSTD_MAGIC:
+        detected = UploadEncoding.zstd
+    else:
+        detected = UploadEncoding.identity
+
+    expected = DECLARED_ENCODINGS.get((declared or "").split(";")[0].strip().lower())
+    if expected is not None and expected is not detected:
+        raise CSVProcessingError(f"Файл объявлен как {expected.value}, но не является {expected.value}-архивом.")
+
+    return detected
+
+
+class _LimitedReader(io.RawIOBase):
+    """Ограничивает объём распакованных данных: защита от архивов-бомб."""
+
+    def __init__(self, source: BinaryIO, limit: int):
+        super().__init__()
+        self._source = source
+        self._remaining = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._source.read(len(buffer))
+        self._remaining -= len(data)
+        if self._remaining < 0:
+            raise CSVProcessingError("Распакованный файл превышает допустимый размер.")
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self._source.close()
+        super().close()
+
+
+def _import_zstandard():
+    """Ленивый импорт zstandard: зависимость нужна только для zstd-загрузок."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ServiceError("Загрузка zstd недоступна: не установлен zstandard") from e
+    return zstandard
+
+
+def open_decompressed(content: bytes, encoding: UploadEncoding, limit: int | None = None) -> BinaryIO:
+    """
+    Открывает потоковый распаковщик поверх сжатого содержимого.
+    Данные распаковываются по мере чтения и целиком в памяти не появляются.
+    """
+    source = io.BytesIO(content)
+
+    if encoding is UploadEncoding.gzip:
+        stream = gzip.GzipFile(fileobj=source, mode="rb")
+    elif encoding is UploadEncoding.zstd:
+        stream = _import_zstandard().ZstdDecompressor().stream_reader(source, read_across_frames=True)
+    else:
+        stream = source
+
+    if limit is None:
+        return stream
+    return io.BufferedReader(_LimitedReader(stream, limit))
+
+
+def decompression_errors() -> tuple[type[Exception], ...]:
+    """Исключения распаковщиков, означающие повреждённый архив."""
+    errors: tuple[type[Exception], ...] = (gzip.BadGzipFile, zlib.error, EOFError)
+    try:
+        import zstandard
+    except ImportError:
+        return errors
+    return errors + (zstandard.ZstdError,)
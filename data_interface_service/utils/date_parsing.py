@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from pandas.api.extensions import take
 
 from shared.errors import CSVProcessingError
 
@@ -30,12 +32,26 @@ SUPPORTED_DATE_FORMATS = [
 ]
 
 
-def _try_parse_multiple_formats(series: pd.Series) -> pd.Series:
+# Предрассчитанный справочник месяцев: RU/EN названия и числовые записи
+MONTH_LOOKUP = {
+    **RUS_MONTH_MAP,
+    **EN_MONTH_MAP,
+    **{str(m): m for m in range(1, 13)},
+    **{f"{m:02d}": m for m in range(1, 10)},
+}
+
+
+def _broadcast_unique(codes: np.ndarray, parsed_uniques) -> np.ndarray:
+    """Разворачивает значения, посчитанные по уникальным, обратно на все строки (код -1 → NA)."""
+    return take(np.asarray(parsed_uniques), codes, allow_fill=True)
+
+
+def _parse_unique_values(uniques: pd.Series) -> pd.Series:
     """
-    Пытается распарсить серию по всем известным форматам.
+    Пытается распарсить уникальные строки по всем известным форматам.
     Возвращает серию с датами или NaT.
     """
-    parsed = pd.to_datetime(series, errors="coerce", dayfirst=True)
+    parsed = pd.to_datetime(uniques, errors="coerce", dayfirst=True)
 
     mask = parsed.isna()
     if not mask.any():
@@ -43,7 +59,7 @@ def _try_parse_multiple_formats(series: pd.Series) -> pd.Series:
 
     # Пробуем явные форматы
     for fmt in SUPPORTED_DATE_FORMATS:
-        parsed2 = pd.to_datetime(series[mask], format=fmt, errors="coerce")
+        parsed2 = pd.to_datetime(uniques[mask], format=fmt, errors="coerce")
         parsed.loc[mask] = parsed2
         mask = parsed.isna()
         if not mask.any():
@@ -52,16 +68,26 @@ def _try_parse_multiple_formats(series: pd.Series) -> pd.Series:
     return parsed
 
 
+def _try_parse_multiple_formats(series: pd.Series) -> pd.Series:
+    """
+    Парсит серию дат по уникальным значениям: factorize → разбор уникальных → broadcast.
+    Стоимость разбора зависит от числа различных дат, а не от числа строк.
+    Возвращает серию с датами или NaT.
+    """
+    codes, uniques = pd.factorize(series)
+    parsed_uniques = _parse_unique_values(pd.Series(uniques, dtype=object).astype(str))
+
+    return pd.Series(_broadcast_unique(codes, parsed_uniques), index=series.index)
+
+
 def _normalize_month(x):
     """Преобразует строковое название месяца в номер, с поддержкой RU/EN."""
     if isinstance(x, str):
         x_low = x.lower().strip()
 
-        if x_low in RUS_MONTH_MAP:
-            return RUS_MONTH_MAP[x_low]
-
-        if x_low in EN_MONTH_MAP:
-            return EN_MONTH_MAP[x_low]
+        month = MONTH_LOOKUP.get(x_low)
+        if month is not None:
+            return month
 
         if x_low.isdigit():
             return int(x_low)
@@ -70,6 +96,22 @@ def _normalize_month(x):
     return x  # если int
 
 
+def _normalize_months(series: pd.Series) -> pd.Series:
+    """Нормализует колонку месяцев через справочник, применяя его только к уникальным значениям."""
+    codes, uniques = pd.factorize(series)
+    months = np.array([_normalize_month(u) for u in uniques], dtype=float)
+
+    return pd.Series(_broadcast_unique(codes, months), index=series.index)
+
+
+def to_dates(parsed: pd.Series) -> pd.Series:
+    """Переводит datetime-серию в объекты date, создавая их один раз на уникальную дату."""
+    codes, uniques = pd.factorize(parsed)
+    dates = np.array([ts.date() for ts in uniques], dtype=object)
+
+    return pd.Series(take(dates, codes, allow_fill=True), index=parsed.index, dtype=object)
+
+
 def parse_dates_vectorized(df: pd.DataFrame) -> pd.Series:
     """
     Универсальный парсер дат, поддерживающий разные форматы, RU/EN слова и составные поля.
@@ -77,9 +119,9 @@ def parse_dates_vectorized(df: pd.DataFrame) -> pd.Series:
 
     # --- Если arrival_date существует — пробуем все форматы ---
     if "arrival_date" in df.columns:
-        primary = _try_parse_multiple_formats(df["arrival_date"].astype(str))
+        primary = _try_parse_multiple_formats(df["arrival_date"])
     else:
-        primary = pd.Series(pd.NaT, index=df.index)
+        primary = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
 
     mask = primary.isna()
 
@@ -88,15 +130,13 @@ def parse_dates_vectorized(df: pd.DataFrame) -> pd.Series:
         required = ["arrival_date_year", "arrival_date_month", "arrival_date_day_of_month"]
         if all(col in df.columns for col in required):
 
-            months = df.loc[mask, "arrival_date_month"].map(_normalize_month)
-
-            composed = (
-                df.loc[mask, "arrival_date_year"].astype(str)
-                + "-" + months.astype(str)
-                + "-" + df.loc[mask, "arrival_date_day_of_month"].astype(str)
-            )
+            parts = pd.DataFrame({
+                "year": pd.to_numeric(df.loc[mask, "arrival_date_year"], errors="coerce"),
+                "month": _normalize_months(df.loc[mask, "arrival_date_month"]),
+                "day": pd.to_numeric(df.loc[mask, "arrival_date_day_of_month"], errors="coerce"),
+            })
 
-            parsed_composed = pd.to_datetime(composed, errors="coerce")
+            parsed_composed = pd.to_datetime(parts, errors="coerce")
             primary.loc[mask] = parsed_composed
 
             mask = primary.isna()
@@ -108,4 +148,4 @@ def parse_dates_vectorized(df: pd.DataFrame) -> pd.Series:
             f"Не удалось распарсить даты. Некорректные строки: {idx[:10]}"
         )
 
-    return primary.dt.date
\ No newline at end of file
+    return to_dates(primary)
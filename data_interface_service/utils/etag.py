@@ -0,0 +1,24 @@
+import hashlib
+
+
+def make_etag(*parts) -> str:
+    """Строит сильный ETag из частей версии (порядок частей значим)."""
+    payload = "|".join(str(part) for part in parts).encode()
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match по слабому сравнению (RFC 9110):
+    префикс W/ игнорируется, "*" совпадает с любым ETag.
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from data_interface_service.config import data_interface_config
+
+logger = logging.getLogger(__name__)
+
+_process_pool: ProcessPoolExecutor | None = None
+_preparation_semaphore: asyncio.Semaphore | None = None
+
+
+def get_preparation_executor() -> Executor | None:
+    """
+    Возвращает executor для подготовки CSV.
+
+    Для backend="thread" возвращает None (пул потоков event loop по умолчанию),
+    для backend="process" — лениво создаёт общий ProcessPoolExecutor.
+    """
+    global _process_pool
+
+    cfg = data_interface_config.csv_preparation
+    if cfg.backend == "thread":
+        return None
+
+    if _process_pool is None:
+        # spawn: дочерние процессы не наследуют потоки и соединения event loop
+        _process_pool = ProcessPoolExecutor(
+            max_workers=cfg.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Пул процессов подготовки CSV создан: workers=%s", cfg.workers)
+
+    return _process_pool
+
+
+def get_preparation_semaphore() -> asyncio.Semaphore:
+    """Ограничивает число одновременных подготовок CSV в рамках воркера."""
+    global _preparation_semaphore
+
+    if _preparation_semaphore is None:
+        _preparation_semaphore = asyncio.Semaphore(data_interface_config.csv_preparation.max_concurrent)
+    return _preparation_semaphore
+
+
+def shutdown_preparation_executor() -> None:
+    """Останавливает пул процессов (вызывается при завершении сервиса)."""
+    global _process_pool
+
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+        logger.info("Пул процессов подготовки CSV остановлен")
@@ -0,0 +1,131 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from data_interface_service.utils.arrow import import_pyarrow
+
+EXPORT_COLUMNS = ("kind", "has_deposit", "day", "bookings", "cancellations")
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    arrow = "arrow"
+    parquet = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+FILE_EXTENSIONS = {
+    ExportFormat.csv: "csv",
+    ExportFormat.arrow: "arrows",
+    ExportFormat.parquet: "parquet",
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Файловый приёмник для писателей pyarrow: копит записанные байты до drain().
+    tell() возвращает общее число записанных байт — Parquet использует его для смещений row group.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def ensure_format_available(fmt: ExportFormat) -> None:
+    """Проверяет зависимости формата до начала потоковой отдачи (после неё статус уже не изменить)."""
+    if fmt in (ExportFormat.arrow, ExportFormat.parquet):
+        import_pyarrow()
+
+
+def _arrow_schema(pa):
+    return pa.schema([
+        ("kind", pa.string()),
+        ("has_deposit", pa.bool_()),
+        ("day", pa.date32()),
+        ("bookings", pa.float64()),
+        ("cancellations", pa.float64()),
+    ])
+
+
+def _to_record_batch(pa, schema, rows: Sequence[Sequence]):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+async def encode_csv(batches: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_arrow(batches: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[bytes]:
+    pa = import_pyarrow()
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for rows in batches:
+            writer.write_batch(_to_record_batch(pa, schema, rows))
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+async def encode_parquet(batches: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[bytes]:
+    pa = import_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+
+    # Каждая пачка курсора становится отдельной row group: в памяти держится только она
+    with pq.ParquetWriter(sink, schema) as writer:
+        async for rows in batches:
+            writer.write_batch(_to_record_batch(pa, schema, rows))
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+ENCODERS = {
+    ExportFormat.csv: encode_csv,
+    ExportFormat.arrow: encode_arrow,
+    ExportFormat.parquet: encode_parquet,
+}
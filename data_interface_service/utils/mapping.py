@@ -6,6 +6,11 @@ from shared.errors import MappingError
 logger = logging.getLogger(__name__)
 
 
+def map_has_deposit(value) -> bool:
+    """Преобразует значение deposit_type из CSV в признак наличия депозита."""
+    return str(value).lower() != "no deposit"
+
+
 def map_row_to_booking(row, hotel_id: int) -> Booking | None:
     """
     Преобразует строку DataFrame в объект Booking.
@@ -26,7 +31,7 @@ def map_row_to_booking(row, hotel_id: int) -> Booking | None:
             total_guests=total_guests,
             total_nights=total_nights,
             booking_changes=int(row["booking_changes"]),
-            has_deposit=str(row["has_deposit"]).lower() != "no deposit",
+            has_deposit=map_has_deposit(row["has_deposit"]),
             is_cancellation=bool(row["is_cancellation"]),
             market_segment=row["market_segment"],
             distribution_channel=row["distribution_channel"],
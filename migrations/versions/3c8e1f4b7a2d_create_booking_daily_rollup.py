@@ -0,0 +1,52 @@
+"""Create booking_daily rollup table
+
+Revision ID: 3c8e1f4b7a2d
+Revises: a9924596f2fc
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e1f4b7a2d'
+down_revision: Union[str, Sequence[str], None] = 'a9924596f2fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('booking_daily',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('hotel_id', sa.Integer(), nullable=False),
+                    sa.Column('has_deposit', sa.Boolean(), nullable=False),
+                    sa.Column('arrival_date', sa.Date(), nullable=False),
+                    sa.Column('bookings', sa.Integer(), server_default=sa.text('0'), nullable=False),
+                    sa.Column('cancellations', sa.Integer(), server_default=sa.text('0'), nullable=False),
+                    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+                              nullable=False),
+                    sa.ForeignKeyConstraint(['hotel_id'], ['hotel.id'], ),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('hotel_id', 'has_deposit', 'arrival_date', name='uq_booking_daily_key')
+                    )
+
+    # Первичное заполнение rollup по уже загруженным бронированиям
+    op.execute(
+        """
+        INSERT INTO booking_daily (hotel_id, has_deposit, arrival_date, bookings, cancellations)
+        SELECT hotel_id, has_deposit, arrival_date,
+               count(id),
+               coalesce(sum(is_cancellation::int), 0)
+        FROM booking
+        WHERE has_deposit IS NOT NULL
+        GROUP BY hotel_id, has_deposit, arrival_date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('booking_daily')
@@ -0,0 +1,53 @@
+"""Add composite indexes for hot booking, prediction and weather queries
+
+Revision ID: 7b2e9d4c1f06
+Revises: 3c8e1f4b7a2d
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9d4c1f06'
+down_revision: Union[str, Sequence[str], None] = '3c8e1f4b7a2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+    # поэтому индексы строятся в autocommit-блоке без блокировки записи в таблицы.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_booking_hotel_deposit_arrival', 'booking',
+                        ['hotel_id', 'has_deposit', 'arrival_date'],
+                        postgresql_include=['is_cancellation'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_booking_hotel_ref', 'booking',
+                        ['hotel_id', 'booking_ref'],
+                        postgresql_where=sa.text('booking_ref IS NOT NULL'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_prediction_hotel_deposit_target', 'prediction',
+                        ['hotel_id', 'has_deposit', 'target_date'],
+                        postgresql_include=['bookings', 'cancellations'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_weather_city_day', 'weather',
+                        ['city_id', 'day'],
+                        postgresql_include=['temp_avg'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_weather_city_day', table_name='weather',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_prediction_hotel_deposit_target', table_name='prediction',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_booking_hotel_ref', table_name='booking',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_booking_hotel_deposit_arrival', table_name='booking',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,139 @@
+"""Partition booking by arrival_date
+
+Revision ID: c41d6a8e9b53
+Revises: 7b2e9d4c1f06
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d6a8e9b53'
+down_revision: Union[str, Sequence[str], None] = '7b2e9d4c1f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BOOKING_COLUMNS = (
+    "id, booking_ref, hotel_id, arrival_date, lead_time, adr, total_guests, total_nights, "
+    "booking_changes, has_deposit, is_cancellation, market_segment, distribution_channel, "
+    "reserved_room_type, day_of_week, created_at"
+)
+
+# Годовые партиции booking_yYYYY; advisory lock исключает гонку параллельных импортов
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_booking_partitions(start_date date, end_date date)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    year_start date := date_trunc('year', start_date)::date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE year_start <= end_date LOOP
+        partition_name := format('booking_y%s', to_char(year_start, 'YYYY'));
+        IF to_regclass(partition_name) IS NULL THEN
+            PERFORM pg_advisory_xact_lock(hashtext('ensure_booking_partitions'));
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF booking FOR VALUES FROM (%L) TO (%L)',
+                partition_name, year_start, (year_start + interval '1 year')::date
+            );
+            created := created + 1;
+        END IF;
+        year_start := (year_start + interval '1 year')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+"""
+
+
+def _booking_columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('booking_id_seq'::regclass)"),
+                  nullable=False),
+        sa.Column('booking_ref', sa.String(), nullable=True),
+        sa.Column('hotel_id', sa.Integer(), nullable=False),
+        sa.Column('arrival_date', sa.Date(), nullable=False),
+        sa.Column('lead_time', sa.Integer(), nullable=True),
+        sa.Column('adr', sa.Float(), nullable=True),
+        sa.Column('total_guests', sa.Integer(), nullable=True),
+        sa.Column('total_nights', sa.Integer(), nullable=True),
+        sa.Column('booking_changes', sa.Integer(), nullable=True),
+        sa.Column('has_deposit', sa.Boolean(), nullable=True),
+        sa.Column('is_cancellation', sa.Boolean(), nullable=True),
+        sa.Column('market_segment', sa.String(), nullable=True),
+        sa.Column('distribution_channel', sa.String(), nullable=True),
+        sa.Column('reserved_room_type', sa.String(), nullable=True),
+        sa.Column('day_of_week', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['hotel_id'], ['hotel.id'], ),
+    ]
+
+
+def _create_booking_indexes() -> None:
+    op.create_index('ix_booking_hotel_deposit_arrival', 'booking',
+                    ['hotel_id', 'has_deposit', 'arrival_date'],
+                    postgresql_include=['is_cancellation'])
+    op.create_index('ix_booking_hotel_ref', 'booking',
+                    ['hotel_id', 'booking_ref'],
+                    postgresql_where=sa.text('booking_ref IS NOT NULL'))
+
+
+def _detach_legacy_booking() -> None:
+    """Переименовывает текущую booking, освобождая имена индексов и отвязывая последовательность id."""
+    op.drop_index('ix_booking_hotel_ref', table_name='booking')
+    op.drop_index('ix_booking_hotel_deposit_arrival', table_name='booking')
+    op.execute("ALTER TABLE booking RENAME TO booking_legacy")
+    op.execute("ALTER TABLE booking_legacy RENAME CONSTRAINT booking_pkey TO booking_legacy_pkey")
+    op.execute("ALTER SEQUENCE booking_id_seq OWNED BY NONE")
+
+
+def _replace_legacy_booking() -> None:
+    """Переносит строки из booking_legacy в новую booking и удаляет старую таблицу."""
+    op.execute(f"INSERT INTO booking ({BOOKING_COLUMNS}) SELECT {BOOKING_COLUMNS} FROM booking_legacy")
+    op.execute("ALTER SEQUENCE booking_id_seq OWNED BY booking.id")
+    op.drop_table('booking_legacy')
+    _create_booking_indexes()
+    op.execute("ANALYZE booking")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _detach_legacy_booking()
+
+    op.create_table('booking',
+                    *_booking_columns(),
+                    sa.PrimaryKeyConstraint('id', 'arrival_date'),
+                    postgresql_partition_by='RANGE (arrival_date)',
+                    )
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+    # Партиции на весь диапазон имеющихся данных и на год вперёд
+    op.execute(
+        """
+        SELECT ensure_booking_partitions(
+            coalesce(min(arrival_date), current_date),
+            greatest(coalesce(max(arrival_date), current_date), (current_date + interval '1 year')::date)
+        )
+        FROM booking_legacy
+        """
+    )
+
+    _replace_legacy_booking()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _detach_legacy_booking()
+
+    op.create_table('booking',
+                    *_booking_columns(),
+                    sa.PrimaryKeyConstraint('id'),
+                    )
+
+    _replace_legacy_booking()
+    op.execute("DROP FUNCTION IF EXISTS ensure_booking_partitions(date, date)")
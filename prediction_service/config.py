@@ -1,14 +1,40 @@
 from pathlib import Path
 from pydantic import Field
+from pydantic_settings import SettingsConfigDict
 
 from shared.base_config import ConfigBase
 from shared.db_config import DatabaseConfig
 
 
+class RedisConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="REDIS_")
+
+    host: str
+    port: int
+    socket_timeout: float = Field(0.5, gt=0)
+
+
+class MemoryProfilingConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="MEMORY_PROFILING_")
+
+    # Профилировать каждый прогноз и обучение (иначе — только запросы с заголовком X-Profile-Memory)
+    enabled: bool = False
+    # Разрешить включать профилирование заголовком X-Profile-Memory
+    allow_header: bool = True
+    # Число строк кода с наибольшим приростом памяти на этап
+    top_allocations: int = Field(10, ge=1)
+    # Глубина стека tracemalloc (1 — группировка по строке выделения)
+    traceback_frames: int = Field(1, ge=1)
+    # Сколько последних профилей хранить для GET /debug/memory-profiles
+    history_size: int = Field(20, ge=1)
+
+
 class PredictionServiceConfig(ConfigBase):
     model_dir: Path = Path("prediction_service/models")
 
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    redis: RedisConfig = Field(default_factory=RedisConfig)
+    memory_profiling: MemoryProfilingConfig = Field(default_factory=MemoryProfilingConfig)
 
 
 prediction_config = PredictionServiceConfig()
@@ -13,12 +13,16 @@ from shared.errors import (
     ValidationError,
     ServiceError,
 )
+from shared.metrics import StageTimer
 from prediction_service.core.model_loader import load_model_and_config
 from prediction_service.preprocessing.preprocessor import preprocess_data
 from prediction_service.preprocessing.scaling import normalize_data, denormalize_forecast
 
 logger = logging.getLogger(__name__)
 
+# Имя конвейера в метрике pipeline_stage_duration_seconds
+FORECAST_PIPELINE = "forecast"
+
 
 def aggregate_forecast_inputs(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -49,53 +53,70 @@ def aggregate_forecast_inputs(df: pd.DataFrame) -> pd.DataFrame:
 
 def process_inputs_for_model(
     hotel_id: int, db: Session, config: dict,
-    target_date: date, has_deposit: bool
+    target_date: date, has_deposit: bool,
+    timer: StageTimer | None = None,
 ) -> np.ndarray:
     """
     Загружает и подготавливает входные данные для модели.
+    Длительность этапов записывается в timer.
 
     Returns:
         np.ndarray: массив входных признаков формы [horizon, num_features].
     """
     logger.info(f"Подготовка входных данных: hotel_id={hotel_id}, target_date={target_date}, has_deposit={has_deposit}")
 
+    # Окно признаков — последние 30 дней до target_date
+    start_date = target_date - timedelta(days=29)
+    timer = timer or StageTimer(FORECAST_PIPELINE)
+
+    try:
+        with timer.stage("load_bookings"):
+            df_b = load_bookings(hotel_id, db, start_date=start_date, end_date=target_date, has_deposit=has_deposit)
+    except ValidationError:
+        raise ValidationError(f"Нет данных о бронированиях {start_date} – {target_date}")
+    except Exception as e:
+        logger.error("Ошибка при загрузке данных: %s", e)
+        raise ServiceError("Ошибка загрузки данных для прогноза")
+
     try:
-        df_b = load_bookings(hotel_id, db)
-        df_b = df_b[df_b['has_deposit'] == has_deposit]
-        df_w = load_weather(hotel_id, db)
-        df_h = load_holidays(db)
-        hotel = db.query(Hotel).get(hotel_id)
+        with timer.stage("load_weather"):
+            df_w = load_weather(hotel_id, db)
+        with timer.stage("load_holidays"):
+            df_h = load_holidays(db)
+        with timer.stage("load_hotel"):
+            hotel = db.query(Hotel).get(hotel_id)
     except Exception as e:
         logger.error("Ошибка при загрузке данных: %s", e)
         raise ServiceError("Ошибка загрузки данных для прогноза")
 
-    # Преобразование дат
-    for col in ['arrival_date']:
-        df_b[col] = pd.to_datetime(df_b[col], errors='coerce')
-    df_w['date'] = pd.to_datetime(df_w['date'], errors='coerce')
-    df_h['date'] = pd.to_datetime(df_h['date'], errors='coerce')
+    with timer.stage("merge"):
+        # Преобразование дат
+        for col in ['arrival_date']:
+            df_b[col] = pd.to_datetime(df_b[col], errors='coerce')
+        df_w['date'] = pd.to_datetime(df_w['date'], errors='coerce')
+        df_h['date'] = pd.to_datetime(df_h['date'], errors='coerce')
 
-    # Очистка
-    df_b.drop(columns=["booking_ref", "created_at"], inplace=True, errors="ignore")
-    df_h.drop(columns=["region", "created_at"], inplace=True, errors="ignore")
+        # Очистка
+        df_b.drop(columns=["booking_ref", "created_at"], inplace=True, errors="ignore")
+        df_h.drop(columns=["region", "created_at"], inplace=True, errors="ignore")
 
-    # Объединение с погодой
-    df = df_b.merge(df_w, left_on='arrival_date', right_on='date',
-                    how='left', suffixes=('', '_weather'))
+        # Объединение с погодой
+        df = df_b.merge(df_w, left_on='arrival_date', right_on='date',
+                        how='left', suffixes=('', '_weather'))
 
-    # Ограничение диапазона (последние 30 дней)
-    start_date = target_date - timedelta(days=29)
-    df = df[(df["arrival_date"].dt.date >= start_date) & (df["arrival_date"].dt.date <= target_date)]
-    if df.empty:
-        raise ValidationError(f"Нет данных о бронированиях {start_date} – {target_date}")
+        if df.empty:
+            raise ValidationError(f"Нет данных о бронированиях {start_date} – {target_date}")
+
+        # Добавление признаков
+        df['is_holiday'] = df['arrival_date'].isin(df_h['date']).astype(int)
+        df['is_city_hotel'] = int(hotel.is_city_hotel)
 
-    # Добавление признаков
-    df['is_holiday'] = df['arrival_date'].isin(df_h['date']).astype(int)
-    df['is_city_hotel'] = int(hotel.is_city_hotel)
-    df = preprocess_data(df, hotel_id)
+    with timer.stage("preprocess"):
+        df = preprocess_data(df, hotel_id, timer)
 
     # Нормализация
-    df = normalize_data(df, hotel_id)
+    with timer.stage("normalize"):
+        df = normalize_data(df, hotel_id)
 
     # Проверка на признаки
     numeric_features = config["numeric_features"]
@@ -105,7 +126,8 @@ def process_inputs_for_model(
         raise ModelConfigError(f"В данных отсутствуют признаки: {missing}")
 
     # Агрегация по датам
-    df = aggregate_forecast_inputs(df)
+    with timer.stage("aggregate"):
+        df = aggregate_forecast_inputs(df)
 
     # Проверка количества дней
     if len(df) < config["forecast_horizon"]:
@@ -122,17 +144,21 @@ def process_inputs_for_model(
 
 
 def run_forecast_for_hotel(
-    hotel_id: int, db: Session, target_date: date, has_deposit: bool
+    hotel_id: int, db: Session, target_date: date, has_deposit: bool,
+    timer: StageTimer | None = None,
 ) -> dict:
     """
     Запускает прогноз для отеля.
+    Длительность этапов (загрузка модели и данных, подготовка, прямой проход) записывается в timer.
     """
     logger.info(f"Запуск прогноза: hotel_id={hotel_id}, target_date={target_date}, has_deposit={has_deposit}")
+    timer = timer or StageTimer(FORECAST_PIPELINE)
 
-    model, config = load_model_and_config(hotel_id)
+    with timer.stage("model_load"):
+        model, config = load_model_and_config(hotel_id)
 
     # Подготовка входов
-    X = process_inputs_for_model(hotel_id, db, config, target_date, has_deposit)
+    X = process_inputs_for_model(hotel_id, db, config, target_date, has_deposit, timer)
 
     expected_dim = config["num_numeric_features"] + len(config["categorical_features"])
     if X.shape[1] != expected_dim:
@@ -144,19 +170,21 @@ def run_forecast_for_hotel(
     X_numeric = X[:, :len(num_feats)]
     X_categorical = X[:, len(num_feats):]
 
-    x_cat_dict = {
-        feat: torch.tensor(X_categorical[:, idx], dtype=torch.long).unsqueeze(0)
-        for idx, feat in enumerate(cat_feats)
-    }
-    x_numeric_tensor = torch.tensor(X_numeric, dtype=torch.float32).unsqueeze(0)
+    with timer.stage("forward"):
+        x_cat_dict = {
+            feat: torch.tensor(X_categorical[:, idx], dtype=torch.long).unsqueeze(0)
+            for idx, feat in enumerate(cat_feats)
+        }
+        x_numeric_tensor = torch.tensor(X_numeric, dtype=torch.float32).unsqueeze(0)
 
-    try:
-        with torch.no_grad():
-            y_pred = model(x_numeric_tensor, x_cat_dict).squeeze(0).numpy()
-    except Exception as e:
-        raise ServiceError(f"Ошибка при выполнении прогноза: {e}")
+        try:
+            with torch.no_grad():
+                y_pred = model(x_numeric_tensor, x_cat_dict).squeeze(0).numpy()
+        except Exception as e:
+            raise ServiceError(f"Ошибка при выполнении прогноза: {e}")
 
-    y_pred = denormalize_forecast(y_pred, hotel_id)
+    with timer.stage("denormalize"):
+        y_pred = denormalize_forecast(y_pred, hotel_id)
 
     forecast = [
         {
@@ -167,7 +195,10 @@ def run_forecast_for_hotel(
         for i, (book, cancel) in enumerate(y_pred)
     ]
 
-    logger.info(f"Прогноз завершён: {len(forecast)} дней")
+    logger.info(
+        "Прогноз завершён: hotel_id=%s, %s дней за %s мс, этапы (мс): %s",
+        hotel_id, len(forecast), timer.total_ms, timer.timings,
+    )
 
     return {
         "hotel_id": hotel_id,
@@ -0,0 +1,157 @@
+import logging
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+
+from prediction_service.config import prediction_config
+
+logger = logging.getLogger(__name__)
+
+# Заголовок запроса, включающий профилирование памяти для одного прогноза или обучения
+PROFILE_HEADER = "X-Profile-Memory"
+
+MB = 1024 * 1024
+
+# tracemalloc считает память всего процесса: одновременно профилируется только один запуск
+_profiling_lock = threading.Lock()
+
+# Последние профили для GET /debug/memory-profiles
+memory_profiles: deque[dict] = deque(maxlen=prediction_config.memory_profiling.history_size)
+
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _current_rss() -> int | None:
+    """Текущий RSS процесса в байтах (Linux, /proc/self/statm)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss() -> int:
+    """Максимальный RSS процесса за всё время работы в байтах (ru_maxrss в Linux — КиБ)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _mb(value: int | None) -> float | None:
+    return None if value is None else round(value / MB, 2)
+
+
+class MemoryProfiler:
+    """
+    Профиль памяти одного запуска конвейера (прогноз или обучение).
+
+    Для каждого этапа записывает RSS до и после, максимум RSS процесса (по нему видно, какой
+    этап поднял пик, приводящий к OOM), пик памяти Python-объектов и массивов numpy
+    по tracemalloc и строки кода с наибольшим приростом памяти за этап.
+    Передаётся в StageTimer(profiler=...) и вызывается из его stage().
+    """
+
+    def __init__(self, pipeline: str, top_allocations: int, **context):
+        self.pipeline = pipeline
+        self.top_allocations = top_allocations
+        self.context = context
+        self.stages: list[dict] = []
+        # Максимумы tracemalloc вложенных этапов: reset_peak() внутреннего этапа сбрасывает пик внешнего
+        self._peaks: list[int] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        self._peaks.append(0)
+
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        rss_before = _current_rss()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            traced_peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], traced_peak)
+
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+            top = [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in after.compare_to(before, "lineno")[:self.top_allocations]
+                if stat.size_diff > 0
+            ]
+            rss_after = _current_rss()
+            self.stages.append({
+                "stage": name,
+                "duration_ms": round(duration * 1000, 3),
+                "rss_before_mb": _mb(rss_before),
+                "rss_after_mb": _mb(rss_after),
+                "rss_peak_mb": _mb(_peak_rss()),
+                "traced_peak_mb": _mb(traced_peak),
+                "top_allocations": top,
+            })
+
+    def summary(self) -> dict:
+        return {"pipeline": self.pipeline, **self.context, "stages": self.stages}
+
+
+def profiling_requested(header_value: str | None) -> bool:
+    """Нужно ли профилировать запуск: включено конфигурацией или заголовком X-Profile-Memory."""
+    config = prediction_config.memory_profiling
+    if config.enabled:
+        return True
+    return config.allow_header and (header_value or "").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def memory_profile(pipeline: str, enabled: bool, **context) -> Iterator[MemoryProfiler | None]:
+    """
+    Запускает tracemalloc на время блока и возвращает профилировщик (None, если профилирование
+    выключено или уже идёт в другом потоке). Без профилирования tracemalloc не запускается,
+    этапы работают без дополнительных затрат.
+    По завершении профиль пишется в лог и сохраняется в memory_profiles.
+    """
+    if not enabled:
+        yield None
+        return
+    if not _profiling_lock.acquire(blocking=False):
+        logger.warning("Профилирование памяти уже выполняется, запуск %s %s без профиля", pipeline, context)
+        yield None
+        return
+
+    config = prediction_config.memory_profiling
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(config.traceback_frames)
+    profiler = MemoryProfiler(pipeline, config.top_allocations, **context)
+    started_at = datetime.now(timezone.utc).isoformat()
+    try:
+        yield profiler
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _profiling_lock.release()
+
+        summary = {"started_at": started_at, **profiler.summary()}
+        memory_profiles.append(summary)
+        for stage in profiler.stages:
+            logger.info(
+                "Память %s %s, этап %s: RSS %s → %s МБ (пик процесса %s МБ), пик tracemalloc %s МБ, топ: %s",
+                pipeline, context, stage["stage"], stage["rss_before_mb"], stage["rss_after_mb"],
+                stage["rss_peak_mb"], stage["traced_peak_mb"], stage["top_allocations"][:3],
+            )
@@ -1,13 +1,15 @@
 import logging
 from datetime import datetime
 
-from fastapi import FastAPI, Depends, status
+from fastapi import FastAPI, Depends, Header, Response, status
 from sqlalchemy.orm import Session
 
 from prediction_service.core.model_loader import load_model_and_config
-from prediction_service.core.forecast import run_forecast_for_hotel
-from prediction_service.core.trainer import train_model_for_hotel, setup_hotel_model_from_base
+from prediction_service.core.forecast import FORECAST_PIPELINE, run_forecast_for_hotel
+from prediction_service.core.profiling import PROFILE_HEADER, memory_profile, memory_profiles, profiling_requested
+from prediction_service.core.trainer import TRAINING_PIPELINE, train_model_for_hotel, setup_hotel_model_from_base
 from prediction_service.config import prediction_config
+from prediction_service.redis_client import invalidate_forecast_cache
 from prediction_service.schemas import (
     TrainRequest, TrainResponse,
     InitHotelResponse,
@@ -24,14 +26,19 @@ from shared.errors import (
     ModelConfigError, ModelNotFoundError,
     ExternalServiceError, DatabaseError,
 )
+from shared.metrics import StageTimer, add_metrics
+from shared.responses import FastJSONResponse
+from shared.tracing import traces_router
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 app = FastAPI(title="Prediction Service API")
 
-register_error_handlers(app)
+register_error_handlers(app, service="prediction")
 setup_openapi_with_errors(app)
+add_metrics(app)
+app.include_router(traces_router)
 
 
 @app.get("/")
@@ -42,6 +49,7 @@ def root():
 @app.post(
     "/run-predict",
     response_model=PredictResponse,
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK
 )
 @register_errors(
@@ -50,37 +58,48 @@ def root():
 )
 def predict(
         req: PredictRequest,
-        db: Session = Depends(get_sync_session)
+        response: Response,
+        db: Session = Depends(get_sync_session),
+        x_profile_memory: str | None = Header(None, alias=PROFILE_HEADER),
 ) -> PredictResponse:
     """
     Запускает прогнозирование для указанного отеля.
+    Длительность этапов возвращается в заголовке Server-Timing, при debug=True — и в поле timings.
+    С заголовком X-Profile-Memory: 1 (или MEMORY_PROFILING_ENABLED) по этапам снимается профиль памяти.
     """
-    result = run_forecast_for_hotel(
-        req.hotel_id, db, req.target_date, has_deposit=req.has_deposit
-    )
-
-    # Сохраняем прогноз в БД
-    predictions = [
-        Prediction(
-            hotel_id=result["hotel_id"],
-            target_date=datetime.fromisoformat(day["date"]).date(),
-            has_deposit=req.has_deposit,
-            bookings=day["bookings"],
-            cancellations=day["cancellations"],
+    profiling = profiling_requested(x_profile_memory)
+    with memory_profile(FORECAST_PIPELINE, profiling, hotel_id=req.hotel_id) as profiler:
+        timer = StageTimer(FORECAST_PIPELINE, profiler=profiler)
+        result = run_forecast_for_hotel(
+            req.hotel_id, db, req.target_date, has_deposit=req.has_deposit, timer=timer
         )
-        for day in result["forecast"]
-    ]
-
-    try:
-        db.add_all(predictions)
-        db.commit()
-        logger.info(f"Прогноз сохранён: {len(predictions)} записей для hotel_id={req.hotel_id}")
-    except Exception as e:
-        db.rollback()
-        logger.exception("Ошибка при сохранении прогноза в БД: %s", e)
-        raise DatabaseError("Ошибка при сохранении прогноза в базу данных")
 
-    return PredictResponse(**result)
+        # Сохраняем прогноз в БД
+        predictions = [
+            Prediction(
+                hotel_id=result["hotel_id"],
+                target_date=datetime.fromisoformat(day["date"]).date(),
+                has_deposit=req.has_deposit,
+                bookings=day["bookings"],
+                cancellations=day["cancellations"],
+            )
+            for day in result["forecast"]
+        ]
+
+        try:
+            with timer.stage("db_write"):
+                db.add_all(predictions)
+                db.commit()
+            logger.info(f"Прогноз сохранён: {len(predictions)} записей для hotel_id={req.hotel_id}")
+        except Exception as e:
+            db.rollback()
+            logger.exception("Ошибка при сохранении прогноза в БД: %s", e)
+            raise DatabaseError("Ошибка при сохранении прогноза в базу данных")
+
+    invalidate_forecast_cache(req.hotel_id, req.has_deposit)
+
+    response.headers["Server-Timing"] = timer.server_timing()
+    return PredictResponse(**result, timings=timer.timings if req.debug else None)
 
 
 @app.post(
@@ -91,20 +110,25 @@ def predict(
 @register_errors(ServiceError)
 def train(
         req: TrainRequest,
-        db: Session = Depends(get_sync_session)
+        db: Session = Depends(get_sync_session),
+        x_profile_memory: str | None = Header(None, alias=PROFILE_HEADER),
 ) -> TrainResponse:
     """
     Обучает или дообучает модель для отеля.
+    С заголовком X-Profile-Memory: 1 (или MEMORY_PROFILING_ENABLED) по этапам снимается профиль памяти.
     """
     if req.init:
         setup_hotel_model_from_base(req.hotel_id)
 
-    train_model_for_hotel(
-        hotel_id=req.hotel_id,
-        db_session=db,
-        epochs=req.epochs,
-        batch_size=req.batch_size,
-    )
+    profiling = profiling_requested(x_profile_memory)
+    with memory_profile(TRAINING_PIPELINE, profiling, hotel_id=req.hotel_id) as profiler:
+        train_model_for_hotel(
+            hotel_id=req.hotel_id,
+            db_session=db,
+            epochs=req.epochs,
+            batch_size=req.batch_size,
+            timer=StageTimer(TRAINING_PIPELINE, profiler=profiler),
+        )
     return TrainResponse(
         hotel_id=req.hotel_id,
         message="Model fine-tuned and saved",
@@ -164,3 +188,12 @@ def get_model_config(hotel_id: int) -> ModelConfigResponse:
     logger.info(f"Запрос конфигурации модели для отеля {hotel_id}")
     _, config = load_model_and_config(hotel_id)
     return ModelConfigResponse(hotel_id=hotel_id, config=config)
+
+
+@app.get("/debug/memory-profiles", tags=["debug"])
+def get_memory_profiles():
+    """
+    Последние профили памяти прогнозов и обучения (новые в конце): RSS, пик tracemalloc
+    и строки с наибольшим приростом памяти по этапам.
+    """
+    return FastJSONResponse(list(memory_profiles))
@@ -10,6 +10,7 @@ from shared.errors import (
     MappingError,
     ModelConfigError,
 )
+from shared.metrics import StageTimer, timed_stage
 
 logger = logging.getLogger(__name__)
 
@@ -176,9 +177,10 @@ def enforce_numeric_types(df: pd.DataFrame) -> pd.DataFrame:
         raise ValidationError(f"Ошибка при приведении типов: {e}")
 
 
-def preprocess_data(df: pd.DataFrame, hotel_id: int) -> pd.DataFrame:
+def preprocess_data(df: pd.DataFrame, hotel_id: int, timer: StageTimer | None = None) -> pd.DataFrame:
     """
     Полный пайплайн предобработки данных.
+    Если передан timer, шаги записываются как вложенные этапы preprocess.*.
 
     Returns:
         pd.DataFrame: предобработанные данные для модели.
@@ -186,14 +188,18 @@ def preprocess_data(df: pd.DataFrame, hotel_id: int) -> pd.DataFrame:
     if df.empty:
         raise ValidationError("Пустой DataFrame для предобработки")
 
-    df = drop_irrelevant_columns(df)
-    df = enforce_numeric_types(df)
-    df = encode_categorical_features(df, hotel_id)
-    df = preprocess_dates(df)
-    df = add_derived_features(df)
+    with timed_stage(timer, "preprocess.encode"):
+        df = drop_irrelevant_columns(df)
+        df = enforce_numeric_types(df)
+        df = encode_categorical_features(df, hotel_id)
+
+    with timed_stage(timer, "preprocess.features"):
+        df = preprocess_dates(df)
+        df = add_derived_features(df)
 
     check_missing_for_aggregation(df)
-    df = aggregate_historical_features(df)
+    with timed_stage(timer, "preprocess.aggregate_historical"):
+        df = aggregate_historical_features(df)
 
     if df.isnull().sum().sum() > 0:
         logger.warning("Есть пропущенные значения после агрегации")
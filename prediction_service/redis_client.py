@@ -0,0 +1,32 @@
+import logging
+from functools import lru_cache
+
+import redis
+from redis.exceptions import RedisError
+
+from prediction_service.config import prediction_config
+from shared.forecast_cache_keys import forecast_generation_key
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_redis_client() -> redis.Redis:
+    return redis.Redis(
+        host=prediction_config.redis.host,
+        port=prediction_config.redis.port,
+        socket_timeout=prediction_config.redis.socket_timeout,
+        socket_connect_timeout=prediction_config.redis.socket_timeout,
+        decode_responses=True,
+    )
+
+
+def invalidate_forecast_cache(hotel_id: int, has_deposit: bool) -> None:
+    """
+    Инвалидирует кэш ответов Data Interface после записи прогноза.
+    Ошибка Redis не отменяет сохранённый прогноз: записи кэша истекут по TTL.
+    """
+    try:
+        get_redis_client().incr(forecast_generation_key(hotel_id, has_deposit))
+    except RedisError as e:
+        logger.warning("Не удалось инвалидировать кэш прогнозов hotel_id=%s: %s", hotel_id, e)
@@ -1,6 +1,6 @@
 from datetime import date
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 class TrainRequest(BaseModel):
     hotel_id: int
@@ -38,6 +38,8 @@ class PredictRequest(BaseModel):
     hotel_id: int
     target_date: date
     has_deposit: bool
+    # Вернуть в ответе длительность этапов прогноза (timings)
+    debug: bool = False
 
 
 class PredictDay(BaseModel):
@@ -52,4 +54,6 @@ class PredictDay(BaseModel):
 class PredictResponse(BaseModel):
     hotel_id: int
     target_date: date
-    forecast: List[PredictDay]
\ No newline at end of file
+    forecast: List[PredictDay]
+    # Миллисекунды по этапам прогноза; только при debug=True
+    timings: Optional[Dict[str, float]] = None
\ No newline at end of file
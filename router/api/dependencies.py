@@ -1,20 +1,50 @@
-import httpx
+from functools import lru_cache
+
 from fastapi import Header, Request, Cookie, Depends
 
 from router.api.schemas import AccessibleHotel
-from router.api.utils.jwt import (
-    decode_access_jwt,
-    validate_base_principal,
-    extract_accessible_hotels
+from router.api.utils.downstream import (
+    AUTH_SERVICE,
+    DATA_INTERFACE_SERVICE,
+    PREDICTION_SERVICE,
+    DownstreamClient,
 )
+from router.api.utils.jwt import verify_access_token
+from router.api.utils.rate_limit import RateLimiter
+from router.api.utils.token_cache import TokenCache, VerifiedPrincipal
+from router.config import router_config
 from shared.errors import AuthorizationError
 
+# Системные роли сотрудников, которым доступны служебные эндпоинты router
+STAFF_ROLES = frozenset({"admin", "support"})
+
+
+def get_auth_client(request: Request) -> DownstreamClient:
+    """
+    Возвращает клиента auth_service, инициализированного в lifespan.
+    """
+    return request.app.state.downstreams[AUTH_SERVICE]
+
+
+def get_data_interface_client(request: Request) -> DownstreamClient:
+    """
+    Возвращает клиента data_interface_service, инициализированного в lifespan.
+    """
+    return request.app.state.downstreams[DATA_INTERFACE_SERVICE]
+
+
+def get_prediction_client(request: Request) -> DownstreamClient:
+    """
+    Возвращает клиента prediction_service, инициализированного в lifespan.
+    """
+    return request.app.state.downstreams[PREDICTION_SERVICE]
+
 
-async def get_http_client(request: Request) -> httpx.AsyncClient:
+def get_rate_limiter(request: Request) -> RateLimiter:
     """
-    Возвращает общий HTTP-клиент, инициализированный в lifespan.
+    Возвращает лимитер запросов, инициализированный в lifespan.
     """
-    return request.app.state.http_client
+    return request.app.state.rate_limiter
 
 
 def get_access_token(
@@ -28,28 +58,63 @@ def get_access_token(
     return access_token
 
 
-def get_jwt_principal(
+@lru_cache()
+def get_token_cache() -> TokenCache | None:
+    """Dependency: общий кэш проверенных access JWT или None, если кэш выключен."""
+    cfg = router_config.jwt_cache
+    if not cfg.enabled:
+        return None
+    return TokenCache(max_size=cfg.max_size, ttl_seconds=cfg.ttl_seconds)
+
+
+def get_verified_principal(
         token: str = Depends(get_access_token),
+        cache: TokenCache | None = Depends(get_token_cache),
+) -> VerifiedPrincipal:
+    """
+    Проверяет access JWT (через кэш) и возвращает payload вместе с картой отелей.
+    """
+    return verify_access_token(token, cache)
+
+
+def get_jwt_principal(
+        principal: VerifiedPrincipal = Depends(get_verified_principal),
 ) -> dict:
     """
     Декодирует и валидирует access JWT, возвращая проверенный payload.
     """
-    payload = decode_access_jwt(token)
+    return principal.payload
 
-    return validate_base_principal(payload)
+
+def get_staff_principal(
+        principal: dict = Depends(get_jwt_principal),
+) -> dict:
+    """
+    Пропускает только сотрудников (system_role admin или support): служебные эндпоинты
+    раскрывают внутренние детали сервисов.
+    """
+    if principal.get("system_role") not in STAFF_ROLES:
+        raise AuthorizationError("Access denied")
+    return principal
 
 
 def get_current_hotel(
         x_hotel_id: int = Header(..., alias="X-Hotel-Id"),
-        payload: dict = Depends(get_jwt_principal),
+        principal: VerifiedPrincipal = Depends(get_verified_principal),
 ) -> AccessibleHotel:
     """
     Проверяет доступ пользователя к отелю и возвращает его контекст.
     """
-    hotels = extract_accessible_hotels(payload)
+    hotel = principal.accessible_hotels().get(x_hotel_id)
+    if hotel is None:
+        raise AuthorizationError("Access to hotel denied")
+    return hotel
 
-    for hotel in hotels:
-        if hotel.id == x_hotel_id:
-            return hotel
 
-    raise AuthorizationError("Access to hotel denied")
+def get_accessible_hotels(
+        principal: VerifiedPrincipal = Depends(get_verified_principal),
+) -> list[AccessibleHotel]:
+    """
+    Возвращает все отели, доступные пользователю согласно access-токену.
+    """
+    return list(principal.accessible_hotels().values())
@@ -1,10 +1,9 @@
 import logging
 
-import httpx
 from fastapi import APIRouter, Response, Depends, status
 
 from router.api.dependencies import (
-    get_http_client,
+    get_auth_client,
     get_jwt_principal,
 )
 from router.api.schemas import (
@@ -13,6 +12,7 @@ from router.api.schemas import (
     UserRegisterResponse,
     UserRegisterRequest,
 )
+from router.api.utils.downstream import DownstreamClient
 from router.api.utils.http import forward_response, proxy_post
 from router.config import router_config
 from shared.errors import (
@@ -21,6 +21,7 @@ from shared.errors import (
     ExternalServiceError,
     ConflictError,
 )
+from shared.responses import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -35,12 +36,12 @@ router = APIRouter()
 async def login(
         data: UserLoginRequest,
         response: Response,
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_auth_client),
 ):
     auth_response = await proxy_post(
         client=client,
         url=f"{router_config.auth_service_url}/auth/login",
-        json=data.model_dump(),
+        payload=data,
     )
 
     forward_response(source=auth_response, target=response)
@@ -55,7 +56,7 @@ async def login(
 @register_errors(AuthorizationError, ExternalServiceError)
 async def refresh(
         response: Response,
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_auth_client),
 ):
     auth_response = await proxy_post(
         client=client,
@@ -76,7 +77,7 @@ async def change_password(
         data: PasswordUpdateRequest,
         response: Response,
         principal: dict = Depends(get_jwt_principal),
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_auth_client),
 ):
     headers = {"X-User-Id": principal["sub"]}
 
@@ -84,7 +85,7 @@ async def change_password(
         client=client,
         url=f"{router_config.auth_service_url}/auth/change-password",
         headers=headers,
-        json=data.model_dump(),
+        payload=data,
     )
 
     forward_response(source=auth_response, target=response)
@@ -99,7 +100,7 @@ async def change_password(
 @register_errors(AuthorizationError, ExternalServiceError)
 async def logout(
         response: Response,
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_auth_client),
 ):
     auth_response = await proxy_post(
         client=client,
@@ -119,7 +120,7 @@ async def logout(
 async def logout_all(
         response: Response,
         principal: dict = Depends(get_jwt_principal),
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_auth_client),
 ):
     headers = {
         "X-User-Id": principal["sub"],
@@ -145,12 +146,12 @@ async def logout_all(
 async def register_user(
         response: Response,
         data: UserRegisterRequest,
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_auth_client),
 ):
     auth_response = await proxy_post(
         client=client,
         url=f"{router_config.auth_service_url}/users/register",
-        json=data.model_dump(),
+        payload=data,
     )
 
     forward_response(source=auth_response, target=response)
@@ -166,4 +167,4 @@ async def get_me(
         payload: dict = Depends(get_jwt_principal),
 ):
     # TODO: в будущем редиректить в 'auth_service/auth/me'
-    return payload
+    return FastJSONResponse(payload)
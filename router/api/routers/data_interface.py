@@ -1,20 +1,28 @@
 import logging
+from datetime import date
 
-import httpx
-from fastapi import APIRouter, Depends, UploadFile, File, status, Response
+from fastapi import APIRouter, Depends, Header, Query, Request, status, Response
+from fastapi.responses import StreamingResponse
 
 from router.api.dependencies import (
-    get_http_client,
-    get_current_hotel
+    get_data_interface_client,
+    get_current_hotel,
+    get_accessible_hotels,
+    get_rate_limiter,
 )
 from router.api.schemas import (
+    BatchForecastRequest,
+    BatchForecastResponse,
     ForecastRequest,
     ForecastResponse,
     BookingImportResponse,
     AccessibleHotel
 )
+from router.api.utils.downstream import DownstreamClient
 from router.api.utils.http import forward_response
-from router.api.utils.http import proxy_post
+from router.api.utils.http import limited_body, proxy_post, proxy_stream, stream_request_headers
+from router.api.utils.jwt import require_hotel_access
+from router.api.utils.rate_limit import EXPORT_ROUTE, FORECAST_ROUTE, UPLOAD_ROUTE, RateLimiter
 from router.config import router_config
 from shared.errors import (
     register_errors,
@@ -25,48 +33,152 @@ from shared.errors import (
     DatabaseError,
     MappingError,
     CSVProcessingError,
-    ConflictError
+    ColumnarFormatError,
+    ConflictError,
+    PayloadTooLargeError,
+    RateLimitError,
+    ValidationError
 )
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Тело загрузок пересылается потоком без разбора multipart, поэтому схема описывается вручную
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+async def _stream_upload(
+        request: Request,
+        client: DownstreamClient,
+        hotel: AccessibleHotel,
+        path: str,
+) -> StreamingResponse:
+    """
+    Пересылает multipart-тело загрузки в data_interface_service без буферизации:
+    тело (включая заголовки частей, например Content-Encoding сжатого файла) уходит как есть,
+    размер ограничен PROXY_MAX_BODY_BYTES.
+    """
+    return await proxy_stream(
+        client=client,
+        method="POST",
+        url=f"{router_config.data_interface_service_url}{path}",
+        headers={"X-Hotel-Id": str(hotel.id), **stream_request_headers(request)},
+        content=limited_body(request, router_config.proxy.max_body_bytes),
+    )
+
+
 @router.post(
     "/import-bookings",
     response_model=BookingImportResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Импорт бронирований в систему",
+    openapi_extra=UPLOAD_OPENAPI,
 )
 @register_errors(
     AuthorizationError, MappingError, CSVProcessingError,
-    ConflictError, DatabaseError, ExternalServiceError
+    ConflictError, DatabaseError, PayloadTooLargeError, RateLimitError, ExternalServiceError
 )
 async def import_bookings(
-        response: Response,
-        file: UploadFile = File(...),
+        request: Request,
         hotel: AccessibleHotel = Depends(get_current_hotel),
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_data_interface_client),
+        rate_limiter: RateLimiter = Depends(get_rate_limiter),
 ):
     """
     Прокси-запрос для загрузки бронирований.
-    Отправляет CSV-файл в `data_interface_service/booking/import`.
+    Потоково пересылает CSV-файл (в том числе сжатый gzip/zstd) в `data_interface_service/booking/import`.
     """
+    await rate_limiter.check(UPLOAD_ROUTE, hotel.id)
+    response = await _stream_upload(request, client, hotel, "/booking/import")
+
+    logger.info(
+        "Импорт завершён через router_service: hotel_id=%s, status=%s",
+        hotel.id, response.status_code,
+    )
+    return response
 
-    file_content = await file.read()
-    files = {"file": (file.filename, file_content, file.content_type)}
 
-    import_response = await proxy_post(
+@router.post(
+    "/import-bookings-columnar",
+    response_model=BookingImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Импорт бронирований из Parquet или Arrow IPC",
+    openapi_extra=UPLOAD_OPENAPI,
+)
+@register_errors(
+    AuthorizationError, ColumnarFormatError,
+    ConflictError, DatabaseError, PayloadTooLargeError, RateLimitError, ExternalServiceError
+)
+async def import_bookings_columnar(
+        request: Request,
+        hotel: AccessibleHotel = Depends(get_current_hotel),
+        client: DownstreamClient = Depends(get_data_interface_client),
+        rate_limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    """
+    Прокси-запрос для загрузки типизированного файла бронирований.
+    Потоково пересылает Parquet/Arrow-файл в `data_interface_service/booking/import-columnar`.
+    """
+    await rate_limiter.check(UPLOAD_ROUTE, hotel.id)
+    response = await _stream_upload(request, client, hotel, "/booking/import-columnar")
+
+    logger.info(
+        "Колоночный импорт завершён через router_service: hotel_id=%s, status=%s",
+        hotel.id, response.status_code,
+    )
+    return response
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Потоковый экспорт истории и прогноза",
+    response_description="Файл CSV, Arrow IPC (stream) или Parquet — см. data_interface_service `/forecast/export`.",
+)
+@register_errors(AuthorizationError, ValidationError, RateLimitError, ExternalServiceError)
+async def export_history_and_forecast(
+        request: Request,
+        start_date: date = Query(..., description="Начало периода (включительно)"),
+        end_date: date = Query(..., description="Конец периода (включительно)"),
+        kind: str = Query("all", description="history, forecast или all"),
+        has_deposit: bool | None = Query(None, description="Фильтр по депозиту; без него — оба среза"),
+        fmt: str = Query("csv", alias="format", description="csv, arrow или parquet"),
+        hotel: AccessibleHotel = Depends(get_current_hotel),
+        client: DownstreamClient = Depends(get_data_interface_client),
+        rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> StreamingResponse:
+    """
+    Прокси-запрос для выгрузки истории и прогноза.
+    Параметры передаются в `data_interface_service/forecast/export` без изменений,
+    файл отдаётся клиенту потоком по мере получения от downstream-сервиса.
+    """
+    await rate_limiter.check(EXPORT_ROUTE, hotel.id)
+    response = await proxy_stream(
         client=client,
-        url=f"{router_config.data_interface_service_url}/booking/import",
+        method="GET",
+        url=f"{router_config.data_interface_service_url}/forecast/export",
         headers={"X-Hotel-Id": str(hotel.id)},
-        files=files,
+        params=request.query_params,
     )
-    forward_response(source=import_response, target=response)
 
     logger.info(
-        "Импорт завершён через router_service: hotel_id=%s",
-        hotel.id,
+        "Экспорт начат через router_service: hotel_id=%s, период=%s — %s, format=%s",
+        hotel.id, start_date, end_date, fmt,
     )
     return response
 
@@ -76,28 +188,37 @@ async def import_bookings(
     response_model=ForecastResponse,
     status_code=status.HTTP_200_OK,
     summary="Получение прогноза из системы",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Данные не изменились с версии из If-None-Match"}},
 )
 @register_errors(
     AuthorizationError, NoForecastError,
-    InsufficientHistoryError, DatabaseError, ExternalServiceError
+    InsufficientHistoryError, DatabaseError, RateLimitError, ExternalServiceError
 )
 async def fetch_forecast(
         req: ForecastRequest,
         response: Response,
         hotel: AccessibleHotel = Depends(get_current_hotel),
-        client: httpx.AsyncClient = Depends(get_http_client),
+        client: DownstreamClient = Depends(get_data_interface_client),
+        rate_limiter: RateLimiter = Depends(get_rate_limiter),
+        if_none_match: str | None = Header(None, alias="if-none-match"),
 ):
     """
     Прокси-запрос для получения прогноза.
     Перенаправляет вызов в `data_interface_service/forecast/fetch`.
+    If-None-Match передаётся дальше, ETag и 304 возвращаются клиенту без изменений.
     """
+    await rate_limiter.check(FORECAST_ROUTE, hotel.id)
     headers = {"X-Hotel-Id": str(hotel.id)}
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
 
     forecast_response = await proxy_post(
         client=client,
         url=f"{router_config.data_interface_service_url}/forecast/fetch",
-        headers={"X-Hotel-Id": str(hotel.id)},
-        json=req.model_dump(mode="json"),
+        idempotent=True,
+        coalesce=True,
+        headers=headers,
+        payload=req,
     )
     forward_response(source=forecast_response, target=response)
 
@@ -107,3 +228,40 @@ async def fetch_forecast(
         req.horizon,
     )
     return response
+
+
+@router.post(
+    "/fetch-forecast-batch",
+    response_model=BatchForecastResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Пакетное получение прогнозов для нескольких отелей",
+)
+@register_errors(AuthorizationError, DatabaseError, ExternalServiceError)
+async def fetch_forecast_batch(
+        req: BatchForecastRequest,
+        response: Response,
+        hotels: list[AccessibleHotel] = Depends(get_accessible_hotels),
+        client: DownstreamClient = Depends(get_data_interface_client),
+):
+    """
+    Прокси-запрос для пакетного получения прогнозов.
+    Все hotel_ids проверяются по claim hotels access-токена, затем запрос
+    одним вызовом уходит в `data_interface_service/forecast/fetch-batch`.
+    """
+    require_hotel_access(hotels, req.hotel_ids)
+
+    batch_response = await proxy_post(
+        client=client,
+        url=f"{router_config.data_interface_service_url}/forecast/fetch-batch",
+        idempotent=True,
+        coalesce=True,
+        payload=req,
+    )
+    forward_response(source=batch_response, target=response)
+
+    logger.info(
+        "Пакетный прогноз получен через router_service: hotels=%s, horizon=%s",
+        req.hotel_ids,
+        req.horizon,
+    )
+    return response
@@ -1,18 +1,22 @@
 import logging
 
-import httpx
 from fastapi import APIRouter, Depends, status, Response
 
-from router.api.dependencies import get_http_client
-from router.api.schemas import PredictRequest, PredictResponse
+from router.api.dependencies import get_accessible_hotels, get_prediction_client, get_rate_limiter
+from router.api.schemas import AccessibleHotel, PredictRequest, PredictResponse
+from router.api.utils.downstream import DownstreamClient
 from router.api.utils.http import proxy_post, forward_response
+from router.api.utils.jwt import require_hotel_access
+from router.api.utils.rate_limit import PREDICTION_ROUTE, RateLimiter
 from router.config import router_config
 from shared.errors import (
     register_errors,
+    AuthorizationError,
     ValidationError,
     ExternalServiceError,
     ModelConfigError,
     ModelNotFoundError,
+    RateLimitError,
     ServiceError,
 )
 
@@ -28,25 +32,30 @@ router = APIRouter()
     response_description="Возвращает прогноз спроса и отмен для заданной даты",
 )
 @register_errors(
-    ValidationError, ExternalServiceError,
-    ModelConfigError, ModelNotFoundError, ServiceError,
+    AuthorizationError, ValidationError, ExternalServiceError,
+    ModelConfigError, ModelNotFoundError, RateLimitError, ServiceError,
 )
 async def run_prediction(
         req: PredictRequest,
         response: Response,
-        client: httpx.AsyncClient = Depends(get_http_client),
+        hotels: list[AccessibleHotel] = Depends(get_accessible_hotels),
+        client: DownstreamClient = Depends(get_prediction_client),
+        rate_limiter: RateLimiter = Depends(get_rate_limiter),
 ):
     """
     Прокси-запрос в prediction_service.
-    Использует общий асинхронный httpx.AsyncClient.
+    Таймауты и размер пула задаются конфигурацией PREDICTION_CLIENT_*.
+    hotel_id проверяется по claim hotels access-токена до списания лимита отеля.
     """
     logger.info("Вызов run_prediction: %s", req.model_dump())
+    require_hotel_access(hotels, [req.hotel_id])
+    await rate_limiter.check(PREDICTION_ROUTE, req.hotel_id)
 
     predict_response = await proxy_post(
         client=client,
         url=f"{router_config.prediction_service_url}/run-predict",
-        json=req.model_dump(mode="json"),
-        timeout=10,
+        coalesce=True,
+        payload=req,
     )
 
     forward_response(source=predict_response, target=response)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+import httpx
+from fastapi import APIRouter, Depends, Request
+
+from router.api.dependencies import get_staff_principal
+
+from router.api.utils.downstream import (
+    AUTH_SERVICE,
+    DATA_INTERFACE_SERVICE,
+    PREDICTION_SERVICE,
+    DownstreamClient,
+)
+from router.config import router_config
+from shared.errors import AuthorizationError, ServiceError, register_errors
+from shared.responses import FastJSONResponse
+from shared.tracing import span_buffer
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+SERVICE_URLS = {
+    AUTH_SERVICE: router_config.auth_service_url,
+    DATA_INTERFACE_SERVICE: router_config.data_interface_service_url,
+    PREDICTION_SERVICE: router_config.prediction_service_url,
+}
+
+
+async def _fetch_spans(name: str, client: DownstreamClient, trace_id: str) -> list[dict] | None:
+    """Span трассы из буфера downstream-сервиса; None, если сервис не ответил."""
+    try:
+        response = await client.request("GET", f"{SERVICE_URLS[name]}/traces/{trace_id}")
+        response.raise_for_status()
+        return response.json()["spans"]
+    except (ServiceError, httpx.HTTPError, ValueError, KeyError) as exc:
+        logger.warning("Не удалось получить span трассы %s из %s: %s", trace_id, name, exc)
+        return None
+
+
+@router.get("/{trace_id}", summary="Полная трасса запроса: span router и всех downstream-сервисов")
+@register_errors(AuthorizationError)
+async def get_trace(
+        trace_id: str,
+        request: Request,
+        principal: dict = Depends(get_staff_principal),
+):
+    """
+    Собирает span трассы из кольцевых буферов router и downstream-сервисов.
+    Для каждого span добавляется offset_ms — смещение начала от начала трассы.
+    Доступно только сотрудникам: span содержат пути, тайминги и ошибки внутренних сервисов.
+    """
+    downstreams: dict[str, DownstreamClient] = request.app.state.downstreams
+    results = await asyncio.gather(*(
+        _fetch_spans(name, client, trace_id) for name, client in downstreams.items()
+    ))
+
+    spans = [span.to_dict() for span in span_buffer.find(trace_id)]
+    unavailable = []
+    for name, remote in zip(downstreams, results):
+        if remote is None:
+            unavailable.append(name)
+        else:
+            spans.extend(remote)
+
+    spans.sort(key=lambda item: item["start"])
+    if spans:
+        trace_start = spans[0]["start"]
+        for item in spans:
+            item["offset_ms"] = round((item["start"] - trace_start) * 1000, 3)
+
+    return FastJSONResponse({"trace_id": trace_id, "spans": spans, "unavailable": unavailable})
@@ -1,8 +1,8 @@
 from datetime import date
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 
 
 # === AUTH ===
@@ -70,6 +70,35 @@ class ForecastResponse(BaseModel):
     history_summary: List[ForecastDay] = Field(..., description="История бронирований за выбранный период")
     forecast: List[ForecastDay] = Field(..., description="Прогноз бронирований на заданный горизонт")
 
+class BatchForecastRequest(ForecastRequest):
+    """Запрос истории и прогноза сразу для нескольких отелей с общими параметрами."""
+    hotel_ids: List[int] = Field(
+        ..., min_length=1, max_length=100, description="Идентификаторы отелей (дубликаты игнорируются)"
+    )
+
+    @field_validator("hotel_ids")
+    @classmethod
+    def unique_hotel_ids(cls, value: List[int]) -> List[int]:
+        return list(dict.fromkeys(value))
+
+
+class HotelForecastError(BaseModel):
+    """Ошибка получения прогноза для одного отеля в пакетном запросе."""
+    type: str = Field(..., description="Тип ошибки (как в ответах одиночного запроса)")
+    message: str = Field(..., description="Описание ошибки")
+
+
+class HotelForecast(BaseModel):
+    """История и прогноз одного отеля в пакетном ответе: либо данные, либо error."""
+    history_summary: Optional[List[ForecastDay]] = Field(None, description="История бронирований")
+    forecast: Optional[List[ForecastDay]] = Field(None, description="Прогноз бронирований")
+    error: Optional[HotelForecastError] = Field(None, description="Ошибка для этого отеля")
+
+
+class BatchForecastResponse(BaseModel):
+    """Пакетный ответ: результаты по отелям, ключ — идентификатор отеля."""
+    hotels: Dict[int, HotelForecast] = Field(..., description="Результаты по отелям")
+
 
 class BookingImportResponse(BaseModel):
     """Результат загрузки файла бронирований"""
@@ -84,6 +113,7 @@ class PredictRequest(BaseModel):
     hotel_id: int = Field(..., description="Идентификатор отеля")
     target_date: date = Field(..., description="Целевая дата прогноза (YYYY-MM-DD)")
     has_deposit: bool = Field(..., description="True — с депозитом, False — без")
+    debug: bool = Field(False, description="Вернуть длительность этапов прогноза в поле timings")
 
 
 class PredictDay(BaseModel):
@@ -98,3 +128,6 @@ class PredictResponse(BaseModel):
     hotel_id: int = Field(..., description="Идентификатор отеля")
     target_date: date = Field(..., description="Целевая дата прогноза (YYYY-MM-DD)")
     forecast: List[PredictDay] = Field(..., description="Список дней с прогнозами бронирований")
+    timings: Optional[Dict[str, float]] = Field(
+        None, description="Длительность этапов прогноза в миллисекундах (только при debug=true)"
+    )
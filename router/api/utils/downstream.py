@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Callable
+
+import httpx
+
+from router.config import DownstreamClientConfig, RouterConfig
+from shared.errors import ExternalServiceError
+from shared.tracing import span, trace_headers
+
+logger = logging.getLogger(__name__)
+
+AUTH_SERVICE = "auth"
+DATA_INTERFACE_SERVICE = "data_interface"
+PREDICTION_SERVICE = "prediction"
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Ответы, означающие недоступность downstream-сервиса (а не доменную ошибку)
+UNAVAILABLE_STATUSES = frozenset({502, 503, 504})
+
+# Ошибки, при которых запрос гарантированно не дошёл до сервиса — повтор безопасен для любого метода
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class BreakerState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автомат отключения downstream-сервиса.
+
+    После failure_threshold подряд идущих сбоев переходит в open и сразу отклоняет запросы;
+    через reset_seconds пропускает один пробный запрос (half_open): успех закрывает автомат,
+    сбой снова открывает его. Пробный запрос, не завершившийся за reset_seconds
+    (например, отменённый клиентом), не блокирует следующий.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._state = BreakerState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at: float | None = None
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state is BreakerState.open and self._clock() - self._opened_at >= self.reset_seconds:
+            return BreakerState.half_open
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state is BreakerState.closed:
+            return True
+        if state is BreakerState.half_open:
+            now = self._clock()
+            if self._trial_started_at is None or now - self._trial_started_at >= self.reset_seconds:
+                self._state = BreakerState.half_open
+                self._trial_started_at = now
+                return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = BreakerState.closed
+        self._failures = 0
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_started_at = None
+        if self._state is BreakerState.half_open or self._failures >= self.failure_threshold:
+            self._state = BreakerState.open
+            self._opened_at = self._clock()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state.value, "consecutive_failures": self._failures}
+
+
+class RetryBudget:
+    """
+    Бюджет повторов: каждый запрос пополняет бюджет на ratio, каждый повтор тратит единицу.
+    Повторы не превышают ratio от потока запросов (плюс запас reserve), поэтому при отказе
+    сервиса не умножают нагрузку на него.
+    """
+
+    def __init__(self, ratio: float, reserve: float):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+
+    def deposit(self) -> None:
+        self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    @property
+    def available(self) -> float:
+        return self._tokens
+
+
+class DownstreamClient:
+    """
+    HTTP-клиент одного downstream-сервиса: собственный пул соединений и таймауты,
+    повторы в пределах бюджета и автомат отключения.
+
+    Повторяются только запросы, которые безопасно выполнить повторно: идемпотентные
+    (по методу или явному idempotent=True) при сетевых ошибках и 502/503/504, а также
+    любые запросы, которые не были отправлены (ошибка соединения или ожидания пула).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: httpx.AsyncClient,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        max_retries: int,
+        retry_backoff_seconds: float,
+    ):
+        self.name = name
+        self.client = client
+        self.breaker = breaker
+        self.budget = budget
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            logger.warning("Запрос к %s отклонён: автомат отключения открыт", self.name)
+            raise ExternalServiceError(f"Сервис {self.name} временно недоступен")
+
+    def _record(self, response: httpx.Response) -> None:
+        if response.status_code in UNAVAILABLE_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _can_retry(self, attempt: int) -> bool:
+        return attempt < self.max_retries and self.budget.withdraw()
+
+    async def _send(self, request: httpx.Request, *, stream: bool = False, attempt: int = 0) -> httpx.Response:
+        """Одна попытка запроса: span downstream.<name> и заголовки трассы от этого span."""
+        with span(f"downstream.{self.name}", method=request.method, path=request.url.path, attempt=attempt) as current:
+            request.headers.update(trace_headers())
+            response = await self.client.send(request, stream=stream)
+            if current is not None:
+                current.attributes["status"] = response.status_code
+            return response
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        idempotent: bool | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Выполняет запрос с повторами; тело ответа читается целиком."""
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        self.budget.deposit()
+        attempt = 0
+
+        while True:
+            self._check_breaker()
+            try:
+                response = await self._send(self.client.build_request(method, url, **kwargs), attempt=attempt)
+            except httpx.RequestError as exc:
+                self.breaker.record_failure()
+                retryable = idempotent or isinstance(exc, NOT_SENT_ERRORS)
+                if not (retryable and self._can_retry(attempt)):
+                    raise ExternalServiceError("Downstream service unavailable") from exc
+                logger.warning("Повтор запроса к %s после ошибки: %s", self.name, exc)
+            else:
+                self._record(response)
+                if not (idempotent and response.status_code in UNAVAILABLE_STATUSES and self._can_retry(attempt)):
+                    return response
+                logger.warning("Повтор запроса к %s после ответа %s", self.name, response.status_code)
+
+            attempt += 1
+            await asyncio.sleep(self.retry_backoff_seconds * attempt)
+
+    async def send_stream(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Отправляет запрос с потоковым ответом (и, возможно, потоковым телом).
+        Поток тела нельзя воспроизвести, поэтому такие запросы не повторяются.
+        """
+        self.budget.deposit()
+        self._check_breaker()
+
+        try:
+            response = await self._send(self.client.build_request(method, url, **kwargs), stream=True)
+        except httpx.RequestError as exc:
+            self.breaker.record_failure()
+            raise ExternalServiceError("Downstream service unavailable") from exc
+
+        self._record(response)
+        return response
+
+    def snapshot(self) -> dict:
+        return {**self.breaker.snapshot(), "retry_budget": round(self.budget.available, 2)}
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def build_downstream_client(name: str, cfg: DownstreamClientConfig) -> DownstreamClient:
+    """Создаёт клиента downstream-сервиса по его конфигурации."""
+    client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=cfg.max_connections,
+            max_keepalive_connections=cfg.max_keepalive_connections,
+            keepalive_expiry=cfg.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            connect=cfg.connect_timeout,
+            read=cfg.read_timeout,
+            write=cfg.write_timeout,
+            pool=cfg.pool_timeout,
+        ),
+    )
+    return DownstreamClient(
+        name=name,
+        client=client,
+        breaker=CircuitBreaker(cfg.breaker_failure_threshold, cfg.breaker_reset_seconds),
+        budget=RetryBudget(cfg.retry_budget_ratio, cfg.retry_budget_reserve),
+        max_retries=cfg.max_retries,
+        retry_backoff_seconds=cfg.retry_backoff_seconds,
+    )
+
+
+def build_downstream_clients(config: RouterConfig) -> dict[str, DownstreamClient]:
+    """Клиенты всех downstream-сервисов: у каждого свой пул, сбои одного не занимают соединения других."""
+    return {
+        AUTH_SERVICE: build_downstream_client(AUTH_SERVICE, config.auth_client),
+        DATA_INTERFACE_SERVICE: build_downstream_client(DATA_INTERFACE_SERVICE, config.data_interface_client),
+        PREDICTION_SERVICE: build_downstream_client(PREDICTION_SERVICE, config.prediction_client),
+    }
@@ -1,7 +1,34 @@
-from fastapi import Response
+import asyncio
+import hashlib
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
 import httpx
+from pydantic import BaseModel
+
+from router.api.utils.downstream import DownstreamClient
+from router.config import router_config
+from shared.errors import PayloadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+# Заголовки кэширования и Server-Timing, которые передаются клиенту без изменений
+PASSTHROUGH_HEADERS = ("etag", "cache-control", "server-timing")
 
-from shared.errors import ExternalServiceError
+# Заголовки потокового ответа downstream-сервиса, которые передаются клиенту без изменений.
+# Тело пересылается как есть (aiter_raw), поэтому вместе с ним идут Content-Encoding и Content-Length.
+STREAM_RESPONSE_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-encoding",
+    "content-disposition",
+    *PASSTHROUGH_HEADERS,
+)
+
+# Заголовки входящего запроса, без которых downstream-сервис не разберёт пересылаемое тело
+STREAM_REQUEST_HEADERS = ("content-type", "content-length")
 
 
 def forward_response(
@@ -17,9 +44,11 @@ def forward_response(
     - HTTP status code
     - тело ответа (body)
     - заголовок Content-Type
+    - заголовки кэширования (ETag, Cache-Control) и Server-Timing
     - все заголовки Set-Cookie
 
     Не выполняет интерпретацию или модификацию ответа.
+    Для больших тел используйте proxy_stream — здесь тело целиком держится в памяти.
     """
     target.status_code = source.status_code
     target.body = source.content
@@ -28,17 +57,185 @@ def forward_response(
     if content_type:
         target.headers["content-type"] = content_type
 
+    for name in PASSTHROUGH_HEADERS:
+        value = source.headers.get(name)
+        if value:
+            target.headers[name] = value
+
     for cookie in source.headers.get_list("set-cookie"):
             target.headers.append("set-cookie", cookie)
 
 
+class SingleFlight:
+    """
+    Объединение одинаковых запросов, выполняющихся одновременно.
+
+    Первый запрос с ключом запускает вызов отдельной задачей, остальные ждут её результат.
+    Отмена ожидающего (обрыв клиента) не отменяет вызов для остальных. Ключ освобождается
+    сразу после завершения вызова — это не кэш, следующий запрос снова идёт в сервис.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Ошибка получена ожидающими; если все они отменены, не пишем "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            logger.debug("Запрос объединён с выполняющимся: %s", key)
+        return await asyncio.shield(task)
+
+
+# Одинаковые запросы в пределах процесса router
+inflight = SingleFlight()
+
+
+def coalesce_key(method: str, url: str, headers: dict | None, body: bytes) -> str:
+    """
+    Ключ объединения: маршрут, заголовки (X-Hotel-Id, If-None-Match) и хэш тела.
+    Отель входит в ключ через заголовок или тело, поэтому ответы разных отелей не смешиваются.
+    """
+    digest = hashlib.sha256(f"{method} {url}\n".encode())
+    for name, value in sorted((headers or {}).items()):
+        digest.update(f"{name.lower()}: {value}\n".encode())
+    digest.update(b"\n")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def copy_response(source: httpx.Response) -> httpx.Response:
+    """Отдельная копия прочитанного ответа для каждого ожидающего (тело уже распаковано)."""
+    headers = source.headers.copy()
+    headers.pop("content-encoding", None)
+    return httpx.Response(
+        source.status_code,
+        headers=headers,
+        content=source.content,
+        request=source.request,
+    )
+
+
 async def proxy_post(
     *,
-    client: httpx.AsyncClient,
+    client: DownstreamClient,
     url: str,
+    payload: BaseModel | None = None,
+    idempotent: bool = False,
+    coalesce: bool = False,
     **kwargs,
 ) -> httpx.Response:
+    """
+    POST в downstream-сервис через его клиента (пул, повторы, автомат отключения).
+    payload сериализуется в JSON напрямую через pydantic (без промежуточного dict и json.dumps).
+    idempotent=True разрешает повторы для POST без побочных эффектов (чтение данных).
+    coalesce=True объединяет одновременные одинаковые запросы в один вызов downstream;
+    каждый ожидающий получает свою копию ответа. Ключ объединения включает отправляемое тело,
+    поэтому тело (payload, json или content) кодируется в байты заранее; потоковое тело,
+    data и files объединять нельзя.
+    """
+    if payload is not None:
+        kwargs["content"] = payload.model_dump_json().encode()
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+    elif "json" in kwargs:
+        # Те же байты и Content-Type, что сформировал бы httpx
+        encoded = httpx.Request("POST", url, json=kwargs.pop("json"))
+        kwargs["content"] = encoded.content
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": encoded.headers["content-type"]}
+
+    body = kwargs.get("content", b"")
+    if isinstance(body, str):
+        body = body.encode()
+
+    async def call() -> httpx.Response:
+        return await client.request("POST", url, idempotent=idempotent, **kwargs)
+
+    if not (coalesce and router_config.proxy.coalesce_requests):
+        return await call()
+    if not isinstance(body, bytes) or "data" in kwargs or "files" in kwargs:
+        raise ValueError("coalesce=True поддерживает только тело из payload, json или content в байтах")
+
+    key = coalesce_key("POST", url, kwargs.get("headers"), body)
+    return copy_response(await inflight.do(key, call))
+
+
+def stream_request_headers(request: Request) -> dict[str, str]:
+    """Заголовки тела входящего запроса (Content-Type с boundary multipart, Content-Length)."""
+    return {
+        name: request.headers[name]
+        for name in STREAM_REQUEST_HEADERS
+        if name in request.headers
+    }
+
+
+def limited_body(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Тело входящего запроса в виде потока чанков с ограничением размера.
+
+    Объявленный Content-Length проверяется до начала пересылки, фактический
+    объём — по мере чтения (на случай chunked-загрузок). Чанки читаются из ASGI
+    только когда downstream-соединение готово принять следующий, поэтому
+    router не накапливает тело в памяти.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise PayloadTooLargeError(f"Размер запроса превышает {max_bytes} байт")
+
+    async def chunks() -> AsyncIterator[bytes]:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise PayloadTooLargeError(f"Размер запроса превышает {max_bytes} байт")
+            if chunk:
+                yield chunk
+
+    return chunks()
+
+
+async def _iter_and_close(source: httpx.Response) -> AsyncIterator[bytes]:
+    """Отдаёт тело ответа как есть и освобождает соединение пула даже при обрыве клиента."""
     try:
-        return await client.post(url, **kwargs)
-    except httpx.RequestError as exc:
-        raise ExternalServiceError("Downstream service unavailable") from exc
\ No newline at end of file
+        async for chunk in source.aiter_raw():
+            yield chunk
+    finally:
+        await source.aclose()
+
+
+async def proxy_stream(
+    *,
+    client: DownstreamClient,
+    method: str,
+    url: str,
+    **kwargs,
+) -> StreamingResponse:
+    """
+    Потоковый прокси-запрос: тело запроса (content) и тело ответа пересылаются чанками.
+
+    Ответ downstream-сервиса возвращается с исходным статусом и заголовками
+    STREAM_RESPONSE_HEADERS; следующий чанк читается из downstream только после того,
+    как предыдущий отдан клиенту, поэтому память router не зависит от размера ответа.
+    """
+    source = await client.send_stream(method, url, **kwargs)
+
+    response = StreamingResponse(_iter_and_close(source), status_code=source.status_code)
+    for name in STREAM_RESPONSE_HEADERS:
+        value = source.headers.get(name)
+        if value:
+            response.headers[name] = value
+    for cookie in source.headers.get_list("set-cookie"):
+        response.headers.append("set-cookie", cookie)
+
+    return response
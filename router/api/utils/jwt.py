@@ -1,6 +1,9 @@
+from typing import Iterable
+
 from jose import jwt, JWTError
 
 from router.api.schemas import AccessibleHotel
+from router.api.utils.token_cache import TokenCache, VerifiedPrincipal
 from router.config import router_config
 from shared.errors import AuthorizationError
 
@@ -46,3 +49,48 @@ def extract_accessible_hotels(payload: dict) -> list[AccessibleHotel]:
         return [AccessibleHotel(**hotel) for hotel in raw_hotels]
     except Exception as exc:
         raise AuthorizationError("Invalid hotels payload") from exc
+
+
+def require_hotel_access(hotels: list[AccessibleHotel], hotel_ids: Iterable[int]) -> None:
+    """
+    Проверяет, что все запрошенные отели есть в claim hotels.
+    Пакетный запрос отклоняется целиком, если хотя бы один отель недоступен.
+    """
+    accessible = {hotel.id for hotel in hotels}
+    denied = sorted(set(hotel_ids) - accessible)
+
+    if denied:
+        raise AuthorizationError(f"Access to hotels denied: {', '.join(map(str, denied))}")
+
+
+def build_principal(payload: dict) -> VerifiedPrincipal:
+    """
+    Собирает VerifiedPrincipal из проверенного payload: карта отелей строится один раз.
+    Некорректный claim hotels не мешает эндпоинтам без проверки отеля и сохраняется как ошибка.
+    """
+    try:
+        hotels = {hotel.id: hotel for hotel in extract_accessible_hotels(payload)}
+    except AuthorizationError as exc:
+        return VerifiedPrincipal(payload=payload, hotels_error=exc.message)
+
+    return VerifiedPrincipal(payload=payload, hotels=hotels)
+
+
+def verify_access_token(token: str, cache: TokenCache | None = None) -> VerifiedPrincipal:
+    """
+    Проверяет access JWT (подпись, срок, обязательные claims) и возвращает principal.
+
+    При наличии кэша повторные запросы с тем же токеном не выполняют ни проверку подписи,
+    ни валидацию claims: в кэш попадают только успешно проверенные токены.
+    """
+    if cache is not None:
+        principal = cache.get(token)
+        if principal is not None:
+            return principal
+
+    payload = validate_base_principal(decode_access_jwt(token))
+    principal = build_principal(payload)
+
+    if cache is not None:
+        cache.put(token, principal)
+    return principal
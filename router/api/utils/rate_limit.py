@@ -0,0 +1,193 @@
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from router.config import RateLimitConfig, RouterConfig
+from router.redis_client import get_redis_client
+from shared.errors import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_ROUTE = "prediction"
+FORECAST_ROUTE = "forecast"
+UPLOAD_ROUTE = "upload"
+EXPORT_ROUTE = "export"
+
+RATE_LIMIT_KEY_PREFIX = "rate_limit"
+
+# Бакет в Redis: пополнение и списание выполняются атомарно, время берётся с сервера Redis,
+# чтобы расхождение часов реплик не влияло на лимит. Возвращает 0 или время ожидания в мс.
+TAKE_TOKEN_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('time')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local bucket = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call('hset', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('pexpire', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait_ms
+"""
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """Лимит группы маршрутов на один отель: скорость пополнения и ёмкость бакета."""
+    rate_per_second: float
+    burst: int
+
+
+@dataclass
+class RouteCounters:
+    """Счётчики решений лимитера в рамках процесса."""
+    allowed: int = 0
+    rejected: int = 0
+
+
+class MemoryTokenBuckets:
+    """
+    Token bucket в памяти процесса. Бакеты хранятся в LRU ограниченного размера:
+    вытесненный бакет при следующем запросе создаётся заново полным.
+    """
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, policy: RatePolicy) -> float:
+        """Списывает токен; возвращает 0 или время до появления следующего токена в секундах."""
+        now = self._clock()
+        tokens, updated_at = self._buckets.get(key, (policy.burst, now))
+        tokens = min(policy.burst, tokens + (now - updated_at) * policy.rate_per_second)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / policy.rate_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisTokenBuckets:
+    """Token bucket в Redis, общий для всех реплик router."""
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._script = redis.register_script(TAKE_TOKEN_SCRIPT)
+
+    async def take(self, key: str, policy: RatePolicy) -> float:
+        wait_ms = await self._script(
+            keys=[f"{RATE_LIMIT_KEY_PREFIX}:{key}"],
+            args=[policy.rate_per_second, policy.burst],
+        )
+        return int(wait_ms) / 1000
+
+
+class RateLimiter:
+    """
+    Лимиты запросов на отель и группу маршрутов.
+
+    По умолчанию бакеты хранятся в памяти процесса. С RedisTokenBuckets лимит общий для
+    всех реплик; при недоступности Redis решение принимается по локальным бакетам (fail-open
+    в пределах одной реплики), чтобы сбой Redis не останавливал gateway.
+    Счётчики решений хранятся в LRU на max_keys отелей, как и локальные бакеты.
+    """
+
+    def __init__(
+        self,
+        policies: dict[str, RatePolicy],
+        memory: MemoryTokenBuckets,
+        redis: RedisTokenBuckets | None = None,
+    ):
+        self.policies = policies
+        self.memory = memory
+        self.redis = redis
+        self._counters: OrderedDict[int, defaultdict[str, RouteCounters]] = OrderedDict()
+
+    async def _take(self, key: str, policy: RatePolicy) -> float:
+        if self.redis is not None:
+            try:
+                return await self.redis.take(key, policy)
+            except RedisError as exc:
+                logger.warning("Redis недоступен для лимитов, используются локальные бакеты: %s", exc)
+        return self.memory.take(key, policy)
+
+    async def check(self, route: str, hotel_id: int) -> None:
+        """Пропускает запрос или выбрасывает RateLimitError с временем ожидания (Retry-After)."""
+        policy = self.policies.get(route)
+        if policy is None:
+            return
+
+        wait = await self._take(f"{route}:{hotel_id}", policy)
+        counters = self._route_counters(hotel_id, route)
+        if wait > 0:
+            counters.rejected += 1
+            logger.warning("Лимит запросов превышен: hotel_id=%s, route=%s, retry_after=%.2f", hotel_id, route, wait)
+            raise RateLimitError(retry_after=wait)
+        counters.allowed += 1
+
+    def _route_counters(self, hotel_id: int, route: str) -> RouteCounters:
+        routes = self._counters.get(hotel_id)
+        if routes is None:
+            routes = self._counters[hotel_id] = defaultdict(RouteCounters)
+            while len(self._counters) > self.memory.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(hotel_id)
+        return routes[route]
+
+    def snapshot(self) -> dict[int, dict[str, dict]]:
+        return {
+            hotel_id: {route: vars(counters).copy() for route, counters in routes.items()}
+            for hotel_id, routes in self._counters.items()
+        }
+
+
+def build_policies(cfg: RateLimitConfig) -> dict[str, RatePolicy]:
+    if not cfg.enabled:
+        return {}
+    return {
+        PREDICTION_ROUTE: RatePolicy(cfg.prediction_per_minute / 60, cfg.prediction_burst),
+        FORECAST_ROUTE: RatePolicy(cfg.forecast_per_minute / 60, cfg.forecast_burst),
+        UPLOAD_ROUTE: RatePolicy(cfg.upload_per_minute / 60, cfg.upload_burst),
+        EXPORT_ROUTE: RatePolicy(cfg.export_per_minute / 60, cfg.export_burst),
+    }
+
+
+def build_rate_limiter(config: RouterConfig) -> RateLimiter:
+    """Лимитер по конфигурации; при RATE_LIMIT_ENABLED=false пропускает все запросы."""
+    cfg = config.rate_limit
+    redis_buckets = None
+    if cfg.enabled and cfg.backend == "redis":
+        redis_buckets = RedisTokenBuckets(get_redis_client())
+
+    return RateLimiter(
+        policies=build_policies(cfg),
+        memory=MemoryTokenBuckets(cfg.max_keys),
+        redis=redis_buckets,
+    )
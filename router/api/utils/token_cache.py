@@ -0,0 +1,86 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from router.api.schemas import AccessibleHotel
+from shared.errors import AuthorizationError
+
+
+@dataclass(frozen=True)
+class VerifiedPrincipal:
+    """
+    Проверенный payload access JWT и заранее построенная карта доступных отелей.
+    Payload общий для всех запросов с тем же токеном — изменять его нельзя.
+    """
+    payload: dict
+    hotels: dict[int, AccessibleHotel] | None = None
+    hotels_error: str | None = None
+
+    def accessible_hotels(self) -> dict[int, AccessibleHotel]:
+        """Отели из claim hotels; некорректный claim отклоняется так же, как без кэша."""
+        if self.hotels is None:
+            raise AuthorizationError(self.hotels_error)
+        return self.hotels
+
+
+class TokenCache:
+    """
+    Ограниченный LRU-кэш проверенных access JWT.
+
+    Ключ — SHA-256 токена (сам токен в памяти кэша не хранится). Запись живёт до exp токена,
+    но не дольше ttl_seconds. Зависимости авторизации синхронные и выполняются в пуле потоков,
+    поэтому доступ защищён блокировкой.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, VerifiedPrincipal]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> VerifiedPrincipal | None:
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, principal = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, token: str, principal: VerifiedPrincipal) -> None:
+        now = self._clock()
+        expires_at = now + self.ttl_seconds
+
+        exp = principal.payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import SettingsConfigDict
 
@@ -11,8 +13,105 @@ class JWTConfig(ConfigBase):
     hash_algorithm: str = "HS256"
 
 
+class JWTCacheConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="JWT_CACHE_")
+
+    enabled: bool = True
+    max_size: int = Field(10_000, ge=1)
+    # Верхняя граница жизни записи; фактически запись истекает не позже exp токена
+    ttl_seconds: float = Field(300, gt=0)
+
+
+class ProxyConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="PROXY_")
+
+    # Предел тела запроса, которое router потоково пересылает downstream-сервису (загрузки бронирований)
+    max_body_bytes: int = Field(200 * 1024 * 1024, ge=1)
+    # Объединение одновременных одинаковых запросов на чтение прогнозов в один вызов downstream
+    coalesce_requests: bool = True
+
+
+class RedisConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="REDIS_")
+
+    # Redis нужен router только для общих лимитов нескольких реплик (RATE_LIMIT_BACKEND=redis)
+    host: str = "redis"
+    port: int = 6379
+    socket_timeout: float = Field(0.2, gt=0)
+
+
+class RateLimitConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="RATE_LIMIT_")
+
+    enabled: bool = True
+    # memory — лимиты в процессе router; redis — общие бакеты для всех реплик
+    backend: Literal["memory", "redis"] = "memory"
+    # Верхняя граница числа бакетов в памяти (отель × группа маршрутов)
+    max_keys: int = Field(100_000, ge=1)
+
+    # Скорость пополнения (запросов в минуту) и ёмкость бакета на отель для каждой группы маршрутов
+    prediction_per_minute: float = Field(30, gt=0)
+    prediction_burst: int = Field(5, ge=1)
+    forecast_per_minute: float = Field(600, gt=0)
+    forecast_burst: int = Field(60, ge=1)
+    upload_per_minute: float = Field(10, gt=0)
+    upload_burst: int = Field(3, ge=1)
+    export_per_minute: float = Field(30, gt=0)
+    export_burst: int = Field(5, ge=1)
+
+
+class DownstreamClientConfig(ConfigBase):
+    """Пул соединений, таймауты, повторы и автомат отключения одного downstream-сервиса."""
+
+    max_connections: int = Field(50, ge=1)
+    max_keepalive_connections: int = Field(20, ge=0)
+    keepalive_expiry: float = Field(30.0, ge=0)
+
+    connect_timeout: float = Field(2.0, gt=0)
+    read_timeout: float = Field(10.0, gt=0)
+    write_timeout: float = Field(10.0, gt=0)
+    # Ожидание свободного соединения: перегруженный сервис не копит очередь запросов бесконечно
+    pool_timeout: float = Field(2.0, gt=0)
+
+    max_retries: int = Field(2, ge=0)
+    retry_backoff_seconds: float = Field(0.1, ge=0)
+    # Доля повторов от потока запросов и запас повторов для редких запросов
+    retry_budget_ratio: float = Field(0.2, ge=0)
+    retry_budget_reserve: float = Field(10.0, ge=0)
+
+    breaker_failure_threshold: int = Field(5, ge=1)
+    breaker_reset_seconds: float = Field(10.0, gt=0)
+
+
+class AuthClientConfig(DownstreamClientConfig):
+    model_config = SettingsConfigDict(env_prefix="AUTH_CLIENT_")
+
+
+class DataInterfaceClientConfig(DownstreamClientConfig):
+    model_config = SettingsConfigDict(env_prefix="DATA_INTERFACE_CLIENT_")
+
+    # Загрузки и экспорт передаются потоком и могут идти дольше обычных запросов
+    read_timeout: float = Field(60.0, gt=0)
+    write_timeout: float = Field(60.0, gt=0)
+
+
+class PredictionClientConfig(DownstreamClientConfig):
+    model_config = SettingsConfigDict(env_prefix="PREDICTION_CLIENT_")
+
+    # Инференс медленный: небольшой отдельный пул не даёт ему занять соединения других сервисов
+    max_connections: int = Field(10, ge=1)
+    max_keepalive_connections: int = Field(5, ge=0)
+
+
 class RouterConfig(ConfigBase):
     jwt_config: JWTConfig = Field(default_factory=JWTConfig)
+    jwt_cache: JWTCacheConfig = Field(default_factory=JWTCacheConfig)
+    proxy: ProxyConfig = Field(default_factory=ProxyConfig)
+    auth_client: AuthClientConfig = Field(default_factory=AuthClientConfig)
+    data_interface_client: DataInterfaceClientConfig = Field(default_factory=DataInterfaceClientConfig)
+    prediction_client: PredictionClientConfig = Field(default_factory=PredictionClientConfig)
+    redis: RedisConfig = Field(default_factory=RedisConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
 
     prediction_service_url: str = "http://prediction_service:8001"
     auth_service_url: str = "http://auth-service:8002"
@@ -1,29 +1,37 @@
 import logging
 from contextlib import asynccontextmanager
 
-import httpx
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from router.api.routers import auth, data_interface, prediction
+from router.api.dependencies import get_staff_principal
+from router.api.routers import auth, data_interface, prediction, traces
+from router.api.utils.downstream import build_downstream_clients
+from router.api.utils.rate_limit import build_rate_limiter
 from router.config import router_config
 from shared.errors import register_error_handlers, setup_openapi_with_errors
+from shared.metrics import add_metrics
+from shared.responses import FastJSONResponse, add_gzip_middleware
 
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.http_client = httpx.AsyncClient(timeout=10)
-    logger.info("HTTP client initialized")
+    app.state.downstreams = build_downstream_clients(router_config)
+    logger.info("HTTP clients initialized: %s", ", ".join(app.state.downstreams))
+    app.state.rate_limiter = build_rate_limiter(router_config)
     yield
-    await app.state.http_client.aclose()
-    logger.info("HTTP client closed")
+    for client in app.state.downstreams.values():
+        await client.aclose()
+    logger.info("HTTP clients closed")
 
 
 app = FastAPI(title="Router Service API", lifespan=lifespan)
 
-register_error_handlers(app)
+# Сжатие выполняется только на границе системы: внутренние сервисы отвечают router без gzip
+add_gzip_middleware(app)
+register_error_handlers(app, service="router")
 setup_openapi_with_errors(app)
 
 app.add_middleware(
@@ -33,12 +41,33 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Внешняя middleware: время всей обработки и размер ответа после сжатия
+add_metrics(app)
 
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(data_interface.router, prefix="/data", tags=["Data Interface"])
 app.include_router(prediction.router, prefix="/prediction", tags=["Prediction"])
+app.include_router(traces.router, prefix="/traces", tags=["Tracing"])
 
 
 @app.get("/")
 def root():
     return {"message": "Router Service is running"}
+
+
+@app.get("/health/downstreams")
+def downstreams_health(request: Request):
+    """Состояние автоматов отключения и бюджетов повторов downstream-сервисов."""
+    return FastJSONResponse({
+        name: client.snapshot()
+        for name, client in request.app.state.downstreams.items()
+    })
+
+
+@app.get("/health/rate-limits")
+def rate_limits_health(request: Request, principal: dict = Depends(get_staff_principal)):
+    """
+    Счётчики пропущенных и отклонённых лимитером запросов по отелям и группам маршрутов.
+    Доступно только сотрудникам: ответ раскрывает активность отдельных отелей.
+    """
+    return FastJSONResponse(request.app.state.rate_limiter.snapshot())
@@ -0,0 +1,24 @@
+import redis.asyncio as redis
+from functools import lru_cache
+from router.config import router_config
+
+
+class RedisClient:
+    def __init__(self):
+        self._client: redis.Redis | None = None
+
+    def get_client(self) -> redis.Redis:
+        if not self._client:
+            self._client = redis.Redis(
+                host=router_config.redis.host,
+                port=router_config.redis.port,
+                socket_timeout=router_config.redis.socket_timeout,
+                socket_connect_timeout=router_config.redis.socket_timeout,
+                decode_responses=True
+            )
+        return self._client
+
+
+@lru_cache()
+def get_redis_client() -> redis.Redis:
+    return RedisClient().get_client()
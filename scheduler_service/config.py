@@ -6,7 +6,7 @@ from shared.db_config import DatabaseConfig
 
 
 class SchedulerConfig(ConfigBase):
-    router_service_url: str
+    prediction_service_url: str
 
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
 
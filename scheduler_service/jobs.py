@@ -31,7 +31,7 @@ def trigger_forecast():
 
             try:
                 response = httpx.post(
-                    f"{scheduler_config.router_service_url}/prediction/run-prediction",
+                    f"{scheduler_config.prediction_service_url}/run-predict",
                     json=payload,
                     timeout=10
                 )
@@ -42,7 +42,7 @@ def trigger_forecast():
                     )
                 else:
                     logger.error(
-                        "[%s] Ошибка от ROUTER %s: %s",
+                        "[%s] Ошибка от prediction_service %s: %s",
                         datetime.now(), response.status_code, response.text
                     )
             except Exception as e:
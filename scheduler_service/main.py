@@ -4,6 +4,7 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
 from scheduler_service.jobs import trigger_forecast
+from shared.metrics import add_metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +19,7 @@ async def lifespan(app: FastAPI):
 
 
 app = FastAPI(title="Scheduler Service API", lifespan=lifespan)
+add_metrics(app)
 
 
 @app.get("/")
@@ -0,0 +1,38 @@
+"""
+Пересчёт дневного rollup booking_daily по таблице booking.
+Используется после массового импорта бронирований в обход Data Interface
+или для восстановления rollup после ручных правок booking.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from shared.booking_rollup import rebuild_booking_rollup
+from shared.db import AsyncSessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def backfill(hotel_id: int | None = None) -> int:
+    """Пересчитывает booking_daily для одного отеля или для всех и фиксирует результат."""
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_booking_rollup(session, hotel_id=hotel_id)
+        await session.commit()
+
+    scope = f"отель {hotel_id}" if hotel_id is not None else "все отели"
+    logger.info(f"Rollup booking_daily пересчитан ({scope}): {rows} строк")
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotel-id", type=int, default=None, help="Пересчитать только указанный отель")
+    args = parser.parse_args()
+
+    asyncio.run(backfill(args.hotel_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@
 import logging
 from datetime import date, timedelta
 
+from sqlalchemy import func, select
+
 from shared.db import SessionLocal
 from shared.db_models import Booking
 
@@ -16,33 +18,40 @@ logger = logging.getLogger(__name__)
 def counter():
     """
     Считает количество бронирований и отмен для заданного отеля и диапазона дат.
+
+    Один сгруппированный запрос по диапазону arrival_date: PostgreSQL читает
+    только партиции booking, попадающие в диапазон.
     """
     hotel_id = 1
     has_deposit = False
     start_date = date(2017, 6, 8)
     horizon = 30
+    end_date = start_date + timedelta(days=horizon - 1)
+
+    stmt = (
+        select(
+            Booking.arrival_date,
+            func.count().filter(Booking.is_cancellation.is_(False)),
+            func.count().filter(Booking.is_cancellation.is_(True)),
+        )
+        .where(
+            Booking.hotel_id == hotel_id,
+            Booking.has_deposit == has_deposit,
+            Booking.arrival_date.between(start_date, end_date),
+        )
+        .group_by(Booking.arrival_date)
+    )
 
     with SessionLocal() as session:
-        for offset in range(horizon):
-            current_date = start_date + timedelta(days=offset)
-
-            bookings = session.query(Booking).filter(
-                Booking.hotel_id == hotel_id,
-                Booking.arrival_date == current_date,
-                Booking.has_deposit == has_deposit,
-                Booking.is_cancellation.is_(False)
-            ).count()
-
-            cancellations = session.query(Booking).filter(
-                Booking.hotel_id == hotel_id,
-                Booking.arrival_date == current_date,
-                Booking.has_deposit == has_deposit,
-                Booking.is_cancellation.is_(True)
-            ).count()
-
-            logger.info(
-                f"{current_date}: бронирования={bookings}, отмены={cancellations}"
-            )
+        counts = {day: (bookings, cancellations) for day, bookings, cancellations in session.execute(stmt)}
+
+    for offset in range(horizon):
+        current_date = start_date + timedelta(days=offset)
+        bookings, cancellations = counts.get(current_date, (0, 0))
+
+        logger.info(
+            f"{current_date}: бронирования={bookings}, отмены={cancellations}"
+        )
 
 
 if __name__ == "__main__":
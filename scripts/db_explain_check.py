@@ -0,0 +1,168 @@
+"""
+Проверка планов горячих запросов через EXPLAIN (FORMAT JSON).
+Для каждого запроса проверяется, что планировщик использует ожидаемый индекс.
+Используется после миграций и на копии продовой БД; код выхода 1 — хотя бы один запрос не использует индекс.
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date, timedelta
+from typing import Any, Iterator
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from shared.db import SessionLocal
+from shared.db_models import Booking, BookingDaily, Hotel, Prediction, Weather
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 30
+
+
+def hot_queries(hotel_id: int, city_id: int, target_date: date, has_deposit: bool) -> list[tuple[str, str, Select]]:
+    """
+    Горячие запросы сервисов в виде (название, ожидаемый индекс, запрос).
+    Запросы повторяют фильтры Data Interface и загрузчиков прогноза.
+    """
+    start = target_date - timedelta(days=WINDOW_DAYS)
+    end = target_date + timedelta(days=WINDOW_DAYS)
+
+    return [
+        (
+            "booking: дневные бронирования и отмены",
+            "ix_booking_hotel_deposit_arrival",
+            select(Booking.arrival_date, func.count(), func.count().filter(Booking.is_cancellation.is_(True)))
+            .where(
+                Booking.hotel_id == hotel_id,
+                Booking.has_deposit == has_deposit,
+                Booking.arrival_date.between(start, target_date),
+            )
+            .group_by(Booking.arrival_date),
+        ),
+        (
+            "booking: существующие booking_ref",
+            "ix_booking_hotel_ref",
+            select(Booking.booking_ref)
+            .where(Booking.hotel_id == hotel_id, Booking.booking_ref.isnot(None)),
+        ),
+        (
+            "booking_daily: история",
+            "uq_booking_daily_key",
+            select(BookingDaily.arrival_date, BookingDaily.bookings, BookingDaily.cancellations)
+            .where(
+                BookingDaily.hotel_id == hotel_id,
+                BookingDaily.has_deposit == has_deposit,
+                BookingDaily.arrival_date.between(start, target_date),
+            ),
+        ),
+        (
+            "prediction: прогноз на горизонт",
+            "ix_prediction_hotel_deposit_target",
+            select(Prediction.target_date, Prediction.bookings, Prediction.cancellations)
+            .where(
+                Prediction.hotel_id == hotel_id,
+                Prediction.has_deposit == has_deposit,
+                Prediction.target_date.between(target_date, end),
+            ),
+        ),
+        (
+            "weather: температура по городу",
+            "ix_weather_city_day",
+            select(Weather.day, Weather.temp_avg).where(Weather.city_id == city_id),
+        ),
+    ]
+
+
+def iter_plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Обходит узлы плана EXPLAIN (FORMAT JSON) в глубину."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def parent_index_names(session: Session, names: set[str]) -> set[str]:
+    """
+    Сопоставляет индексы партиций с индексами родительской таблицы.
+    Для секционированной booking план содержит индексы партиций (booking_y2017_...), а не ix_booking_*.
+    """
+    if not names:
+        return set()
+
+    rows = session.execute(
+        text(
+            """
+            SELECT coalesce(parent.relname, child.relname)
+            FROM pg_class child
+            LEFT JOIN pg_inherits inh ON inh.inhrelid = child.oid
+            LEFT JOIN pg_class parent ON parent.oid = inh.inhparent
+            WHERE child.relname = ANY(:names)
+            """
+        ),
+        {"names": list(names)},
+    )
+    return set(rows.scalars())
+
+
+def used_indexes(session: Session, stmt: Select) -> set[str]:
+    """Возвращает имена индексов, которые планировщик использует для запроса."""
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+    names = {
+        node["Index Name"]
+        for node in iter_plan_nodes(plan[0]["Plan"])
+        if "Index Name" in node
+    }
+    return parent_index_names(session, names)
+
+
+def check(hotel_id: int, has_deposit: bool, disable_seqscan: bool) -> bool:
+    """Проверяет все горячие запросы; возвращает True, если каждый использует свой индекс."""
+    with SessionLocal() as session:
+        city_id = session.execute(select(Hotel.city_id).where(Hotel.id == hotel_id)).scalar()
+        if city_id is None:
+            logger.error(f"Отель {hotel_id} не найден")
+            return False
+
+        target_date = session.execute(
+            select(func.max(Booking.arrival_date)).where(Booking.hotel_id == hotel_id)
+        ).scalar() or date.today()
+
+        if disable_seqscan:
+            # На маленьких dev-базах seq scan дешевле любого индекса — проверяем лишь применимость индекса
+            session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        ok = True
+        for name, index_name, stmt in hot_queries(hotel_id, city_id, target_date, has_deposit):
+            indexes = used_indexes(session, stmt)
+            if index_name in indexes:
+                logger.info(f"OK   {name}: {index_name}")
+            else:
+                ok = False
+                logger.error(f"FAIL {name}: ожидался {index_name}, в плане {sorted(indexes) or 'нет индексов'}")
+
+        session.rollback()
+
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotel-id", type=int, default=1)
+    parser.add_argument("--has-deposit", action="store_true")
+    parser.add_argument(
+        "--disable-seqscan",
+        action="store_true",
+        help="Запретить seq scan (для небольших dev-баз, где планировщик предпочитает полный просмотр)",
+    )
+    args = parser.parse_args()
+
+    if not check(args.hotel_id, args.has_deposit, args.disable_seqscan):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import asyncio
 import logging
 from datetime import datetime, date
 from sqlalchemy.ext.asyncio import AsyncSession
+from shared.booking_rollup import rebuild_booking_rollup
 from shared.db import AsyncSessionLocal
 
 from data_import.import_bookings import load_bookings_from_csv, assign_booking_refs
@@ -26,6 +27,10 @@ async def import_data(session: AsyncSession) -> None:
     await assign_booking_refs(session)
     logger.info(f"Импорт бронирований: {count}")
 
+    rows = await rebuild_booking_rollup(session)
+    await session.commit()
+    logger.info(f"Rollup booking_daily: {rows}")
+
     # === Праздники ===
     count = await load_holidays_to_db(date(2015, 7, 1), date(2017, 8, 31), session)
     logger.info(f"Импорт праздников: {count}")
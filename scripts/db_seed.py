@@ -7,6 +7,8 @@ import asyncio
 import logging
 from datetime import date
 
+from shared.booking_partitions import ensure_partitions_for_bookings
+from shared.booking_rollup import apply_booking_rollup
 from shared.db import async_engine, AsyncSessionLocal, Base
 from shared.db_models import City, Hotel, Holiday, Weather, Booking, Prediction
 
@@ -81,7 +83,10 @@ async def seed_initial_data():
                 reserved_room_type="C", day_of_week=1
             ),
         ]
+        await ensure_partitions_for_bookings(session, bookings)
         session.add_all(bookings)
+        await session.flush()
+        await apply_booking_rollup(session, bookings)
 
         # === Прогнозы ===
         predictions = [
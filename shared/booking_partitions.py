@@ -0,0 +1,38 @@
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db_models import Booking
+
+
+def booking_date_span(bookings: Iterable[Booking]) -> tuple[date, date] | None:
+    """Минимальная и максимальная дата заезда среди бронирований (None для пустого набора)."""
+    dates = [booking.arrival_date for booking in bookings]
+    if not dates:
+        return None
+    return min(dates), max(dates)
+
+
+async def ensure_booking_partitions(db: AsyncSession, start_date: date, end_date: date) -> int:
+    """
+    Создаёт недостающие годовые партиции booking на диапазон [start_date, end_date].
+    Фиксация остаётся за вызывающим кодом.
+
+    Returns:
+        int: количество созданных партиций.
+    """
+    result = await db.execute(select(func.ensure_booking_partitions(start_date, end_date)))
+    return result.scalar_one()
+
+
+async def ensure_partitions_for_bookings(db: AsyncSession, bookings: Iterable[Booking]) -> int:
+    """
+    Гарантирует наличие партиций под даты заезда новых бронирований.
+    Вызывается перед вставкой: строки без подходящей партиции PostgreSQL отклоняет.
+    """
+    span = booking_date_span(bookings)
+    if span is None:
+        return 0
+    return await ensure_booking_partitions(db, *span)
@@ -0,0 +1,125 @@
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy import Integer, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db_models import Booking, BookingDaily
+
+# Postgres принимает не больше 32767 параметров в одном запросе; строка rollup занимает 5,
+# поэтому приращения записываются пачками с запасом
+ROLLUP_BATCH_ROWS = 5000
+
+
+def _count_deltas(keys: Iterable[tuple]) -> list[dict]:
+    """Считает приращения rollup по кортежам (hotel_id, has_deposit, arrival_date, is_cancellation)."""
+    totals: Counter = Counter()
+    cancels: Counter = Counter()
+
+    for hotel_id, has_deposit, arrival_date, is_cancellation in keys:
+        if has_deposit is None:
+            continue  # такие записи не попадают ни в один срез истории
+        key = (hotel_id, has_deposit, arrival_date)
+        totals[key] += 1
+        cancels[key] += int(bool(is_cancellation))
+
+    return [
+        {
+            "hotel_id": hotel_id,
+            "has_deposit": has_deposit,
+            "arrival_date": arrival_date,
+            "bookings": count,
+            "cancellations": cancels[(hotel_id, has_deposit, arrival_date)],
+        }
+        for (hotel_id, has_deposit, arrival_date), count in totals.items()
+    ]
+
+
+def count_daily_deltas(bookings: Iterable[Booking]) -> list[dict]:
+    """
+    Считает приращения rollup по новым бронированиям.
+
+    Returns:
+        list[dict]: строки {hotel_id, has_deposit, arrival_date, bookings, cancellations}.
+    """
+    return _count_deltas(
+        (booking.hotel_id, booking.has_deposit, booking.arrival_date, booking.is_cancellation)
+        for booking in bookings
+    )
+
+
+def count_record_deltas(records: Iterable[dict]) -> list[dict]:
+    """То же, что count_daily_deltas, для словарей колонок booking (bulk-вставка без ORM)."""
+    return _count_deltas(
+        (record["hotel_id"], record["has_deposit"], record["arrival_date"], record["is_cancellation"])
+        for record in records
+    )
+
+
+def rollup_increment_stmt(deltas: list[dict]) -> Insert:
+    """UPSERT, прибавляющий приращения к существующим строкам booking_daily."""
+    stmt = insert(BookingDaily).values(deltas)
+    return stmt.on_conflict_do_update(
+        constraint="uq_booking_daily_key",
+        set_={
+            "bookings": BookingDaily.bookings + stmt.excluded.bookings,
+            "cancellations": BookingDaily.cancellations + stmt.excluded.cancellations,
+        },
+    )
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: list[dict]) -> int:
+    """
+    Применяет посчитанные приращения в текущей транзакции пачками по ROLLUP_BATCH_ROWS строк;
+    возвращает количество затронутых дней.
+    """
+    for start in range(0, len(deltas), ROLLUP_BATCH_ROWS):
+        await db.execute(rollup_increment_stmt(deltas[start:start + ROLLUP_BATCH_ROWS]))
+    return len(deltas)
+
+
+async def apply_booking_rollup(db: AsyncSession, bookings: Iterable[Booking]) -> int:
+    """
+    Обновляет booking_daily по новым бронированиям в текущей транзакции.
+    Фиксация остаётся за вызывающим кодом — rollup коммитится вместе с бронированиями.
+
+    Returns:
+        int: количество затронутых дней.
+    """
+    return await apply_rollup_deltas(db, count_daily_deltas(bookings))
+
+
+async def rebuild_booking_rollup(db: AsyncSession, hotel_id: int | None = None) -> int:
+    """
+    Полностью пересчитывает booking_daily по таблице booking (для одного отеля или для всех).
+    Фиксация остаётся за вызывающим кодом.
+
+    Returns:
+        int: количество записанных строк rollup.
+    """
+    delete_stmt = delete(BookingDaily)
+    source = (
+        select(
+            Booking.hotel_id,
+            Booking.has_deposit,
+            Booking.arrival_date,
+            func.count(Booking.id),
+            func.coalesce(func.sum(cast(Booking.is_cancellation, Integer)), 0),
+        )
+        .where(Booking.has_deposit.isnot(None))
+        .group_by(Booking.hotel_id, Booking.has_deposit, Booking.arrival_date)
+    )
+
+    if hotel_id is not None:
+        delete_stmt = delete_stmt.where(BookingDaily.hotel_id == hotel_id)
+        source = source.where(Booking.hotel_id == hotel_id)
+
+    await db.execute(delete_stmt)
+    result = await db.execute(
+        insert(BookingDaily).from_select(
+            ["hotel_id", "has_deposit", "arrival_date", "bookings", "cancellations"],
+            source,
+        )
+    )
+    return result.rowcount
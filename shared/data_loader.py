@@ -1,13 +1,34 @@
+from datetime import date
+
 import pandas as pd
 from sqlalchemy.orm import Session
 from shared.db_models import Booking, Weather, Holiday, Hotel
 from shared.errors import DatabaseError, ValidationError
 
 
-def load_bookings(hotel_id: int, db: Session) -> pd.DataFrame:
-    """Загружает данные о бронированиях для указанного отеля."""
+def load_bookings(
+    hotel_id: int,
+    db: Session,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    has_deposit: bool | None = None,
+) -> pd.DataFrame:
+    """
+    Загружает данные о бронированиях для указанного отеля.
+
+    Фильтры по датам заезда ограничивают чтение нужными партициями booking;
+    без них загружается вся история отеля.
+    """
+    query = db.query(Booking).filter(Booking.hotel_id == hotel_id)
+    if start_date is not None:
+        query = query.filter(Booking.arrival_date >= start_date)
+    if end_date is not None:
+        query = query.filter(Booking.arrival_date <= end_date)
+    if has_deposit is not None:
+        query = query.filter(Booking.has_deposit == has_deposit)
+
     try:
-        records = db.query(Booking).filter(Booking.hotel_id == hotel_id).all()
+        records = query.all()
     except Exception as e:
         raise DatabaseError(f"Ошибка при загрузке бронирований для hotel_id={hotel_id}: {e}")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Numeric, ForeignKey, text, Enum as SqlEnum, UniqueConstraint
+from sqlalchemy import Index, Numeric, ForeignKey, text, Enum as SqlEnum, UniqueConstraint
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import date
 
@@ -82,12 +82,17 @@ class Hotel(Base):
 
 
 class Booking(Base):
+    """
+    Бронирование. Таблица секционирована по диапазонам arrival_date (годовые партиции booking_yYYYY),
+    поэтому arrival_date входит в первичный ключ. Партиции создаёт функция БД ensure_booking_partitions.
+    """
     __tablename__ = "booking"
 
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     booking_ref: Mapped[str | None]
     hotel_id: Mapped[int] = mapped_column(ForeignKey("hotel.id"), nullable=False)
 
-    arrival_date: Mapped[date] = mapped_column(nullable=False)
+    arrival_date: Mapped[date] = mapped_column(primary_key=True)
     lead_time: Mapped[int | None]
     adr: Mapped[float | None]
     total_guests: Mapped[int | None]
@@ -103,6 +108,38 @@ class Booking(Base):
 
     hotel: Mapped["Hotel"] = relationship(back_populates="bookings")
 
+    __table_args__ = (
+        # История и счётчики: фильтр (отель, депозит, диапазон дат), отмены читаются из индекса
+        Index(
+            "ix_booking_hotel_deposit_arrival",
+            "hotel_id", "has_deposit", "arrival_date",
+            postgresql_include=["is_cancellation"],
+        ),
+        # Поиск дубликатов при импорте: только записи с booking_ref
+        Index(
+            "ix_booking_hotel_ref",
+            "hotel_id", "booking_ref",
+            postgresql_where=text("booking_ref IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (arrival_date)"},
+    )
+
+
+class BookingDaily(Base):
+    """Дневной rollup бронирований: количество бронирований и отмен по (отель, депозит, дата заезда)."""
+    __tablename__ = "booking_daily"
+
+    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotel.id"), nullable=False)
+    has_deposit: Mapped[bool] = mapped_column(nullable=False)
+    arrival_date: Mapped[date] = mapped_column(nullable=False)
+
+    bookings: Mapped[int] = mapped_column(nullable=False, server_default=text("0"))
+    cancellations: Mapped[int] = mapped_column(nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        UniqueConstraint("hotel_id", "has_deposit", "arrival_date", name="uq_booking_daily_key"),
+    )
+
 
 class Weather(Base):
     __tablename__ = "weather"
@@ -117,6 +154,10 @@ class Weather(Base):
 
     city: Mapped["City"] = relationship(back_populates="weather")
 
+    __table_args__ = (
+        Index("ix_weather_city_day", "city_id", "day", postgresql_include=["temp_avg"]),
+    )
+
 
 class Holiday(Base):
     __tablename__ = "holiday"
@@ -139,3 +180,11 @@ class Prediction(Base):
     cancellations: Mapped[float | None]
 
     hotel: Mapped["Hotel"] = relationship(back_populates="predictions")
+
+    __table_args__ = (
+        Index(
+            "ix_prediction_hotel_deposit_target",
+            "hotel_id", "has_deposit", "target_date",
+            postgresql_include=["bookings", "cancellations"],
+        ),
+    )
@@ -1,11 +1,13 @@
 import logging
-import uuid
+import math
 from typing import Type
 
 from fastapi import Request, FastAPI, status
-from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 
+from shared.responses import FastJSONResponse
+from shared.tracing import TracingMiddleware
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,12 +21,21 @@ class ServiceError(Exception):
     type: str = "ServiceError"
     message: str = "Internal service error"
     code: str | None = None
-
-    def __init__(self, message: str | None = None, code: str | None = None):
+    # Дополнительные заголовки ответа (например, Retry-After)
+    headers: dict[str, str] | None = None
+
+    def __init__(
+        self,
+        message: str | None = None,
+        code: str | None = None,
+        headers: dict[str, str] | None = None,
+    ):
         if message:
             self.message = message
         if code:
             self.code = code
+        if headers:
+            self.headers = headers
         super().__init__(self.message)
 
 
@@ -60,6 +71,25 @@ class DatabaseError(ServiceError):
     message = "Ошибка взаимодействия с базой данных"
 
 
+class PayloadTooLargeError(ServiceError):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    type = "PayloadTooLargeError"
+    message = "Размер запроса превышает допустимый"
+
+
+class RateLimitError(ServiceError):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    type = "RateLimitError"
+    message = "Превышен лимит запросов"
+
+    def __init__(self, retry_after: float | None = None, message: str | None = None):
+        headers = None
+        if retry_after is not None:
+            headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+        super().__init__(message, headers=headers)
+        self.retry_after = retry_after
+
+
 class ExternalServiceError(ServiceError):
     status_code = status.HTTP_502_BAD_GATEWAY
     type = "ExternalServiceError"
@@ -88,6 +118,12 @@ class CSVProcessingError(ServiceError):
     message = "Ошибка обработки CSV-файла"
 
 
+class ColumnarFormatError(ServiceError):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    type = "ColumnarFormatError"
+    message = "Ошибка обработки Parquet/Arrow-файла"
+
+
 class MappingError(ServiceError):
     status_code = status.HTTP_400_BAD_REQUEST
     type = "MappingError"
@@ -127,34 +163,25 @@ def format_error_response(exc: ServiceError, trace_id: str | None = None) -> dic
 
 # === Регистрация глобальных обработчиков ===
 
-def register_error_handlers(app: FastAPI):
+def register_error_handlers(app: FastAPI, service: str | None = None):
     """
-    Регистрирует глобальные обработчики ошибок и middleware для trace_id.
+    Регистрирует глобальные обработчики ошибок и middleware трассировки (trace_id).
     Должен вызываться в каждом микросервисе один раз при инициализации FastAPI.
+    service — имя сервиса в span трассировки (по умолчанию title приложения).
     """
 
-    # --- Middleware для trace_id ---
-    @app.middleware("http")
-    async def add_trace_id_middleware(request: Request, call_next):
-        trace_id = str(uuid.uuid4())
-        request.state.trace_id = trace_id
-
-        try:
-            response = await call_next(request)
-        except Exception:
-            raise
-        else:
-            response.headers["X-Trace-ID"] = trace_id
-            return response
+    # --- Middleware для trace_id: входящий X-Trace-ID сохраняется, span пишутся в буфер ---
+    app.add_middleware(TracingMiddleware, service=service or app.title)
 
     # --- Обработка предсказуемых (контролируемых) ошибок ---
     @app.exception_handler(ServiceError)
     async def service_error_handler(request: Request, exc: ServiceError):
         trace_id = getattr(request.state, "trace_id", None)
         logger.warning(f"[{exc.type}] {exc.message} (trace_id={trace_id})")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=exc.status_code,
             content=format_error_response(exc, trace_id),
+            headers=exc.headers,
         )
 
     # --- Обработка непредусмотренных ошибок ---
@@ -163,7 +190,7 @@ def register_error_handlers(app: FastAPI):
         trace_id = getattr(request.state, "trace_id", None)
         logger.exception(f"Unhandled exception (trace_id={trace_id})", exc_info=exc)
         generic = ServiceError("Unexpected internal error", code="INTERNAL_ERROR")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=format_error_response(generic, trace_id),
         )
@@ -0,0 +1,33 @@
+"""
+Ключи Redis-кэша ответов /forecast/fetch.
+
+Используются Data Interface (чтение и запись кэша) и сервисами, меняющими данные
+прогноза (инвалидация), поэтому формат ключей задаётся в одном месте.
+"""
+from datetime import date
+
+FORECAST_CACHE_PREFIX = "forecast_cache"
+
+
+def forecast_generation_key(hotel_id: int, has_deposit: bool) -> str:
+    """Счётчик поколения данных (отель, депозит); INCR инвалидирует все записи среза."""
+    return f"{FORECAST_CACHE_PREFIX}:gen:{hotel_id}:{int(has_deposit)}"
+
+
+def forecast_entry_key(
+    hotel_id: int,
+    has_deposit: bool,
+    target_date: date,
+    horizon: int,
+    history_window: int,
+) -> str:
+    """Ключ закэшированного ответа для параметров запроса."""
+    return (
+        f"{FORECAST_CACHE_PREFIX}:entry:{hotel_id}:{int(has_deposit)}:"
+        f"{target_date.isoformat()}:{horizon}:{history_window}"
+    )
+
+
+def forecast_lock_key(entry_key: str) -> str:
+    """Ключ блокировки пересчёта записи (защита от stampede)."""
+    return f"{entry_key}:lock"
@@ -0,0 +1,291 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Iterator, Protocol
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.tracing import route_template, span
+
+# Границы бакетов гистограмм (le): секунды обработки и байты тела ответа
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# Запросы без найденного маршрута (404, сканеры) сводятся в одну серию, чтобы не плодить метки
+UNMATCHED_ROUTE = "<unmatched>"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Кумулятивная гистограмма в формате Prometheus: счётчики бакетов, сумма и число наблюдений."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # bisect_left: значение, равное границе, попадает в её бакет (le — «меньше или равно»)
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip((*map(_format_value, self.bounds), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class HttpMetrics:
+    """
+    Метрики HTTP-запросов процесса.
+
+    Все обновления выполняются в event loop (из ASGI middleware), поэтому обходятся без блокировок.
+    """
+
+    def __init__(self):
+        self.requests: dict[tuple[str, str, str], int] = defaultdict(int)
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.response_size: dict[tuple[str, str], Histogram] = {}
+        self.in_progress: dict[str, int] = defaultdict(int)
+
+    def start(self, method: str) -> None:
+        self.in_progress[method] += 1
+
+    def finish(self, method: str, route: str, status: int, duration: float, size: int) -> None:
+        self.in_progress[method] -= 1
+        self.requests[(method, route, str(status))] += 1
+
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(duration)
+        self.response_size[key].observe(size)
+
+    def clear(self) -> None:
+        self.requests.clear()
+        self.latency.clear()
+        self.response_size.clear()
+        self.in_progress.clear()
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus (0.0.4)."""
+        lines = [
+            "# HELP http_requests_total Число обработанных HTTP-запросов.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines += [
+            "# HELP http_requests_in_progress Число запросов, обрабатываемых в данный момент.",
+            "# TYPE http_requests_in_progress gauge",
+        ]
+        for method, count in sorted(self.in_progress.items()):
+            lines.append(f"http_requests_in_progress{_labels(method=method)} {count}")
+
+        lines += _render_histograms(
+            "http_request_duration_seconds",
+            "Время обработки запроса до отправки последнего байта ответа, секунды.",
+            self.latency,
+        )
+        lines += _render_histograms(
+            "http_response_size_bytes",
+            "Размер тела ответа, байты (после сжатия).",
+            self.response_size,
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histograms(
+    name: str,
+    description: str,
+    histograms: dict[tuple[str, ...], Histogram],
+    label_names: tuple[str, ...] = ("method", "route"),
+) -> list[str]:
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {_format_value(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+http_metrics = HttpMetrics()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware метрик: счётчик запросов по маршруту и статусу, гистограммы времени
+    обработки и размера ответа, число запросов в обработке.
+
+    Маршрут берётся шаблоном (/data/items/{item_id}), а не фактическим путём, чтобы число
+    серий не зависело от идентификаторов в URL.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: HttpMetrics = http_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.start(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            self.metrics.finish(
+                method,
+                route_template(scope) or UNMATCHED_ROUTE,
+                status_code,
+                time.perf_counter() - started,
+                size,
+            )
+
+
+class StageMetrics:
+    """
+    Гистограммы длительности этапов обработки (pipeline_stage_duration_seconds).
+
+    Этапы выполняются и в потоках пула (синхронные обработчики), поэтому обновления под блокировкой.
+    """
+
+    def __init__(self):
+        self.durations: dict[tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, pipeline: str, stage: str, duration: float) -> None:
+        with self._lock:
+            histogram = self.durations.get((pipeline, stage))
+            if histogram is None:
+                histogram = self.durations[(pipeline, stage)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(duration)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.durations.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            lines = _render_histograms(
+                "pipeline_stage_duration_seconds",
+                "Длительность этапа обработки, секунды.",
+                self.durations,
+                label_names=("pipeline", "stage"),
+            )
+        return "\n".join(lines) + "\n"
+
+
+stage_metrics = StageMetrics()
+
+
+class StageProfiler(Protocol):
+    """Дополнительное измерение этапа (например, профиль памяти), вызываемое из StageTimer.stage()."""
+
+    def stage(self, name: str) -> AbstractContextManager: ...
+
+
+class StageTimer:
+    """
+    Таймер этапов одного запуска конвейера.
+
+    Каждый этап попадает в гистограмму stage_metrics, в трассу (span stage.<имя>) и в timings —
+    миллисекунды по этапам в порядке выполнения (повторный этап суммируется).
+    Вложенные этапы называются через точку (preprocess.aggregate_historical) и входят во внешний.
+    """
+
+    def __init__(self, pipeline: str, metrics: StageMetrics = stage_metrics, profiler: StageProfiler | None = None):
+        self.pipeline = pipeline
+        self.metrics = metrics
+        self.profiler = profiler
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            with span(f"stage.{name}", pipeline=self.pipeline):
+                if self.profiler is None:
+                    yield
+                else:
+                    with self.profiler.stage(name):
+                        yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.observe(self.pipeline, name, elapsed)
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed * 1000, 3)
+
+    @property
+    def total_ms(self) -> float:
+        """Сумма этапов верхнего уровня: вложенные этапы уже входят во внешние."""
+        return round(sum(duration for name, duration in self.timings.items() if "." not in name), 3)
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing: <этап>;dur=<мс>, ..."""
+        return ", ".join(f"{name};dur={duration}" for name, duration in self.timings.items())
+
+
+def timed_stage(timer: StageTimer | None, name: str) -> AbstractContextManager:
+    """Этап timer или пустой контекст для функций, которые вызываются и без таймера."""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(http_metrics.render() + stage_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def add_metrics(app: FastAPI) -> None:
+    """
+    Подключает MetricsMiddleware и GET /metrics.
+
+    Вызывается после остальных add_middleware, чтобы middleware оказалась внешней и учитывала
+    всё время обработки и размер ответа после сжатия.
+    """
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
@@ -0,0 +1,51 @@
+from typing import Any
+
+import orjson
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware
+
+# Ответы меньше этого размера не сжимаются: выигрыш не окупает заголовки и время сжатия
+GZIP_MINIMUM_SIZE = 1024
+
+# Уровень 9 (по умолчанию в Starlette) почти не уменьшает JSON по сравнению с 5, но заметно медленнее
+GZIP_COMPRESS_LEVEL = 5
+
+# Parquet-экспорт уже сжат внутри файла (snappy)
+GZIP_EXCLUDED_CONTENT_TYPES = (*DEFAULT_EXCLUDED_CONTENT_TYPES, "application/vnd.apache.parquet")
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые orjson не сериализует сам (модели pydantic, Decimal и т.п.)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ на orjson для ответов, которые эндпоинты и обработчики собирают сами:
+    ошибки (общие обработчики shared.errors), /health-эндпоинты router, /auth/me, трассы
+    и отладочные ответы prediction_service.
+
+    Как default_response_class не используется: ответы с response_model FastAPI сериализует
+    через pydantic-core быстрее. Ключи-числа (например, hotel_id) и numpy-значения
+    сериализуются без преобразований, прочие типы — через jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def add_gzip_middleware(app: FastAPI) -> None:
+    """Сжатие gzip для крупных ответов клиентам, которые его принимают (Accept-Encoding)."""
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=GZIP_MINIMUM_SIZE,
+        compresslevel=GZIP_COMPRESS_LEVEL,
+        exclude_content_types=GZIP_EXCLUDED_CONTENT_TYPES,
+    )
@@ -0,0 +1,241 @@
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator
+
+from fastapi import APIRouter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.responses import FastJSONResponse
+from shared.tracing_config import tracing_config
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "X-Trace-ID"
+PARENT_SPAN_HEADER = "X-Parent-Span-ID"
+# Время отправки запроса предыдущим звеном (формат nginx: t=<unix-время в секундах>)
+REQUEST_START_HEADER = "X-Request-Start"
+
+# Входящий trace_id принимается, только если он похож на идентификатор (без мусора в логах и ключах)
+TRACE_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_current_trace_id: ContextVar[str | None] = ContextVar("trace_id", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("span", default=None)
+
+
+@dataclass
+class Span:
+    """Отрезок времени внутри трассы; start — unix-время, чтобы span разных сервисов совмещались."""
+    trace_id: str
+    service: str
+    name: str
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    parent_id: str | None = None
+    start: float = field(default_factory=time.time)
+    duration_ms: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class SpanBuffer:
+    """Кольцевой буфер последних завершённых span процесса."""
+
+    def __init__(self, max_size: int):
+        self._spans: deque[Span] = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def find(self, trace_id: str) -> list[Span]:
+        with self._lock:
+            spans = [span for span in self._spans if span.trace_id == trace_id]
+        return sorted(spans, key=lambda span: span.start)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+span_buffer = SpanBuffer(tracing_config.buffer_size)
+
+
+def export_span(span: Span) -> None:
+    if not tracing_config.enabled:
+        return
+    span_buffer.add(span)
+    if tracing_config.log_spans:
+        logger.info(json.dumps(span.to_dict(), ensure_ascii=False, default=str))
+
+
+def current_trace_id() -> str | None:
+    return _current_trace_id.get()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, service: str | None = None, **attributes) -> Iterator[Span | None]:
+    """
+    Дочерний span текущего запроса. Вне трассы (фоновые задачи, скрипты) ничего не записывает.
+    Атрибуты можно дополнять внутри блока через возвращённый span.
+    """
+    parent = _current_span.get()
+    trace_id = _current_trace_id.get()
+    if trace_id is None or not tracing_config.enabled:
+        yield None
+        return
+
+    child = Span(
+        trace_id=trace_id,
+        service=service or (parent.service if parent else "unknown"),
+        name=name,
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    started = time.perf_counter()
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        child.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        export_span(child)
+
+
+def trace_headers() -> dict[str, str]:
+    """Заголовки для исходящего запроса: trace_id, родительский span и время отправки."""
+    trace_id = _current_trace_id.get()
+    if trace_id is None:
+        return {}
+
+    headers = {TRACE_HEADER: trace_id, REQUEST_START_HEADER: f"t={time.time():.6f}"}
+    parent = _current_span.get()
+    if parent is not None:
+        headers[PARENT_SPAN_HEADER] = parent.span_id
+    return headers
+
+
+def _incoming_trace_id(headers: Headers) -> str:
+    trace_id = headers.get(TRACE_HEADER)
+    if trace_id and TRACE_ID_PATTERN.match(trace_id):
+        return trace_id
+    return str(uuid.uuid4())
+
+
+def _request_start(headers: Headers) -> float | None:
+    raw = headers.get(REQUEST_START_HEADER)
+    if not raw:
+        return None
+    try:
+        return float(raw.removeprefix("t="))
+    except ValueError:
+        return None
+
+
+def route_template(scope: Scope) -> str | None:
+    """Шаблон пути маршрута с префиксами include_router (/data/items/{item_id}), если маршрут найден."""
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware трассировки.
+
+    Принимает X-Trace-ID входящего запроса (или создаёт новый), кладёт его в request.state.trace_id
+    и контекст запроса, возвращает в ответе. Записывает span обработчика (http.request) и, если
+    предыдущее звено передало X-Request-Start, span ожидания (queue) — от отправки запроса
+    до начала обработки (сеть и очередь сервера).
+    """
+
+    def __init__(self, app: ASGIApp, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        trace_id = _incoming_trace_id(headers)
+        scope.setdefault("state", {})["trace_id"] = trace_id
+
+        root = Span(
+            trace_id=trace_id,
+            service=self.service,
+            name="http.request",
+            parent_id=headers.get(PARENT_SPAN_HEADER),
+            attributes={"method": scope["method"], "path": scope["path"]},
+        )
+
+        request_start = _request_start(headers)
+        if request_start is not None and request_start <= root.start:
+            export_span(Span(
+                trace_id=trace_id,
+                service=self.service,
+                name="queue",
+                parent_id=root.span_id,
+                start=request_start,
+                duration_ms=round((root.start - request_start) * 1000, 3),
+            ))
+
+        status_code = 500
+
+        async def send_with_trace_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[TRACE_HEADER] = trace_id
+            await send(message)
+
+        started = time.perf_counter()
+        trace_token = _current_trace_id.set(trace_id)
+        span_token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            _current_span.reset(span_token)
+            _current_trace_id.reset(trace_token)
+
+            route = route_template(scope)
+            if route is not None:
+                root.attributes["route"] = route
+            root.attributes["status"] = status_code
+            root.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            export_span(root)
+
+
+traces_router = APIRouter(tags=["Tracing"])
+
+
+@traces_router.get("/traces/{trace_id}", summary="Span трассы, записанные этим сервисом")
+def get_local_trace(trace_id: str):
+    return FastJSONResponse({
+        "trace_id": trace_id,
+        "spans": [span.to_dict() for span in span_buffer.find(trace_id)],
+    })
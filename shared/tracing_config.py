@@ -0,0 +1,17 @@
+from pydantic import Field
+from pydantic_settings import SettingsConfigDict
+
+from shared.base_config import ConfigBase
+
+
+class TracingConfig(ConfigBase):
+    model_config = SettingsConfigDict(env_prefix="TRACING_")
+
+    enabled: bool = True
+    # Число последних span в кольцевом буфере процесса (GET /traces/{trace_id})
+    buffer_size: int = Field(10_000, ge=1)
+    # Дублировать завершённые span в лог одной JSON-строкой (логгер shared.tracing)
+    log_spans: bool = False
+
+
+tracing_config = TracingConfig()
@@ -0,0 +1,21 @@
+import pytest
+
+from data_interface_service.services.forecast_cache import ForecastCache
+
+from faces.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def forecast_cache(fake_redis):
+    return ForecastCache(
+        redis=fake_redis,
+        ttl_seconds=60,
+        lock_ttl_seconds=5,
+        lock_wait_seconds=1.0,
+        poll_interval_seconds=0.01,
+    )
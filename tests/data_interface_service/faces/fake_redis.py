@@ -0,0 +1,44 @@
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+
+class FakeRedis:
+    """
+    Асинхронный in-memory Redis с командами, которые использует кэш прогнозов.
+    TTL не моделируется; eval поддерживает только скрипт снятия блокировки.
+    """
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.available = True
+
+    def _check(self) -> None:
+        if not self.available:
+            raise RedisConnectionError("Redis unavailable")
+
+    async def get(self, key: str) -> str | None:
+        self._check()
+        return self.data.get(key)
+
+    async def mget(self, *keys: str) -> list[str | None]:
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key: str, value: str, nx: bool = False, ex: int | None = None) -> bool | None:
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    async def incr(self, key: str) -> int:
+        self._check()
+        value = int(self.data.get(key, "0")) + 1
+        self.data[key] = str(value)
+        return value
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        self._check()
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
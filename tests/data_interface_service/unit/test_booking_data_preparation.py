@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from data_interface_service.config import data_interface_config
+from data_interface_service.utils.booking_data_preparation import (
+    clean_numeric_series,
+    prepare_booking_columns,
+    prepare_booking_dataframe,
+)
+from data_interface_service.utils.executors import shutdown_preparation_executor
+from shared.errors import CSVProcessingError
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+
+CSV_CONTENT = (
+    "booking_ref;arrival_date;adults;children;stays_in_week_nights;adr;"
+    "is_cancellation;has_deposit;reserved_room_type\n"
+    "A-1;01.07.2017;2;;3;100.5;0;No Deposit;A\n"
+    "A-2;02.07.2017;1;1;2;n/a;1;Non Refund;B\n"
+).encode("utf-8")
+
+
+@pytest.fixture
+def backend(request, monkeypatch):
+    monkeypatch.setattr(data_interface_config.csv_preparation, "backend", request.param)
+    yield request.param
+    shutdown_preparation_executor()
+
+
+def test_prepare_booking_columns_returns_columnar_result():
+    columns = prepare_booking_columns(CSV_CONTENT)
+
+    assert list(columns["booking_ref"]) == ["A-1", "A-2"]
+    assert list(columns["total_guests"]) == [2, 2]
+    assert list(columns["adr"]) == [100.5, 0.0]
+    assert [d.isoformat() for d in columns["arrival_date_parsed"]] == ["2017-07-01", "2017-07-02"]
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"], indirect=True)
+async def test_prepare_booking_dataframe_backends_match(backend):
+    df = await prepare_booking_dataframe(CSV_CONTENT, hotel_id=1)
+
+    assert len(df) == 2
+    assert df["total_nights"].tolist() == [3, 2]
+    assert df["arrival_date_parsed"].iloc[1].isoformat() == "2017-07-02"
+
+
+@pytest.mark.parametrize("backend", ["process"], indirect=True)
+async def test_prepare_booking_dataframe_propagates_errors_from_worker(backend):
+    with pytest.raises(CSVProcessingError):
+        await prepare_booking_dataframe(b"booking_ref;adults\nA-1;2\n", hotel_id=1)
+
+
+@pytest.mark.parametrize("content", [b"", b"   \n", "дата".encode("cp1251")])
+def test_prepare_booking_columns_rejects_empty_or_non_utf8(content):
+    with pytest.raises(CSVProcessingError):
+        prepare_booking_columns(content)
+
+
+def test_clean_numeric_series_keeps_numeric_columns_and_fills_missing():
+    series = pd.Series([1.0, None, 3.0])
+
+    result = clean_numeric_series(series, 0, int)
+
+    assert result.tolist() == [1, 0, 3]
+    assert result.dtype == int
+
+
+def test_clean_numeric_series_maps_sentinels_in_string_columns():
+    series = pd.Series([" 2 ", "n/a", "", "NULL", "none", "7.5", None], dtype=object)
+
+    result = clean_numeric_series(series, 0.0, float)
+
+    assert result.tolist() == [2.0, 0.0, 0.0, 0.0, 0.0, 7.5, 0.0]
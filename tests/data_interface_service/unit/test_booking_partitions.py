@@ -0,0 +1,22 @@
+from datetime import date
+
+import pytest
+
+from shared.booking_partitions import booking_date_span
+from shared.db_models import Booking
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+
+def test_booking_date_span_returns_min_and_max():
+    bookings = [
+        Booking(hotel_id=1, arrival_date=date(2017, 6, 1)),
+        Booking(hotel_id=1, arrival_date=date(2016, 12, 31)),
+        Booking(hotel_id=1, arrival_date=date(2018, 1, 1)),
+    ]
+
+    assert booking_date_span(bookings) == (date(2016, 12, 31), date(2018, 1, 1))
+
+
+def test_booking_date_span_empty():
+    assert booking_date_span([]) is None
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from shared.booking_rollup import ROLLUP_BATCH_ROWS, apply_rollup_deltas, count_daily_deltas, rollup_increment_stmt
+from shared.db_models import Booking
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+
+def _booking(day: date, has_deposit: bool | None, is_cancellation: bool, hotel_id: int = 1) -> Booking:
+    return Booking(
+        hotel_id=hotel_id,
+        arrival_date=day,
+        has_deposit=has_deposit,
+        is_cancellation=is_cancellation,
+    )
+
+
+def test_count_daily_deltas_groups_by_key():
+    bookings = [
+        _booking(date(2017, 6, 1), False, False),
+        _booking(date(2017, 6, 1), False, True),
+        _booking(date(2017, 6, 1), True, True),
+        _booking(date(2017, 6, 2), False, False, hotel_id=2),
+    ]
+
+    deltas = {
+        (d["hotel_id"], d["has_deposit"], d["arrival_date"]): (d["bookings"], d["cancellations"])
+        for d in count_daily_deltas(bookings)
+    }
+
+    assert deltas == {
+        (1, False, date(2017, 6, 1)): (2, 1),
+        (1, True, date(2017, 6, 1)): (1, 1),
+        (2, False, date(2017, 6, 2)): (1, 0),
+    }
+
+
+def test_count_daily_deltas_skips_unknown_deposit():
+    assert count_daily_deltas([_booking(date(2017, 6, 1), None, False)]) == []
+
+
+def test_rollup_increment_stmt_adds_to_existing_row():
+    deltas = count_daily_deltas([_booking(date(2017, 6, 1), False, True)])
+    sql = str(rollup_increment_stmt(deltas).compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT ON CONSTRAINT uq_booking_daily_key DO UPDATE" in sql
+    assert "booking_daily.bookings + excluded.bookings" in sql
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+
+async def test_apply_rollup_deltas_splits_large_upserts():
+    start = date(2017, 1, 1)
+    bookings = [_booking(start + timedelta(days=i), False, False) for i in range(ROLLUP_BATCH_ROWS + 1)]
+    db = RecordingSession()
+
+    affected = await apply_rollup_deltas(db, count_daily_deltas(bookings))
+
+    assert affected == ROLLUP_BATCH_ROWS + 1
+    assert len(db.statements) == 2
+    params = [stmt.compile(dialect=postgresql.dialect()).params for stmt in db.statements]
+    assert all(len(p) <= 32767 for p in params)
+
+
+async def test_apply_rollup_deltas_without_deltas_does_nothing():
+    db = RecordingSession()
+
+    assert await apply_rollup_deltas(db, []) == 0
+    assert db.statements == []
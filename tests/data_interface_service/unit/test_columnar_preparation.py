@@ -0,0 +1,97 @@
+import io
+from datetime import date
+
+import pytest
+
+from data_interface_service.utils.columnar_preparation import (
+    BOOKING_COLUMNS,
+    ColumnarFormat,
+    detect_columnar_format,
+    prepare_columnar_columns,
+)
+from shared.errors import ColumnarFormatError
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _table(**overrides):
+    columns = {
+        "booking_ref": [" R1 ", "", "R3"],
+        "arrival_date": pa.array([date(2017, 6, 1), date(2017, 6, 2), date(2017, 6, 3)], pa.date32()),
+        "adults": pa.array([2, 0, 1], pa.int32()),
+        "children": pa.array([None, 0, 1], pa.int64()),
+        "stays_in_week_nights": [3, 2, 1],
+        "adr": [100.0, 80.0, 90.5],
+        "has_deposit": ["No Deposit", "Non Refund", "Refundable"],
+        "is_cancellation": [False, True, True],
+        "reserved_room_type": ["A", "B", "C"],
+    }
+    columns.update(overrides)
+    return pa.table(columns)
+
+
+def _parquet(table) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def _arrow_stream(table) -> bytes:
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, table.schema) as writer:
+        writer.write_table(table)
+    return buffer.getvalue()
+
+
+def test_detect_columnar_format_by_magic_bytes():
+    assert detect_columnar_format(_parquet(_table())) is ColumnarFormat.parquet
+    assert detect_columnar_format(_arrow_stream(_table())) is ColumnarFormat.arrow_stream
+
+    with pytest.raises(ColumnarFormatError):
+        detect_columnar_format(b"arrival_date;adults\n01.06.2017;2\n")
+
+
+@pytest.mark.parametrize("encode", [_parquet, _arrow_stream])
+def test_prepare_columnar_columns_builds_booking_columns(encode):
+    columns = prepare_columnar_columns(encode(_table()))
+
+    assert tuple(columns) == BOOKING_COLUMNS
+    # Строка без гостей отбрасывается, как в CSV-импорте
+    assert columns["booking_ref"].tolist() == ["R1", "R3"]
+    assert columns["arrival_date"].tolist() == [date(2017, 6, 1), date(2017, 6, 3)]
+    assert columns["total_guests"].tolist() == [2, 2]
+    assert columns["total_nights"].tolist() == [3, 1]
+    assert columns["has_deposit"].tolist() == [False, True]
+    assert columns["is_cancellation"].tolist() == [False, True]
+    assert columns["market_segment"].tolist() == ["Undefined", "Undefined"]
+    assert columns["day_of_week"].tolist() == [3, 5]
+
+
+def test_prepare_columnar_columns_parses_string_dates_and_numbers():
+    table = _table(
+        arrival_date=["01.06.2017", "02.06.2017", "03.06.2017"],
+        adults=["2", "n/a", "1"],
+        has_deposit=pa.array([False, True, True]),
+    )
+
+    columns = prepare_columnar_columns(_parquet(table))
+
+    assert columns["arrival_date"].tolist() == [date(2017, 6, 1), date(2017, 6, 3)]
+    assert columns["has_deposit"].tolist() == [False, True]
+
+
+def test_prepare_columnar_columns_rejects_incompatible_schema():
+    table = _table(adults=pa.array([date(2017, 1, 1)] * 3, pa.date32()))
+
+    with pytest.raises(ColumnarFormatError, match="adults"):
+        prepare_columnar_columns(_parquet(table))
+
+
+def test_prepare_columnar_columns_requires_booking_columns():
+    table = _table().drop_columns(["reserved_room_type"])
+
+    with pytest.raises(ColumnarFormatError, match="reserved_room_type"):
+        prepare_columnar_columns(_parquet(table))
@@ -0,0 +1,58 @@
+import gzip
+
+import pytest
+
+from data_interface_service.utils.booking_data_preparation import prepare_booking_columns
+from data_interface_service.utils.compression import UploadEncoding, detect_upload_encoding
+from shared.errors import CSVProcessingError
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+CSV_CONTENT = (
+    "booking_ref;arrival_date;adults;stays_in_week_nights;adr;"
+    "is_cancellation;has_deposit;reserved_room_type\n"
+    + "".join(f"A-{i};01.07.2017;2;3;100.5;0;No Deposit;A\n" for i in range(1000))
+).encode("utf-8")
+
+
+def _zstd(content: bytes) -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(content)
+
+
+def test_detect_upload_encoding_by_magic_bytes():
+    assert detect_upload_encoding(CSV_CONTENT) is UploadEncoding.identity
+    assert detect_upload_encoding(gzip.compress(CSV_CONTENT)) is UploadEncoding.gzip
+    assert detect_upload_encoding(_zstd(CSV_CONTENT), "zstd") is UploadEncoding.zstd
+    # Content-Type части без сжатия не мешает определению по сигнатуре
+    assert detect_upload_encoding(gzip.compress(CSV_CONTENT), "text/csv") is UploadEncoding.gzip
+
+
+def test_detect_upload_encoding_rejects_mismatched_declaration():
+    with pytest.raises(CSVProcessingError, match="gzip"):
+        detect_upload_encoding(CSV_CONTENT, "application/gzip")
+
+
+@pytest.mark.parametrize(
+    "compress, encoding",
+    [(gzip.compress, UploadEncoding.gzip), (_zstd, UploadEncoding.zstd)],
+)
+def test_prepare_booking_columns_reads_compressed_csv(compress, encoding):
+    plain = prepare_booking_columns(CSV_CONTENT)
+    columns = prepare_booking_columns(compress(CSV_CONTENT), encoding)
+
+    assert columns.keys() == plain.keys()
+    assert list(columns["booking_ref"]) == list(plain["booking_ref"])
+    assert list(columns["arrival_date_parsed"]) == list(plain["arrival_date_parsed"])
+
+
+def test_prepare_booking_columns_limits_decompressed_size():
+    with pytest.raises(CSVProcessingError, match="размер"):
+        prepare_booking_columns(gzip.compress(CSV_CONTENT), UploadEncoding.gzip, max_decompressed_bytes=1024)
+
+
+def test_prepare_booking_columns_rejects_truncated_archive():
+    truncated = gzip.compress(CSV_CONTENT)[:100]
+
+    with pytest.raises(CSVProcessingError, match="gzip"):
+        prepare_booking_columns(truncated, UploadEncoding.gzip)
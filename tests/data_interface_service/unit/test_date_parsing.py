@@ -0,0 +1,58 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_interface_service.utils.date_parsing import parse_dates_vectorized
+from shared.errors import CSVProcessingError
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+
+def test_parse_dates_mixed_formats_and_composed_fallback():
+    df = pd.DataFrame({
+        "arrival_date": ["01.07.2017", "2017-07-02", None, "03/07/17"],
+        "arrival_date_year": [2017, 2017, 2016, 2017],
+        "arrival_date_month": ["July", "авг", "March", 7],
+        "arrival_date_day_of_month": [1, 2, 3, 4],
+    })
+
+    result = parse_dates_vectorized(df)
+
+    assert result.tolist() == [date(2017, 7, 1), date(2017, 7, 2), date(2016, 3, 3), date(2017, 7, 3)]
+
+
+def test_parse_dates_broadcasts_unique_values_to_all_rows():
+    values = np.array(["01.07.2017", "02.07.2017", "01.07.2017", np.nan, "02.07.2017"], dtype=object)
+    df = pd.DataFrame({
+        "arrival_date": values,
+        "arrival_date_year": [2015] * 5,
+        "arrival_date_month": ["Январь"] * 5,
+        "arrival_date_day_of_month": [9] * 5,
+    })
+
+    result = parse_dates_vectorized(df)
+
+    assert result.tolist() == [
+        date(2017, 7, 1), date(2017, 7, 2), date(2017, 7, 1), date(2015, 1, 9), date(2017, 7, 2)
+    ]
+    assert result.index.equals(df.index)
+
+
+def test_parse_dates_unknown_month_raises():
+    df = pd.DataFrame({
+        "arrival_date_year": [2017],
+        "arrival_date_month": ["Smarch"],
+        "arrival_date_day_of_month": [1],
+    })
+
+    with pytest.raises(CSVProcessingError, match="Неизвестный месяц"):
+        parse_dates_vectorized(df)
+
+
+def test_parse_dates_reports_unparsable_rows():
+    df = pd.DataFrame({"arrival_date": ["01.07.2017", "not a date"]})
+
+    with pytest.raises(CSVProcessingError, match=r"\[1\]"):
+        parse_dates_vectorized(df)
@@ -0,0 +1,30 @@
+import pytest
+
+from data_interface_service.utils.etag import etag_matches, make_etag
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+
+def test_make_etag_depends_on_every_part():
+    base = make_etag(1, False, "2017-06-10", 30, 30, 100, 30, 500, 40, 31)
+
+    assert base.startswith('"') and base.endswith('"')
+    assert base == make_etag(1, False, "2017-06-10", 30, 30, 100, 30, 500, 40, 31)
+    assert base != make_etag(1, False, "2017-06-10", 30, 30, 101, 30, 500, 40, 31)
+    assert base != make_etag(1, True, "2017-06-10", 30, 30, 100, 30, 500, 40, 31)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ("", False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ("*", True),
+        ('"other"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
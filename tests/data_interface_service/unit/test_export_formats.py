@@ -0,0 +1,55 @@
+import io
+from datetime import date
+
+import pytest
+
+from data_interface_service.utils.export_formats import EXPORT_COLUMNS, encode_arrow, encode_csv, encode_parquet
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+BATCHES = [
+    [("history", False, date(2017, 6, 1), 20.0, 5.0), ("history", False, date(2017, 6, 2), 25.0, 4.0)],
+    [("forecast", False, date(2017, 6, 3), 21.5, 3.5)],
+]
+
+
+async def _batches():
+    for rows in BATCHES:
+        yield rows
+
+
+async def _collect(encoder) -> list[bytes]:
+    return [chunk async for chunk in encoder(_batches())]
+
+
+async def test_encode_csv_streams_one_chunk_per_batch():
+    chunks = await _collect(encode_csv)
+
+    assert len(chunks) == len(BATCHES)
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == ",".join(EXPORT_COLUMNS)
+    assert lines[1:] == [
+        "history,False,2017-06-01,20.0,5.0",
+        "history,False,2017-06-02,25.0,4.0",
+        "forecast,False,2017-06-03,21.5,3.5",
+    ]
+
+
+async def test_encode_arrow_round_trip():
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.ipc.open_stream(b"".join(await _collect(encode_arrow))).read_all()
+
+    assert table.column_names == list(EXPORT_COLUMNS)
+    assert table.column("day").to_pylist() == [date(2017, 6, 1), date(2017, 6, 2), date(2017, 6, 3)]
+    assert table.column("bookings").to_pylist() == [20.0, 25.0, 21.5]
+
+
+async def test_encode_parquet_writes_row_group_per_batch():
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(await _collect(encode_parquet))))
+
+    assert parquet_file.num_row_groups == len(BATCHES)
+    assert parquet_file.read().column("kind").to_pylist() == ["history", "history", "forecast"]
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from data_interface_service.services.forecast_cache import CachedForecast
+from shared.errors import NoForecastError
+from shared.forecast_cache_keys import forecast_entry_key, forecast_lock_key
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+PARAMS = dict(hotel_id=1, has_deposit=False, target_date=date(2017, 6, 10), horizon=30, history_window=30)
+
+
+class CountingLoader:
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self) -> CachedForecast:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return CachedForecast(etag='"v1"', body=f'{{"call": {self.calls}}}')
+
+
+async def test_second_request_is_served_from_cache(forecast_cache):
+    loader = CountingLoader()
+
+    first = await forecast_cache.get_or_load(**PARAMS, loader=loader)
+    second = await forecast_cache.get_or_load(**PARAMS, loader=loader)
+
+    assert first == second == CachedForecast(etag='"v1"', body='{"call": 1}')
+    assert loader.calls == 1
+    assert (forecast_cache.stats.hits, forecast_cache.stats.misses) == (1, 1)
+
+
+async def test_invalidate_affects_only_given_deposit(forecast_cache):
+    loader = CountingLoader()
+    other_deposit = {**PARAMS, "has_deposit": True}
+
+    await forecast_cache.get_or_load(**PARAMS, loader=loader)
+    await forecast_cache.get_or_load(**other_deposit, loader=loader)
+    await forecast_cache.invalidate(1, [False])
+
+    await forecast_cache.get_or_load(**PARAMS, loader=loader)
+    await forecast_cache.get_or_load(**other_deposit, loader=loader)
+
+    assert loader.calls == 3
+    assert forecast_cache.stats.invalidations == 1
+
+
+async def test_concurrent_misses_load_once(forecast_cache):
+    loader = CountingLoader(delay=0.05)
+
+    results = await asyncio.gather(*(forecast_cache.get_or_load(**PARAMS, loader=loader) for _ in range(5)))
+
+    assert loader.calls == 1
+    assert len(set(results)) == 1
+    assert forecast_cache.stats.coalesced == 4
+
+
+async def test_loader_error_is_not_cached_and_releases_lock(forecast_cache, fake_redis):
+    loader = CountingLoader(error=NoForecastError())
+
+    with pytest.raises(NoForecastError):
+        await forecast_cache.get_or_load(**PARAMS, loader=loader)
+
+    entry_key = forecast_entry_key(**PARAMS)
+    assert entry_key not in fake_redis.data
+    assert forecast_lock_key(entry_key) not in fake_redis.data
+
+
+async def test_unavailable_redis_falls_back_to_loader(forecast_cache, fake_redis):
+    fake_redis.available = False
+    loader = CountingLoader()
+
+    result = await forecast_cache.get_or_load(**PARAMS, loader=loader)
+    await forecast_cache.invalidate(1, [True, False])
+
+    assert result.body == '{"call": 1}'
+    assert forecast_cache.stats.errors == 3
@@ -0,0 +1,93 @@
+from collections import namedtuple
+from datetime import date
+
+import pytest
+
+from data_interface_service.schemas import BatchForecastRequest
+from data_interface_service.services.forecast_service import (
+    KIND_FORECAST,
+    KIND_HISTORY,
+    KIND_HOTEL,
+    get_batch_history_and_forecast,
+    split_combined_rows,
+)
+
+pytestmark = [pytest.mark.data_interface, pytest.mark.unit]
+
+Row = namedtuple("Row", ["kind", "day", "bookings", "cancellations"])
+
+
+def test_split_combined_rows_groups_by_kind():
+    rows = [
+        Row(KIND_FORECAST, date(2017, 6, 1), 10.0, 2.0),
+        Row(KIND_HISTORY, date(2017, 5, 30), 20.0, 5.0),
+        Row(KIND_HISTORY, date(2017, 5, 31), 25.0, 4.0),
+        Row(KIND_HOTEL, None, None, None),
+    ]
+
+    hotel_exists, history, forecast = split_combined_rows(rows)
+
+    assert hotel_exists is True
+    assert [r.day for r in history] == [date(2017, 5, 30), date(2017, 5, 31)]
+    assert [r.day for r in forecast] == [date(2017, 6, 1)]
+
+
+def test_split_combined_rows_without_hotel_marker():
+    hotel_exists, history, forecast = split_combined_rows([])
+
+    assert hotel_exists is False
+    assert history == [] and forecast == []
+
+
+BatchRow = namedtuple("BatchRow", ["hotel_id", "day", "bookings", "cancellations"])
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return iter(self._rows)
+
+
+class FakeBatchSession:
+    """Отдаёт заранее заданные строки по имени таблицы запроса и считает запросы."""
+
+    def __init__(self, tables: dict[str, list]):
+        self.tables = tables
+        self.queries: list[str] = []
+
+    async def execute(self, stmt):
+        table = stmt.get_final_froms()[0].name
+        self.queries.append(table)
+        return _Result(self.tables[table])
+
+
+async def test_get_batch_history_and_forecast_one_query_per_table():
+    history = [BatchRow(hotel_id, date(2017, 5, d), 20.0, 1.0) for hotel_id in (1, 2) for d in (30, 31)]
+    db = FakeBatchSession({
+        "hotel": [1, 2],
+        "booking_daily": history[:2] + [BatchRow(2, date(2017, 5, 31), 1.0, 0.0)],
+        "prediction": [BatchRow(1, date(2017, 6, 1), 10.0, 2.0)],
+    })
+
+    result = await get_batch_history_and_forecast(
+        db, hotel_ids=[1, 2, 3], target_date=date(2017, 6, 1), has_deposit=False, horizon=1,
+    )
+
+    assert db.queries == ["hotel", "booking_daily", "prediction"]
+    assert [day.day for day in result[1].history_summary] == [date(2017, 5, 30), date(2017, 5, 31)]
+    assert result[1].forecast[0].bookings == 10.0 and result[1].error is None
+    assert result[2].error.type == "InsufficientHistoryError"
+    assert result[3].error.type == "AuthorizationError"
+
+
+def test_batch_forecast_request_deduplicates_hotel_ids():
+    req = BatchForecastRequest(
+        target_date=date(2017, 6, 1), horizon=7, has_deposit=False, hotel_ids=[2, 1, 2],
+    )
+
+    assert req.hotel_ids == [2, 1]
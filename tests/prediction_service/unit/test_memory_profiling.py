@@ -0,0 +1,93 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from benchmarks.prediction.synthetic import generate_hotel, load_categories
+from prediction_service.core import trainer
+from prediction_service.core.profiling import memory_profile, memory_profiles, profiling_requested
+from shared.metrics import StageMetrics, StageTimer
+
+pytestmark = [pytest.mark.prediction, pytest.mark.unit]
+
+
+@pytest.fixture(autouse=True)
+def clear_profiles():
+    memory_profiles.clear()
+    yield
+    memory_profiles.clear()
+
+
+def test_disabled_profile_does_not_start_tracemalloc():
+    with memory_profile("forecast", enabled=False, hotel_id=1) as profiler:
+        assert profiler is None
+        assert not tracemalloc.is_tracing()
+
+    assert len(memory_profiles) == 0
+
+
+def test_profile_records_stages_with_nested_peaks():
+    with memory_profile("forecast", enabled=True, hotel_id=1) as profiler:
+        timer = StageTimer("forecast", StageMetrics(), profiler=profiler)
+        with timer.stage("preprocess"):
+            with timer.stage("preprocess.aggregate_historical"):
+                buffer = np.ones(1_000_000)
+                del buffer
+            kept = np.ones(250_000)
+
+    assert not tracemalloc.is_tracing()
+    summary = memory_profiles[-1]
+    assert summary["pipeline"] == "forecast"
+    assert summary["hotel_id"] == 1
+
+    inner, outer = summary["stages"]
+    assert (inner["stage"], outer["stage"]) == ("preprocess.aggregate_historical", "preprocess")
+    # 8 МБ временного массива внутреннего этапа входят в пик внешнего
+    assert inner["traced_peak_mb"] >= 7.6
+    assert outer["traced_peak_mb"] >= inner["traced_peak_mb"]
+    assert outer["top_allocations"][0]["size_diff_kb"] >= 1900
+    assert outer["rss_peak_mb"] > 0
+    assert kept.size == 250_000
+
+
+def test_only_one_profile_runs_at_a_time():
+    with memory_profile("training", enabled=True, hotel_id=1) as first:
+        with memory_profile("training", enabled=True, hotel_id=2) as second:
+            assert first is not None
+            assert second is None
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [(None, False), ("0", False), ("1", True), ("true", True)],
+)
+def test_profiling_requested_by_header(header, expected):
+    assert profiling_requested(header) is expected
+
+
+class StopTraining(Exception):
+    pass
+
+
+def test_training_profile_includes_preprocess_stages(monkeypatch):
+    hotel = generate_hotel(1, years=1, bookings_per_day=1, categories=load_categories(1))
+    monkeypatch.setattr(trainer, "load_bookings", lambda hotel_id, db: hotel.bookings)
+    monkeypatch.setattr(trainer, "load_weather", lambda hotel_id, db: hotel.weather)
+    monkeypatch.setattr(trainer, "load_holidays", lambda db: hotel.holidays)
+
+    # Проверяются этапы подготовки данных: обучение останавливается перед построением последовательностей
+    def stop(*args, **kwargs):
+        raise StopTraining
+
+    monkeypatch.setattr(trainer, "create_sequences", stop)
+
+    with pytest.raises(StopTraining):
+        with memory_profile(trainer.TRAINING_PIPELINE, enabled=True, hotel_id=1) as profiler:
+            timer = StageTimer(trainer.TRAINING_PIPELINE, StageMetrics(), profiler=profiler)
+            trainer.train_model_for_hotel(1, db_session=None, timer=timer)
+
+    stages = [stage["stage"] for stage in memory_profiles[-1]["stages"]]
+    assert memory_profiles[-1]["pipeline"] == trainer.TRAINING_PIPELINE
+    assert "preprocess.aggregate_historical" in stages
+    assert stages.index("preprocess.aggregate_historical") < stages.index("preprocess") < stages.index("normalize")
+    assert "preprocess.aggregate_historical" in timer.timings
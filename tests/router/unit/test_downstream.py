@@ -0,0 +1,158 @@
+import httpx
+import pytest
+
+from router.api.utils.downstream import (
+    BreakerState,
+    CircuitBreaker,
+    DownstreamClient,
+    RetryBudget,
+)
+from shared.errors import ExternalServiceError
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_client(handler, *, failure_threshold=5, max_retries=2, budget=None) -> DownstreamClient:
+    return DownstreamClient(
+        name="test",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        breaker=CircuitBreaker(failure_threshold, reset_seconds=10),
+        budget=budget or RetryBudget(ratio=0.2, reserve=10),
+        max_retries=max_retries,
+        retry_backoff_seconds=0,
+    )
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_reset():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=clock)
+
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state is BreakerState.open
+    assert not breaker.allow()
+
+    clock.now += 10
+    assert breaker.state is BreakerState.half_open
+    assert breaker.allow()
+    # Пока пробный запрос не завершён, остальные отклоняются
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state is BreakerState.closed
+    assert breaker.allow()
+
+
+def test_breaker_reopens_when_trial_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.open
+    assert not breaker.allow()
+
+
+def test_retry_budget_is_bounded_by_reserve():
+    budget = RetryBudget(ratio=0.5, reserve=1)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.available == 1
+    assert budget.withdraw()
+
+
+async def test_idempotent_request_retried_on_unavailable_status():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503 if len(calls) < 3 else 200, json={"ok": True})
+
+    client = make_client(handler)
+    response = await client.request("POST", "http://svc/forecast/fetch", idempotent=True)
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert client.breaker.state is BreakerState.closed
+
+
+async def test_non_idempotent_post_is_not_retried_after_send():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("timeout", request=request)
+
+    client = make_client(handler)
+    with pytest.raises(ExternalServiceError):
+        await client.request("POST", "http://svc/booking/import")
+
+    assert len(calls) == 1
+
+
+async def test_connect_error_retried_for_any_method():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(201)
+
+    client = make_client(handler)
+    response = await client.request("POST", "http://svc/booking/import")
+
+    assert response.status_code == 201
+    assert len(calls) == 2
+
+
+async def test_retries_stop_when_budget_exhausted():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = make_client(handler, budget=RetryBudget(ratio=0, reserve=1))
+    response = await client.request("GET", "http://svc/health")
+
+    assert response.status_code == 503
+    assert len(calls) == 2
+
+
+async def test_open_breaker_rejects_without_calling_service():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_client(handler, failure_threshold=2, max_retries=0)
+    for _ in range(2):
+        with pytest.raises(ExternalServiceError):
+            await client.request("GET", "http://svc/health")
+
+    with pytest.raises(ExternalServiceError, match="недоступен"):
+        await client.request("GET", "http://svc/health")
+
+    assert len(calls) == 2
+    assert client.snapshot()["state"] == "open"
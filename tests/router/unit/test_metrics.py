@@ -0,0 +1,120 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from shared.errors import NotFoundError, register_error_handlers
+from shared.metrics import (
+    LATENCY_BUCKETS,
+    UNMATCHED_ROUTE,
+    Histogram,
+    StageMetrics,
+    StageTimer,
+    add_metrics,
+    http_metrics,
+)
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+
+@pytest.fixture
+def client():
+    http_metrics.clear()
+    app = FastAPI()
+    register_error_handlers(app)
+    add_metrics(app)
+    items = APIRouter()
+
+    @items.get("/items/{item_id}")
+    def get_item(item_id: int):
+        if item_id == 0:
+            raise NotFoundError("Нет такой записи")
+        return {"item_id": item_id}
+
+    @items.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a" * 10, b"b" * 20]), media_type="text/plain")
+
+    app.include_router(items, prefix="/data")
+    yield TestClient(app)
+    http_metrics.clear()
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(3.65)
+
+
+def test_requests_are_counted_per_route_template_and_status(client):
+    client.get("/data/items/1")
+    client.get("/data/items/2")
+    client.get("/data/items/0")
+    client.get("/nowhere")
+
+    assert http_metrics.requests == {
+        ("GET", "/data/items/{item_id}", "200"): 2,
+        ("GET", "/data/items/{item_id}", "404"): 1,
+        ("GET", UNMATCHED_ROUTE, "404"): 1,
+    }
+    assert http_metrics.latency[("GET", "/data/items/{item_id}")].count == 3
+    assert http_metrics.in_progress["GET"] == 0
+
+
+def test_streamed_response_size_is_summed(client):
+    client.get("/data/stream")
+
+    size = http_metrics.response_size[("GET", "/data/stream")]
+    assert size.count == 1
+    assert size.sum == 30
+
+
+def test_metrics_endpoint_renders_prometheus_text(client):
+    client.get("/data/items/1")
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/data/items/{item_id}",status="200"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/data/items/{item_id}",le="+Inf"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/data/items/{item_id}"} 1' in body
+    assert 'http_response_size_bytes_sum{method="GET",route="/data/items/{item_id}"} 13.0' in body
+    # Запрос к /metrics ещё обрабатывается во время рендеринга
+    assert 'http_requests_in_progress{method="GET"} 1' in body
+    assert body.count("http_request_duration_seconds_bucket{") == len(LATENCY_BUCKETS) + 1
+
+
+def test_stage_timer_records_histograms_timings_and_server_timing():
+    metrics = StageMetrics()
+    timer = StageTimer("forecast", metrics)
+
+    with timer.stage("load"):
+        pass
+    with pytest.raises(RuntimeError):
+        with timer.stage("forward"):
+            raise RuntimeError("boom")
+    with timer.stage("load"):
+        pass
+
+    assert list(timer.timings) == ["load", "forward"]
+    assert metrics.durations[("forecast", "load")].count == 2
+    assert metrics.durations[("forecast", "forward")].count == 1
+    assert timer.server_timing() == f"load;dur={timer.timings['load']}, forward;dur={timer.timings['forward']}"
+    assert 'pipeline_stage_duration_seconds_count{pipeline="forecast",stage="load"} 2' in metrics.render()
+
+
+def test_stage_timer_total_counts_nested_stages_once():
+    timer = StageTimer("forecast", StageMetrics())
+
+    with timer.stage("preprocess"):
+        with timer.stage("preprocess.encode"):
+            pass
+    with timer.stage("forward"):
+        pass
+
+    assert timer.total_ms == round(timer.timings["preprocess"] + timer.timings["forward"], 3)
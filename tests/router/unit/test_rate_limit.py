@@ -0,0 +1,139 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from router.api.routers import prediction
+from router.api.utils.downstream import PREDICTION_SERVICE
+from router.api.utils.rate_limit import (
+    PREDICTION_ROUTE,
+    MemoryTokenBuckets,
+    RateLimiter,
+    RatePolicy,
+    RedisTokenBuckets,
+)
+from router.config import router_config
+from shared.errors import RateLimitError, register_error_handlers
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+POLICY = RatePolicy(rate_per_second=1.0, burst=2)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenRedis:
+    """Redis, на котором любой скрипт завершается ошибкой соединения."""
+
+    def register_script(self, script):
+        async def run(keys, args):
+            raise RedisConnectionError("connection refused")
+        return run
+
+
+def make_limiter(clock, redis=None) -> RateLimiter:
+    return RateLimiter(
+        policies={PREDICTION_ROUTE: POLICY},
+        memory=MemoryTokenBuckets(max_keys=100, clock=clock),
+        redis=redis,
+    )
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    buckets = MemoryTokenBuckets(max_keys=10, clock=clock)
+
+    assert buckets.take("a", POLICY) == 0
+    assert buckets.take("a", POLICY) == 0
+    assert buckets.take("a", POLICY) == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert buckets.take("a", POLICY) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert buckets.take("a", POLICY) == 0
+
+
+def test_bucket_store_is_bounded():
+    buckets = MemoryTokenBuckets(max_keys=2, clock=FakeClock())
+
+    for key in "abc":
+        buckets.take(key, POLICY)
+
+    assert len(buckets) == 2
+
+
+async def test_limit_is_per_hotel_and_counted():
+    limiter = make_limiter(FakeClock())
+
+    for _ in range(2):
+        await limiter.check(PREDICTION_ROUTE, 1)
+    with pytest.raises(RateLimitError) as exc_info:
+        await limiter.check(PREDICTION_ROUTE, 1)
+    await limiter.check(PREDICTION_ROUTE, 2)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "1"}
+    assert limiter.snapshot() == {
+        1: {PREDICTION_ROUTE: {"allowed": 2, "rejected": 1}},
+        2: {PREDICTION_ROUTE: {"allowed": 1, "rejected": 0}},
+    }
+
+
+async def test_counters_are_bounded_by_max_keys():
+    limiter = RateLimiter(
+        policies={PREDICTION_ROUTE: POLICY},
+        memory=MemoryTokenBuckets(max_keys=2, clock=FakeClock()),
+    )
+
+    for hotel_id in (1, 2, 1, 3):
+        await limiter.check(PREDICTION_ROUTE, hotel_id)
+
+    assert list(limiter.snapshot()) == [1, 3]
+
+
+def test_prediction_quota_is_not_spent_for_inaccessible_hotel():
+    limiter = make_limiter(FakeClock())
+    app = FastAPI()
+    register_error_handlers(app, service="router")
+    app.include_router(prediction.router, prefix="/prediction")
+    app.state.rate_limiter = limiter
+    app.state.downstreams = {PREDICTION_SERVICE: None}
+    token = jwt.encode(
+        {"sub": "1", "system_role": "user", "token_type": "access", "hotels": [{"id": 2, "user_role": "owner"}]},
+        router_config.jwt_config.secret_key,
+        algorithm=router_config.jwt_config.hash_algorithm,
+    )
+    body = {"hotel_id": 1, "target_date": "2017-05-01", "has_deposit": False}
+
+    anonymous = TestClient(app).post("/prediction/run-prediction", json=body)
+    foreign = TestClient(app, cookies={"access_token": token}).post("/prediction/run-prediction", json=body)
+
+    assert anonymous.status_code == 401
+    assert foreign.status_code == 401
+    assert limiter.snapshot() == {}
+
+
+async def test_routes_without_policy_are_not_limited():
+    limiter = make_limiter(FakeClock())
+
+    for _ in range(10):
+        await limiter.check("unknown", 1)
+
+    assert limiter.snapshot() == {}
+
+
+async def test_redis_failure_falls_back_to_local_buckets():
+    limiter = make_limiter(FakeClock(), redis=RedisTokenBuckets(BrokenRedis()))
+
+    for _ in range(2):
+        await limiter.check(PREDICTION_ROUTE, 1)
+    with pytest.raises(RateLimitError):
+        await limiter.check(PREDICTION_ROUTE, 1)
@@ -0,0 +1,79 @@
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from shared.errors import RateLimitError, register_error_handlers
+from shared.responses import GZIP_MINIMUM_SIZE, FastJSONResponse, add_gzip_middleware
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+
+class Day(BaseModel):
+    day: date
+    bookings: float
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    add_gzip_middleware(app)
+    register_error_handlers(app)
+
+    @app.get("/large")
+    def large():
+        return FastJSONResponse({"days": [{"day": "2017-01-01", "bookings": i} for i in range(500)]})
+
+    @app.get("/small")
+    def small():
+        return FastJSONResponse({"ok": True})
+
+    @app.get("/parquet")
+    def parquet():
+        return Response(b"PAR1" * GZIP_MINIMUM_SIZE, media_type="application/vnd.apache.parquet")
+
+    @app.get("/limited")
+    def limited():
+        raise RateLimitError(retry_after=2.5)
+
+    return TestClient(app)
+
+
+def test_render_handles_int_keys_numpy_and_models():
+    body = FastJSONResponse({
+        1: Day(day=date(2017, 1, 1), bookings=1.5),
+        "values": np.array([1.0, 2.5]),
+        "day": date(2017, 1, 2),
+    }).body
+
+    assert json.loads(body) == {
+        "1": {"day": "2017-01-01", "bookings": 1.5},
+        "values": [1.0, 2.5],
+        "day": "2017-01-02",
+    }
+
+
+def test_large_responses_are_gzipped(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["days"]) == 500
+
+
+def test_small_and_precompressed_responses_are_not_gzipped(client):
+    for path in ("/small", "/parquet"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+
+def test_service_error_headers_are_returned(client):
+    response = client.get("/limited")
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["error"]["type"] == "RateLimitError"
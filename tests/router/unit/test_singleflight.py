@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from router.api.utils.downstream import CircuitBreaker, DownstreamClient, RetryBudget
+from router.api.utils.http import SingleFlight, inflight, proxy_post
+from shared.errors import ExternalServiceError
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+URL = "http://svc/forecast/fetch"
+
+
+class Payload(BaseModel):
+    horizon: int
+
+
+def make_client(handler) -> DownstreamClient:
+    return DownstreamClient(
+        name="test",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        breaker=CircuitBreaker(failure_threshold=5, reset_seconds=10),
+        budget=RetryBudget(ratio=0.2, reserve=10),
+        max_retries=0,
+        retry_backoff_seconds=0,
+    )
+
+
+def slow_handler(calls: list):
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"hotel": request.headers["x-hotel-id"], "body": request.content.decode()})
+    return handler
+
+
+async def test_identical_requests_share_one_downstream_call():
+    calls = []
+    client = make_client(slow_handler(calls))
+
+    responses = await asyncio.gather(*(
+        proxy_post(client=client, url=URL, coalesce=True, headers={"X-Hotel-Id": "1"}, payload=Payload(horizon=30))
+        for _ in range(10)
+    ))
+
+    assert len(calls) == 1
+    assert all(r.json()["hotel"] == "1" for r in responses)
+    assert len({id(r) for r in responses}) == 10
+    assert len(inflight) == 0
+
+
+async def test_different_hotels_and_bodies_are_not_coalesced():
+    calls = []
+    client = make_client(slow_handler(calls))
+
+    responses = await asyncio.gather(
+        proxy_post(client=client, url=URL, coalesce=True, headers={"X-Hotel-Id": "1"}, payload=Payload(horizon=30)),
+        proxy_post(client=client, url=URL, coalesce=True, headers={"X-Hotel-Id": "2"}, payload=Payload(horizon=30)),
+        proxy_post(client=client, url=URL, coalesce=True, headers={"X-Hotel-Id": "1"}, payload=Payload(horizon=7)),
+        proxy_post(client=client, url=URL, coalesce=True, headers={"X-Hotel-Id": "1"}, json={"horizon": 1}),
+        proxy_post(client=client, url=URL, coalesce=True, headers={"X-Hotel-Id": "1"}, json={"horizon": 2}),
+    )
+
+    assert len(calls) == 5
+    assert [r.json()["hotel"] for r in responses] == ["1", "2", "1", "1", "1"]
+    assert [r.json()["body"] for r in responses[3:]] == ['{"horizon":1}', '{"horizon":2}']
+    assert calls[3].headers["content-type"] == "application/json"
+
+
+async def test_coalesce_rejects_streamed_body():
+    client = make_client(slow_handler([]))
+
+    with pytest.raises(ValueError):
+        await proxy_post(client=client, url=URL, coalesce=True, content=iter([b"a", b"b"]))
+
+
+async def test_requests_without_coalesce_are_sent_separately():
+    calls = []
+    client = make_client(slow_handler(calls))
+
+    await asyncio.gather(*(
+        proxy_post(client=client, url=URL, headers={"X-Hotel-Id": "1"}, payload=Payload(horizon=30))
+        for _ in range(3)
+    ))
+
+    assert len(calls) == 3
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def call():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", call))
+    await started.wait()
+    second = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    assert await second == "done"
+    assert len(flight) == 0
+
+
+async def test_error_is_delivered_to_every_waiter():
+    def handler(request):
+        raise httpx.ReadTimeout("timeout", request=request)
+
+    client = make_client(handler)
+    results = await asyncio.gather(
+        *(proxy_post(client=client, url=URL, coalesce=True, payload=Payload(horizon=30)) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ExternalServiceError) for r in results)
+    assert len(inflight) == 0
@@ -0,0 +1,132 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from router.api.dependencies import get_current_hotel, get_data_interface_client, get_rate_limiter
+from router.api.routers import data_interface
+from router.api.schemas import AccessibleHotel
+from router.api.utils.downstream import CircuitBreaker, DownstreamClient, RetryBudget
+from router.api.utils.rate_limit import MemoryTokenBuckets, RateLimiter
+from router.config import router_config
+from shared.errors import register_error_handlers
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+MAX_BODY_BYTES = 64
+
+
+class FakeDataInterface:
+    """data_interface_service на httpx.MockTransport: запоминает полученные запросы и тела."""
+
+    def __init__(self, status_code: int, body: bytes, headers: dict[str, str]):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+        self.requests: list[tuple[httpx.Request, bytes]] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request, await request.aread()))
+        # Потоковое тело, как у настоящего ответа: router читает его через aiter_raw
+        return httpx.Response(self.status_code, headers=self.headers, stream=httpx.ByteStream(self.body))
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    monkeypatch.setattr(router_config.proxy, "max_body_bytes", MAX_BODY_BYTES)
+
+    def make(downstream: FakeDataInterface) -> TestClient:
+        client = DownstreamClient(
+            name="data_interface",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(downstream)),
+            breaker=CircuitBreaker(5, reset_seconds=10),
+            budget=RetryBudget(ratio=0.2, reserve=10),
+            max_retries=0,
+            retry_backoff_seconds=0,
+        )
+        app = FastAPI()
+        register_error_handlers(app, service="router")
+        app.include_router(data_interface.router, prefix="/data")
+        app.dependency_overrides[get_current_hotel] = lambda: AccessibleHotel(id=7, user_role="owner")
+        app.dependency_overrides[get_data_interface_client] = lambda: client
+        app.dependency_overrides[get_rate_limiter] = lambda: RateLimiter(
+            policies={}, memory=MemoryTokenBuckets(max_keys=10)
+        )
+        return TestClient(app)
+
+    return make
+
+
+def test_oversized_body_with_content_length_is_rejected_before_forwarding(make_client):
+    downstream = FakeDataInterface(201, b"{}", {"Content-Type": "application/json"})
+
+    response = make_client(downstream).post(
+        "/data/import-bookings",
+        content=b"x" * (MAX_BODY_BYTES + 1),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 413
+    assert downstream.requests == []
+
+
+def test_oversized_chunked_body_is_rejected(make_client):
+    downstream = FakeDataInterface(201, b"{}", {"Content-Type": "application/json"})
+
+    def chunks():
+        for _ in range(4):
+            yield b"x" * (MAX_BODY_BYTES // 2)
+
+    response = make_client(downstream).post(
+        "/data/import-bookings",
+        content=chunks(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_upload_and_response_pass_through_unchanged(make_client):
+    downstream = FakeDataInterface(
+        201,
+        b'{"inserted": 2}',
+        {"Content-Type": "application/json", "ETag": '"v1"', "X-Internal": "hidden"},
+    )
+    body = b"arrival_date,adr\n2017-05-01,100\n2017-05-02,110\n"
+
+    response = make_client(downstream).post(
+        "/data/import-bookings",
+        content=iter([body[:10], body[10:]]),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    forwarded, forwarded_body = downstream.requests[0]
+    assert forwarded.url.path == "/booking/import"
+    assert forwarded.headers["X-Hotel-Id"] == "7"
+    assert forwarded.headers["Content-Type"] == "text/csv"
+    assert forwarded_body == body
+
+    assert response.status_code == 201
+    assert response.content == b'{"inserted": 2}'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == '"v1"'
+    assert "x-internal" not in response.headers
+
+
+def test_export_is_streamed_with_file_headers(make_client):
+    downstream = FakeDataInterface(
+        200,
+        b"day,bookings\n2017-05-01,42\n",
+        {"Content-Type": "text/csv", "Content-Disposition": 'attachment; filename="export.csv"'},
+    )
+
+    response = make_client(downstream).get(
+        "/data/export", params={"start_date": "2017-05-01", "end_date": "2017-05-31", "format": "csv"}
+    )
+
+    forwarded, _ = downstream.requests[0]
+    assert forwarded.url.path == "/forecast/export"
+    assert forwarded.url.params["format"] == "csv"
+    assert response.status_code == 200
+    assert response.content == b"day,bookings\n2017-05-01,42\n"
+    assert response.headers["content-disposition"] == 'attachment; filename="export.csv"'
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from jose import jwt
+
+from router.api.utils import jwt as jwt_utils
+from router.api.utils.jwt import verify_access_token
+from router.api.utils.token_cache import TokenCache
+from router.config import router_config
+from shared.errors import AuthorizationError
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_token(exp: float | None = None, hotels=None, **claims) -> str:
+    payload = {
+        "sub": "1",
+        "system_role": "user",
+        "token_type": "access",
+        "hotels": [{"id": 1, "user_role": "owner"}, {"id": 2, "user_role": "viewer"}] if hotels is None else hotels,
+        **claims,
+    }
+    if exp is not None:
+        payload["exp"] = int(exp)
+    return jwt.encode(
+        payload,
+        router_config.jwt_config.secret_key,
+        algorithm=router_config.jwt_config.hash_algorithm,
+    )
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    original = jwt_utils.decode_access_jwt
+
+    def counting(token):
+        calls.append(token)
+        return original(token)
+
+    monkeypatch.setattr(jwt_utils, "decode_access_jwt", counting)
+    return calls
+
+
+def test_verify_access_token_decodes_once_per_token(decode_calls):
+    cache = TokenCache(max_size=10, ttl_seconds=300)
+    token = make_token(exp=time.time() + 600)
+
+    first = verify_access_token(token, cache)
+    second = verify_access_token(token, cache)
+
+    assert first is second
+    assert len(decode_calls) == 1
+    assert first.accessible_hotels()[2].user_role == "viewer"
+
+
+def test_cache_entry_expires_at_token_exp(decode_calls):
+    clock = FakeClock(now=time.time())
+    cache = TokenCache(max_size=10, ttl_seconds=300, clock=clock)
+    token = make_token(exp=clock.now + 60)
+
+    principal = verify_access_token(token, cache)
+    clock.now += 61
+
+    assert cache.get(token) is None
+    assert principal.payload["exp"] < clock.now
+
+
+def test_cache_entry_capped_by_ttl():
+    clock = FakeClock()
+    cache = TokenCache(max_size=10, ttl_seconds=5, clock=clock)
+    principal = jwt_utils.build_principal({"exp": clock.now + 3600, "hotels": []})
+
+    cache.put("token", principal)
+    assert cache.get("token") is principal
+
+    clock.now += 6
+    assert cache.get("token") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2, ttl_seconds=300)
+    principals = {name: jwt_utils.build_principal({"hotels": []}) for name in "abc"}
+
+    cache.put("a", principals["a"])
+    cache.put("b", principals["b"])
+    cache.get("a")
+    cache.put("c", principals["c"])
+
+    assert cache.get("a") is principals["a"]
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_invalid_tokens_are_not_cached(decode_calls):
+    cache = TokenCache(max_size=10, ttl_seconds=300)
+
+    for _ in range(2):
+        with pytest.raises(AuthorizationError):
+            verify_access_token("not-a-jwt", cache)
+
+    assert len(decode_calls) == 2
+    assert len(cache) == 0
+
+
+def test_invalid_hotels_claim_rejected_only_on_hotel_access():
+    principal = verify_access_token(make_token(hotels="broken"), TokenCache(max_size=10, ttl_seconds=300))
+
+    assert principal.payload["sub"] == "1"
+    with pytest.raises(AuthorizationError, match="hotels"):
+        principal.accessible_hotels()
@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from router.api.routers import traces
+from router.api.utils.downstream import CircuitBreaker, DownstreamClient, RetryBudget
+from shared.errors import NotFoundError, register_error_handlers
+from router.config import router_config
+from shared.tracing import (
+    PARENT_SPAN_HEADER,
+    REQUEST_START_HEADER,
+    TRACE_HEADER,
+    span,
+    span_buffer,
+    traces_router,
+)
+
+pytestmark = [pytest.mark.router, pytest.mark.unit]
+
+
+@pytest.fixture(autouse=True)
+def clear_spans():
+    span_buffer.clear()
+    yield
+    span_buffer.clear()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    register_error_handlers(app, service="test")
+    app.include_router(traces_router)
+    items = APIRouter()
+
+    @items.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with span("db.load", table="items"):
+            with span("db.query"):
+                pass
+        return {"item_id": item_id}
+
+    @items.get("/missing")
+    def missing():
+        raise NotFoundError("Нет такой записи")
+
+    app.include_router(items, prefix="/data")
+    return TestClient(app)
+
+
+def spans_by_name(trace_id: str) -> dict:
+    return {item.name: item for item in span_buffer.find(trace_id)}
+
+
+def test_incoming_trace_id_is_kept_and_spans_are_nested(client):
+    response = client.get("/data/items/5", headers={TRACE_HEADER: "trace-1", PARENT_SPAN_HEADER: "abc"})
+
+    assert response.headers[TRACE_HEADER] == "trace-1"
+    spans = spans_by_name("trace-1")
+    root = spans["http.request"]
+    assert root.service == "test"
+    assert root.parent_id == "abc"
+    assert root.attributes["route"] == "/data/items/{item_id}"
+    assert root.attributes["status"] == 200
+    assert spans["db.load"].parent_id == root.span_id
+    assert spans["db.load"].attributes == {"table": "items"}
+    assert spans["db.query"].parent_id == spans["db.load"].span_id
+
+
+def test_invalid_trace_id_is_replaced(client):
+    response = client.get("/data/items/5", headers={TRACE_HEADER: "bad id\n"})
+
+    trace_id = response.headers[TRACE_HEADER]
+    assert trace_id != "bad id\n"
+    assert "http.request" in spans_by_name(trace_id)
+
+
+def test_queue_span_is_recorded_from_request_start(client):
+    sent = time.time() - 0.25
+    client.get("/data/items/5", headers={TRACE_HEADER: "trace-2", REQUEST_START_HEADER: f"t={sent:.6f}"})
+
+    spans = spans_by_name("trace-2")
+    assert spans["queue"].parent_id == spans["http.request"].span_id
+    assert spans["queue"].duration_ms >= 250
+
+
+def test_error_response_carries_the_trace_id(client):
+    response = client.get("/data/missing", headers={TRACE_HEADER: "trace-3"})
+
+    assert response.status_code == 404
+    assert response.json()["error"]["trace_id"] == "trace-3"
+    assert spans_by_name("trace-3")["http.request"].attributes["status"] == 404
+
+
+def test_local_trace_endpoint_returns_recorded_spans(client):
+    client.get("/data/items/5", headers={TRACE_HEADER: "trace-4"})
+
+    spans = client.get("/traces/trace-4").json()["spans"]
+    assert [item["name"] for item in spans] == ["http.request", "db.load", "db.query"]
+
+
+def test_span_outside_trace_records_nothing():
+    with span("background") as current:
+        assert current is None
+    assert len(span_buffer) == 0
+
+
+def test_downstream_client_propagates_trace_headers():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.update(request.headers)
+        return httpx.Response(200)
+
+    downstream = DownstreamClient(
+        name="test",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        breaker=CircuitBreaker(5, reset_seconds=10),
+        budget=RetryBudget(ratio=0.2, reserve=10),
+        max_retries=0,
+        retry_backoff_seconds=0,
+    )
+    app = FastAPI()
+    register_error_handlers(app, service="router")
+
+    @app.get("/proxy")
+    async def proxy():
+        await downstream.request("GET", "http://downstream/items")
+        return {}
+
+    TestClient(app).get("/proxy", headers={TRACE_HEADER: "trace-5"})
+    asyncio.run(downstream.aclose())
+
+    hop = spans_by_name("trace-5")["downstream.test"]
+    assert seen[TRACE_HEADER.lower()] == "trace-5"
+    assert seen[PARENT_SPAN_HEADER.lower()] == hop.span_id
+    assert seen[REQUEST_START_HEADER.lower()].startswith("t=")
+    assert hop.attributes["status"] == 200
+
+
+def make_token(system_role: str) -> str:
+    return jwt.encode(
+        {"sub": "1", "system_role": system_role, "token_type": "access", "hotels": []},
+        router_config.jwt_config.secret_key,
+        algorithm=router_config.jwt_config.hash_algorithm,
+    )
+
+
+@pytest.mark.parametrize(
+    ("cookies", "expected_status"),
+    [({}, 401), ({"access_token": make_token("user")}, 401), ({"access_token": make_token("support")}, 200)],
+)
+def test_gateway_trace_endpoint_is_staff_only(cookies, expected_status):
+    app = FastAPI()
+    register_error_handlers(app, service="router")
+    app.include_router(traces.router, prefix="/traces")
+    app.state.downstreams = {}
+
+    response = TestClient(app, cookies=cookies).get("/traces/trace-6")
+
+    assert response.status_code == expected_status